@@ -4,42 +4,78 @@ References
 '''
 
 from base_solver import Base_Solver
+from tabu import Tabu_List
+from parameters import Parameter
 import numpy as np
 import random
 import time
 from itertools import chain
 
 class AMLS(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      max_pert=Parameter('int', (1, 100), 15, log=True),
+                      tenure_ratio=Parameter('real', (0.01, 0.5), 0.1, log=True),
+                      tenure_base=Parameter('int', (0, 20), 4),
+                      perturb_ratio=Parameter('real', (0.05, 1.0), 0.5),
+                      step_ratio=Parameter('real', (0.01, 1.0), 1/6, log=True),
+                      check_ratio=Parameter('int', (1, 50), 10, log=True))
     
-    def __init__(self, input_cnf_file, verbose):
-        super(AMLS, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, max_pert = 15, tenure_ratio = 0.1, tenure_base = 4, perturb_ratio = 0.5,
+                 step_ratio = 1/6, check_ratio = 10, **kwargs):
+        super(AMLS, self).__init__(input_cnf_file, verbose, **kwargs)
+        self.MAX_FLIPS = int(self.nvars*self.nvars/4) 
         self.initialize_pool()
-        self.generate()
-        self.initialize_cost()
-        self.best_assignment = self.assignment.copy()
-        self.best_cost = len(self.id_unsat_clauses)
+        self.best_assignment = None # of the current solve, see initialize_params
+        self.best_cost = self.weights.sum() + 1
         self.p = 0.0
         self.wp = 0.0
-        self.last_move = [-1 for _ in self.assignment]
-        self.MAX_PERT = 15
-        self.MAX_FLIPS = int(self.nvars*self.nvars/4) 
-        self.CHECK_FREQ = self.nvars * 10
-        self.vf = [None for _ in self.list_clauses]
-        self.vs = [None for _ in self.list_clauses]
-        self.nf = [0 for _ in self.list_clauses]
-        self.ns = [0 for _ in self.list_clauses]
-        self.tabu_tenure = int(self.nvars/10 + 4)
+        self.MAX_PERT = max_pert
+        self.CHECK_FREQ = self.nvars * check_ratio
+        self.perturb_ratio = perturb_ratio # tabu tenure of the perturbation = perturb_ratio * nvars
+        '''
+        Clause memory: vf[i] / vs[i] = last variable which made clause i UNSAT / SAT (0 = none),
+        nf[i] / ns[i] = nb of times in a row (int32 arrays in compact mode)
+        '''
+        dtype = np.int32 if self.compact else np.int64
+        self.vf = np.zeros(len(self.list_clauses), dtype=dtype)
+        self.vs = np.zeros(len(self.list_clauses), dtype=dtype)
+        self.nf = np.zeros(len(self.list_clauses), dtype=dtype)
+        self.ns = np.zeros(len(self.list_clauses), dtype=dtype)
+        self.tabu_tenure = int(tenure_ratio*self.nvars + tenure_base)
+        self.tabu = Tabu_List(self.nvars, self.tabu_tenure)
         self.stagnation = False
         self.no_improvement_step = 0
-        self.DEFINED_STEP = int(len(self.list_clauses)/6)
+        self.DEFINED_STEP = int(len(self.list_clauses)*step_ratio)
     
-    def initialize_params(self):
+    def resize(self):
+        super(AMLS, self).resize()
+        grow = np.zeros(len(self.list_clauses) - len(self.vf), dtype=self.vf.dtype)
+        self.vf = np.concatenate((self.vf, grow))
+        self.vs = np.concatenate((self.vs, grow))
+        self.nf = np.concatenate((self.nf, grow))
+        self.ns = np.concatenate((self.ns, grow))
+
+    def initialize_params(self, first=False):
+        '''
+        New try: the first one of a solve starts from a new assignment (generate()),
+        the next ones go on from the perturbed assignment
+        '''
         self.p = 0
         self.wp = 0 
-        self.last_move = [-1 for _ in self.assignment]
-        self.nb_tries += 1
-        self.nb_flips = 0
+        if first:
+            self.generate()
+            self.initialize_cost()
+            self.best_assignment = self.assignment.copy()
+            self.best_cost = self.cost()
+        else:
+            self.begin_try()
+        self.age.reset()
+        self.tabu.reset()
         self.no_improvement_step = 0
+        if self.complete == 'interleaved' and not first: # no generate() between tries
+            if self.run_complete(self.complete_conflicts) and not self.proven_unsat:
+                self.initialize_cost()
         
     
     def update_params(self):
@@ -55,9 +91,10 @@ class AMLS(Base_Solver):
             self.wp -= float(self.wp/10)
             self.p -= float(self.p/10)
 
-        nb_moves, tb_moves = self.pick_allowed_lits(self.tabu_tenure)
+        nb_moves, tb_moves = self.pick_allowed_lits(tabu=False)
         nb_total_moves = len(nb_moves) + len(tb_moves)
         self.tabu_tenure = random.randint(1,10) + int(nb_total_moves*0.25)
+        self.tabu.set_tenure(self.tabu_tenure)
         
         
     def pick_unsat_clause(self):
@@ -65,7 +102,7 @@ class AMLS(Base_Solver):
         random_index = random.choice(self.id_unsat_clauses)
         return self.list_clauses[random_index]
 
-    def pick_allowed_lits(self, tabu_tenure):
+    def pick_allowed_lits(self, tabu=True):
         allowed_lits = []
         non_allowed_lits = []
         '''
@@ -74,11 +111,8 @@ class AMLS(Base_Solver):
         for ind in self.id_unsat_clauses:
             allowed_lits += self.list_clauses[ind]   
         allowed_lits = list(set(allowed_lits))
-        if tabu_tenure > 0:
-            for lit in allowed_lits:
-                if self.nb_flips - self.last_move[abs(lit)-1] < tabu_tenure: #tabu move
-                    allowed_lits.remove(lit)
-                    non_allowed_lits.append(lit)
+        if tabu:
+            allowed_lits, non_allowed_lits = self.tabu.partition(allowed_lits, self.nb_flips)
         '''
         WalkSAT strategy
         '''
@@ -96,9 +130,9 @@ class AMLS(Base_Solver):
 
 
     def pick_necessary_flip(self):
-        oldest_move = min(self.last_move)
-        if self.nb_flips - oldest_move > self.CHECK_FREQ:
-            return self.assignment[self.last_move.index(oldest_move)]
+        oldest_var = self.age.oldest()
+        if oldest_var is not None and self.nb_flips - self.age.last_flip(oldest_var) > self.CHECK_FREQ:
+            return self.assignment[oldest_var-1]
         else: 
             return None 
 
@@ -116,18 +150,16 @@ class AMLS(Base_Solver):
         return id_1, id_2
 
     def penalty(self, y):
-        list_RS, list_RF = [], []
-        for i in range(len(self.list_clauses)):
-            if self.vs[i] is not None and abs(self.vs[i]) == abs(y):
-                list_RS.append(i)
-            if self.vf[i] is not None and abs(self.vf[i]) == abs(y):
-                list_RF.append(i)
+        '''
+        Only clauses containing y can have been made SAT / UNSAT by y => only its occurrences are scanned
+        '''
+        x = abs(y)
+        occ = np.array(self.pool[x] + self.pool[-x], dtype=np.int64)
+        list_RS = occ[self.vs[occ] == x]
+        list_RF = occ[self.vf[occ] == x]
         
-        cost_RS, cost_RF = 0, 0
-        for cs in list_RS:
-            cost_RS += 2**self.ns[cs]
-        for cf in list_RF:
-            cost_RF += 2**self.nf[cf]
+        cost_RS = np.exp2(self.ns[list_RS]).sum()
+        cost_RF = np.exp2(self.nf[list_RF]).sum()
         if len(list_RS)>0:
             cost_RS = float(cost_RS/(2*len(list_RS)))
         if len(list_RF)>0:
@@ -135,20 +167,30 @@ class AMLS(Base_Solver):
         pen = cost_RS + cost_RF
         return pen
 
-    def pick_neighborhood(self, tabu_tenure):
+    def most_recent_allowed(self, tabu=True):
+        '''
+        Most recently flipped variable of the allowed moves, i.e. occurring in an unsat clause (make > 0),
+        and not tabu if tabu: read from the tail of the recency list, skipping the other variables
+        (the tabu ones are the last flipped) instead of scanning every allowed move
+        '''
+        step, make_score = self.nb_flips, self.make_score
+        return self.age.most_recent_where(lambda x: make_score[x] > 0 and not (tabu and self.tabu.is_tabu(x, step)))
+
+    def pick_neighborhood(self):
         '''
         compute allowed literals wrt tabu list
         '''
-        allowed_lits, non_allowed_lits = self.pick_allowed_lits(tabu_tenure)
-        if len(allowed_lits) == 0: # else take allowed_lits and ignore tabu
-            allowed_lits, non_allowed_lits = self.pick_allowed_lits(0)
+        allowed_lits, non_allowed_lits = self.pick_allowed_lits(tabu=True)
+        tabu = len(allowed_lits) > 0
+        if not tabu: # else take allowed_lits and ignore tabu
+            allowed_lits, non_allowed_lits = self.pick_allowed_lits(tabu=False)
         '''
         Compute cost of every (tabu and non tabu) moves
         Cost = break - make
         '''
         assert len(allowed_lits) > 0
         ntb_cost, tb_cost = [], []
-        current_cost = len(self.id_unsat_clauses)
+        current_cost = self.cost()
         for literal in allowed_lits:
             ntb_cost.append(self.evaluate_breakcount(literal, bs=1, ms=1))
         id_ntb_1st, id_ntb_2nd = self.pick_1st_and_2nd_min(ntb_cost)
@@ -174,12 +216,8 @@ class AMLS(Base_Solver):
             return y
         
         p = random.random()
-        least_recent_move = allowed_lits[0] #largest last move
-        for lit in allowed_lits[1:]:
-            if self.last_move[abs(least_recent_move)-1] < self.last_move[abs(lit)-1]:
-                least_recent_move = lit
-
-        if  p < self.wp  and x_nb == least_recent_move:
+        # largest last move, only looked up when needed
+        if  p < self.wp  and abs(x_nb) == self.most_recent_allowed(tabu):
             if self.penalty(x_nsb) < self.penalty(x_nb):
                 y = x_nsb
                 return y
@@ -188,54 +226,48 @@ class AMLS(Base_Solver):
         return y
 
     def flip(self, literal):
-        self.nb_flips += 1
-        # Flip variable in assignment
-        ind = 0
-        if literal in self.assignment:
-            ind = self.assignment.index(literal)
-        elif -literal in self.assignment:
-            ind = self.assignment.index(-literal) 
-        old_literal = self.assignment[ind]
-        self.assignment[ind] *= -1
-        # Update cost
+        '''
+        Before flipping, record for every clause the last variable which made it UNSAT (vf, nf times in a row)
+        and the last variable which made it SAT (vs, ns times in a row)
+        '''
+        x = abs(literal)
+        if self.frozen and x in self.frozen: # assumption => no-op move, nothing to record
+            return super(AMLS, self).flip(literal)
+        old_literal = self.assignment[x-1]
         # Clause contains literal => cost --
-        if old_literal in self.pool.keys():
-            for i in self.pool[old_literal]:
-                self.costs[i] -= 1
-                if self.costs[i] == 0: # if SAT -> UNSAT: add to list of  unsat clauses
-                    self.id_unsat_clauses.append(i)
-                    if self.vf[i] is not None and self.vf[i] == abs(literal):
-                        self.nf[i] += 1
-                    else: 
-                        self.vf[i] = abs(literal)
-                        self.nf[i] = 1
+        for i in self.pool[old_literal]:
+            if self.costs[i] == 1: # SAT -> UNSAT
+                if self.vf[i] == x:
+                    self.nf[i] += 1
+                else: 
+                    self.vf[i] = x
+                    self.nf[i] = 1
         # Clause contains -literal => cost ++
-        if -old_literal in self.pool.keys():
-            for j in self.pool[-old_literal]:
-                if self.costs[j] == 0: # if UNSAT -> SAT: remove from list of unsat clauses
-                    self.id_unsat_clauses.remove(j)
-                    if self.vs[j] is not None and self.vs[j] == abs(literal):
-                        self.ns[j] += 1
-                    else: 
-                        self.vs[j] = abs(literal)
-                        self.ns[j] = 1
-                self.costs[j] += 1
+        for j in self.pool[-old_literal]:
+            if self.costs[j] == 0: # UNSAT -> SAT
+                if self.vs[j] == x:
+                    self.ns[j] += 1
+                else: 
+                    self.vs[j] = x
+                    self.ns[j] = 1
+        super(AMLS, self).flip(literal)
 
     def perturbate(self, tabu_tenure):
         nb_pert = 0
+        self.tabu.set_tenure(tabu_tenure)
         while nb_pert < self.MAX_PERT and not self.check():
             '''
             compute allowed literals wrt tabu list
             '''
-            all_allowed_lits, non_allowed_lits = self.pick_allowed_lits(tabu_tenure)
+            all_allowed_lits, non_allowed_lits = self.pick_allowed_lits(tabu=True)
             if len(all_allowed_lits) == 0: # else take all_allowed_lits and ignore tabu
-                all_allowed_lits, non_allowed_lits = self.pick_allowed_lits(0)
+                all_allowed_lits, non_allowed_lits = self.pick_allowed_lits(tabu=False)
             '''
             Compute cost of every (tabu and non tabu) moves
             Cost = break - make
             '''
             ntb_cost, tb_cost = [], []
-            current_cost = len(self.id_unsat_clauses)
+            current_cost = self.cost()
             for literal in all_allowed_lits:
                 ntb_cost.append(self.evaluate_breakcount(literal, bs=1, ms=1))
             x_ntb = all_allowed_lits[np.argmin(ntb_cost)]
@@ -251,9 +283,9 @@ class AMLS(Base_Solver):
                 x = x_ntb
             
             self.flip(x) 
-            self.last_move[abs(x)-1] = self.nb_flips
-            if len(self.id_unsat_clauses) < self.best_cost:
-                self.best_cost = len(self.id_unsat_clauses)
+            self.tabu.add(x, self.nb_flips)
+            if self.cost() < self.best_cost:
+                self.best_cost = self.cost()
             '''
             Every 10n iterations, if a variable is not flipped within 10n iterations 
             => force X to be flipped !
@@ -262,9 +294,9 @@ class AMLS(Base_Solver):
                 x = self.pick_necessary_flip()
                 if x is not None: 
                     self.flip(x)
-                    self.last_move[abs(x)-1] = self.nb_flips
-                    if len(self.id_unsat_clauses) < self.best_cost:
-                        self.best_cost = len(self.id_unsat_clauses)
+                    self.tabu.add(x, self.nb_flips)
+                    if self.cost() < self.best_cost:
+                        self.best_cost = self.cost()
             '''
             TODO: Every n iterations => change randomly tabu tenure 
             Note: tabu tenure for perturbation phase should be larger than the one used for LS
@@ -272,26 +304,29 @@ class AMLS(Base_Solver):
             # if self.nb_flips % self.nvars == 0:
             #     self.tabu_tenure = random.randint(self.tabu_tenure_MIN, self.tabu_tenure_MAX)
             nb_pert += 1
+        self.tabu.set_tenure(self.tabu_tenure)
         return self.assignment
 
     def solve(self):
         initial =  time.time()
+        first = True
         while self.nb_tries < self.MAX_TRIES and not self.is_sat:
             '''
             Search Phase
             '''
-            self.initialize_params()
+            self.initialize_params(first)
+            first = False
             while self.nb_flips < self.MAX_FLIPS and not self.check():
                 ''' 
                 Select move
                 '''
-                x = self.pick_neighborhood(self.tabu_tenure)
+                x = self.pick_neighborhood()
                 self.flip(x) 
                 '''
                 Update best cost and assignment
                 '''
-                if len(self.id_unsat_clauses) < self.best_cost:
-                    self.best_cost = len(self.id_unsat_clauses)
+                if self.cost() < self.best_cost:
+                    self.best_cost = self.cost()
                     self.best_assignment = self.assignment.copy()
                     self.stagnation = False
                 else: 
@@ -300,24 +335,19 @@ class AMLS(Base_Solver):
                 Add this move to the tabu list 
                 Update p, wp, tabu tenure
                 '''
-                self.last_move[abs(x)-1] = self.nb_flips
+                self.tabu.add(x, self.nb_flips)
                 self.update_params()
             '''
-            Perturbation Phase
+            Perturbation Phase (from an elite assignment of the other workers in cooperative search)
             '''
-            self.assignment = self.perturbate(int(self.nvars/2))
+            elite = self.exchange()
+            if elite is not None:
+                self.assignment = elite
+                self.initialize_cost()
+            self.assignment = self.perturbate(int(self.perturb_ratio*self.nvars))
             if self.check():
                 self.is_sat = True
             
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
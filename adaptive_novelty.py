@@ -6,17 +6,27 @@ References
 '''
 
 from base_solver import Base_Solver
+from parameters import Parameter
 import numpy as np
 import random
 import time
 from itertools import chain
 
 class Adaptive_Novelty(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      noise_parameter=Parameter('real', (0.0, 1.0), 0.2),
+                      clause_local=Parameter('cat', (False, True), False),
+                      theta=Parameter('real', (0.01, 1.0), 1/6, log=True),
+                      phi=Parameter('real', (0.01, 0.5), 0.2))
     
-    def __init__(self, input_cnf_file, verbose, noise_parameter = 0.2):
-        super(Adaptive_Novelty, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, noise_parameter = 0.2, clause_local = False, theta = 1/6, phi = 0.2,
+                 **kwargs):
+        super(Adaptive_Novelty, self).__init__(input_cnf_file, verbose, **kwargs)
         self.noise_parameter = noise_parameter
         self.most_recent = None
+        # Evaluate only the literals of one random unsat clause (original algorithms) instead of all unsat literals
+        self.clause_local = clause_local
         '''
         Introduce random walk noise parameter => Adaptive_Novelty+
         Initially set noise parameter = 0
@@ -24,9 +34,9 @@ class Adaptive_Novelty(Base_Solver):
         Adjustment based on parameters theta and phi
         '''
         self.random_walk_noise = 0.0
-        self.THETA = float(1/6) 
+        self.THETA = float(theta)
         self.DEFINED_STEP = self.THETA * len(self.list_clauses)
-        self.PHI = 0.2
+        self.PHI = phi
         self.no_improvement_step = 0
         self.stagnation = False
 
@@ -50,18 +60,23 @@ class Adaptive_Novelty(Base_Solver):
                     - Among all variables that occur in unsat clauses
                     - Choose a variable x which minimizes cost to flip
                     '''
-                    all_unsat_lits = []
-                    for ind in self.id_unsat_clauses:
-                        all_unsat_lits += self.list_clauses[ind]
-                    all_unsat_lits = list(set(all_unsat_lits)) # flatten & remove redundants
-                    '''
-                    Compute cost when flipping each literal 
-                        cost = break - make
-                    Best var with min cost
-                    '''
-                    cost = []
-                    for literal in all_unsat_lits:
-                        cost.append(self.evaluate_breakcount(literal, bs=1, ms=1))
+                    if self.clause_local:
+                        # Only the literals of a random unsat clause, most recent = most recently flipped in this clause
+                        all_unsat_lits, cost, most_recent = self.pick_clause_literals()
+                    else:
+                        all_unsat_lits = []
+                        for ind in self.id_unsat_clauses:
+                            all_unsat_lits += self.list_clauses[ind]
+                        all_unsat_lits = list(set(all_unsat_lits)) # flatten & remove redundants
+                        '''
+                        Compute cost when flipping each literal 
+                            cost = break - make
+                        Best var with min cost
+                        '''
+                        cost = []
+                        for literal in all_unsat_lits:
+                            cost.append(self.evaluate_breakcount(literal, bs=1, ms=1))
+                        most_recent = self.most_recent
                     '''
                     [Random walk]
                     If after DEFINED_STEP, no improvements => increase random_walk_noise
@@ -105,7 +120,7 @@ class Adaptive_Novelty(Base_Solver):
                             second_best_id = np.argmin(cost)
                             second_best_var = all_unsat_lits[second_best_id]
                             # best_var, second_best_var = all_unsat_lits[0], all_unsat_lits[1]
-                            if abs(best_var) != self.most_recent: #(1)
+                            if abs(best_var) != most_recent: #(1)
                                 x = best_var
                             else:
                                 p = random.random()
@@ -117,23 +132,14 @@ class Adaptive_Novelty(Base_Solver):
                     After choosing x, flip it and save this last recent move
                     Compare new cost with previous one => check number of no-improvement step
                     '''
-                    self.current_cost = len(self.id_unsat_clauses)
+                    self.current_cost = self.cost()
                     self.flip(x) 
                     self.most_recent = abs(x)
-                    if len(self.id_unsat_clauses) >= self.current_cost:
+                    if self.cost() >= self.current_cost:
                         self.stagnation = True
                     else: 
                         self.stagnation = False
 
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
@@ -0,0 +1,119 @@
+'''
+Age of variables (= iterations since their last flip), shared by all solvers
+
+Intrusive recency list: variables are chained from the least recently flipped one (head)
+to the most recently flipped one (tail), node 0 is the sentinel of the circular list.
+    - flipping x moves x to the tail => O(1)
+    - oldest / most recently flipped variable => O(1), most recent one of a kind => walk back from the tail
+    - comparing the ages of two variables => O(1) via last[x]
+compact: numpy arrays instead of lists (4 + 4 + 8 bytes per variable instead of ~100)
+'''
+
+import numpy as np
+
+class Age_Index:
+
+    __slots__ = ('nvars', 'compact', 'last', 'next', 'prev')
+
+    def __init__(self, nvars, compact=False):
+        self.nvars = nvars
+        self.compact = compact
+        self.reset()
+
+    def reset(self):
+        '''
+        Nothing is flipped yet: last move of every variable is -1, oldest one is variable 1
+        '''
+        n = self.nvars
+        if self.compact:
+            self.last = np.full(n+1, -1, dtype=np.int64)
+            self.next = np.arange(1, n+2, dtype=np.int32)
+            self.prev = np.arange(-1, n, dtype=np.int32)
+        else:
+            self.last = [-1 for _ in range(n+1)]
+            self.next = [x+1 for x in range(n+1)]
+            self.prev = [x-1 for x in range(n+1)]
+        self.next[n] = 0
+        self.prev[0] = n
+
+    def resize(self, nvars):
+        '''
+        New variables (incremental solving) are never flipped => inserted as the oldest ones
+        '''
+        if nvars <= self.nvars:
+            return
+        grow = nvars - self.nvars
+        if self.compact:
+            self.last = np.concatenate((self.last, np.full(grow, -1, dtype=np.int64)))
+            self.next = np.concatenate((self.next, np.zeros(grow, dtype=np.int32)))
+            self.prev = np.concatenate((self.prev, np.zeros(grow, dtype=np.int32)))
+        else:
+            self.last.extend(-1 for _ in range(grow))
+            self.next.extend(0 for _ in range(grow))
+            self.prev.extend(0 for _ in range(grow))
+        for x in range(self.nvars+1, nvars+1):
+            head = self.next[0]
+            self.next[x] = head
+            self.prev[x] = 0
+            self.prev[head] = x
+            self.next[0] = x
+        self.nvars = nvars
+
+    def touch(self, literal, step):
+        '''
+        Variable |literal| has just been flipped at iteration step => move it to the tail
+        '''
+        x = abs(literal)
+        self.last[x] = step
+        if self.prev[0] == x:
+            return
+        # unlink
+        self.next[self.prev[x]] = self.next[x]
+        self.prev[self.next[x]] = self.prev[x]
+        # link before the sentinel
+        tail = self.prev[0]
+        self.next[tail] = x
+        self.prev[x] = tail
+        self.next[x] = 0
+        self.prev[0] = x
+
+    def last_flip(self, literal):
+        return self.last[abs(literal)]
+
+    def oldest(self):
+        '''
+        Least recently flipped variable (None if there is no variable)
+        '''
+        x = self.next[0]
+        return x if x != 0 else None
+
+    def most_recent(self):
+        x = self.prev[0]
+        return x if x != 0 else None
+
+    def is_older(self, literal_a, literal_b):
+        return self.last[abs(literal_a)] < self.last[abs(literal_b)]
+
+    def most_recent_where(self, accept):
+        '''
+        Most recently flipped variable x with accept(x), None if there is none: walk from the tail up to
+        the first variable never flipped => O(nb of variables flipped more recently than x)
+        '''
+        last, prev = self.last, self.prev
+        x = prev[0]
+        while x != 0 and last[x] >= 0:
+            if accept(x):
+                return x
+            x = prev[x]
+        return None
+
+    def most_recent_of(self, literals):
+        '''
+        Most recently flipped literal among candidates (first one in case of ties)
+        '''
+        last = self.last
+        return max(literals, key=lambda lit: last[abs(lit)])
+
+    def least_recent_of(self, literals):
+        last = self.last
+        return min(literals, key=lambda lit: last[abs(lit)])
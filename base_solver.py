@@ -1,107 +1,776 @@
-from dimacs_parser import parse
+from dimacs_parser import parse_formula
+from formula import Formula
+from shared_formula import Formula_Handle, attach
+from age import Age_Index
+from preprocessing import Preprocessor
+from cdcl import CDCL
+from compact import load_compact, compact_formula, counter_type, index_type, footprint
+from parameters import Parameter
 import numpy as np
 import random
 import time
+import threading
+import queue
+
+class Driver:
+    '''
+    Strategy composed around the tries of a solver (solver.add_driver(driver), see utils.build_solver):
+    restart schedule (restarts.Restart_Schedule), elite exchange of a cooperative search
+    (cooperative.Elite_Exchange). Hooks called by the solver:
+        - begin_try(solver):      new try, before its counters are reset (may set MAX_FLIPS / MAX_TRIES)
+        - exchange(solver):       new try or perturbation => assignment to restart from (None: none)
+        - end_try(solver, solved): end of the search (report)
+        - reset(solver):          new solve (incremental solving)
+    '''
+
+    def begin_try(self, solver):
+        pass
+
+    def exchange(self, solver):
+        return None
+
+    def end_try(self, solver, solved):
+        pass
+
+    def reset(self, solver):
+        pass
+
 
 class Base_Solver:
 
-    def __init__(self, input_cnf_file, verbose):
-        self.list_clauses, self.nvars = parse(input_cnf_file, verbose)
+    # Tunable options (see parameters.py), extended by each solver
+    PARAMETERS = {
+        'init_mode': Parameter('cat', ('random', 'polarity', 'greedy', 'best'), 'random'),
+        'init_noise': Parameter('real', (0.0, 0.5), 0.1),
+    }
+
+    def __init__(self, input_cnf_file, verbose, preprocess=0, init_mode='random', init_noise=0.1, init_assignment=None,
+                 complete=None, complete_conflicts=1000, compact=False):
+        '''
+        input_cnf_file: path of a CNF / WCNF file, a Formula, or the handle of a shared formula (see shared_formula.py)
+        compact: array-backed state of the smallest types for very large instances (see compact.py),
+                 read-only formula => no incremental API
+        '''
+        self.compact = compact
+        if isinstance(input_cnf_file, Formula_Handle):
+            self.formula = attach(input_cnf_file)
+        elif isinstance(input_cnf_file, Formula):
+            self.formula = input_cnf_file
+        elif compact and preprocess == 0:
+            self.formula = load_compact(input_cnf_file, verbose)
+        else:
+            self.formula = parse_formula(input_cnf_file, verbose)
+        '''
+        Preprocessing (CNF only, the weights of a WCNF would not be preserved)
+            - preprocess = 0: none
+            - preprocess = 1: units, pure literals, duplicates, subsumption
+            - preprocess = 2: + equivalent literals and bounded variable elimination
+        Search runs on the simplified formula, models are extended back to the input formula by report()
+        '''
+        self.input_formula = self.formula
+        self.preprocessor = None
+        self.proven_unsat = False
+        if preprocess > 0 and not self.formula.is_weighted:
+            self.preprocessor = Preprocessor(self.formula, verbose)
+            self.formula = self.preprocessor.run(preprocess)
+            self.proven_unsat = self.preprocessor.proven_unsat
+        if compact and not self.formula.read_only:
+            self.formula = compact_formula(self.formula)
+        self.list_clauses, self.nvars = self.formula.clauses, self.formula.nvars
+        # CSR arrays of an array formula (shared or compact), read directly by flip_arrays()
+        self.flat = self.formula.flat_arrays() if self.formula.read_only else None
         self.verbose = verbose
         self.assignment = []
-        self.pool = dict() #key: literal -> element: index of clause which contains literal 
+        self.pool = dict() #key: literal -> element: index of clause which contains literal
         self.id_unsat_clauses = [] # save id of unsat clause
-        self.costs = np.zeros(len(self.list_clauses)) #compute nb of literals make clause true (i.e. for clause Ci, if fi>0 => T, fi==0 => F)
+        nclauses = len(self.list_clauses)
+        if self.formula.read_only: # position of each unsat clause in id_unsat_clauses => O(1) removal
+            self.unsat_position = np.full(nclauses, -1, dtype=index_type(nclauses) if compact else np.int64)
+        else:
+            self.unsat_position = [-1 for _ in self.list_clauses]
+        if compact: #compute nb of literals make clause true (i.e. for clause Ci, if fi>0 => T, fi==0 => F)
+            lengths = np.diff(self.formula.clause_arrays()[0])
+            self.costs = np.zeros(nclauses, dtype=counter_type(lengths.max(initial=0)))
+        else:
+            self.costs = np.zeros(nclauses)
+        '''
+        MaxSAT: weight of each clause (1 for CNF), cost of an assignment = sum of weights of unsat clauses
+        Weighted break/make of each variable are maintained incrementally by flip()
+            - break_score[x] = sum of weights of clauses in which x is the only true literal
+            - make_score[x]  = sum of weights of unsat clauses containing x
+        Scores use score_weights (= weights, unless a clause weighting scheme changes them during search)
+        '''
+        self.weights = np.asarray(self.formula.weights, dtype=np.int64) # no copy for a shared formula
+        self.score_weights = self.weights.astype(np.float32 if compact else np.float64)
+        self.break_score = np.zeros(self.nvars+1)
+        self.make_score = np.zeros(self.nvars+1)
+        self.unsat_weight = 0
+        '''
+        Anytime: best cost over all tries, history of its improvements (cost, flips, tries, time)
+        The best assignment is not copied on every improvement: while the search stays at the best cost,
+        the current assignment *is* the best one (best_is_current) => copied only when the search leaves it
+        '''
+        self.best_found_cost = self.weights.sum() + 1
+        self.best_ref = None       # list holding the best assignment while best_is_current
+        self.best_copy = None      # copy of the best assignment otherwise
+        self.best_is_current = False
+        self.history = []
+        self.callback = None
+        self.start_time = time.time()
+        self.age = Age_Index(self.nvars, compact) # iteration of last flip of each variable, updated on every flip
+        '''
+        Initial assignment of each try
+            - random:   uniformly random
+            - polarity: majority polarity of occurrences (weighted)
+            - greedy:   variables in random order, each one satisfies most open clauses, followed by unit propagation
+            - best:     best assignment found so far (random for the first try)
+        Except for random, each variable is then flipped with probability init_noise (diversification between tries)
+        init_assignment: the first try starts from it instead (warm start, e.g. from a cached solution, see
+                         solution_cache.py), installed by generate() as the assignment of an incremental solve
+        '''
+        assert init_mode in ('random', 'polarity', 'greedy', 'best')
+        self.init_mode = init_mode
+        self.init_noise = init_noise
         self.MAX_TRIES = 50
         self.MAX_FLIPS = 100*self.nvars
         self.nb_tries = 0
-        self.nb_flips = 0 
+        self.nb_flips = 0
         self.is_sat = False
+        if self.proven_unsat: # nothing to search
+            self.MAX_TRIES = 0
+        '''
+        Drivers (see Driver): without any, every try runs MAX_FLIPS flips, MAX_TRIES times, from generate()
+        '''
+        self.drivers = []
+        '''
+        Complete solver (CNF only) to settle instances local search cannot
+            - complete = 'after':       run CDCL when local search ends without a model
+            - complete = 'interleaved': before each new try, run CDCL for complete_conflicts conflicts
+                                        (learnt clauses are kept between runs)
+        Phases of CDCL are seeded with the best assignment found by local search
+        '''
+        assert complete in (None, 'after', 'interleaved')
+        self.saved_limits = None # (MAX_TRIES, MAX_FLIPS) before stop(), None: not stopped
+        self.complete = complete if not self.formula.is_weighted else None
+        self.complete_conflicts = complete_conflicts
+        self.cdcl = None
+        '''
+        Incremental solving: clauses / variables can be added between two calls of solve()
+            - frozen: key: variable -> assumed literal, flipping a frozen variable is a no-op
+              and its break score is raised by FROZEN_PENALTY (greedy rules never pick it)
+            - warm_start: next try starts from the current assignment instead of generate()
+        '''
+        self.frozen = dict()
+        self.FROZEN_PENALTY = float(2**40)
+        self.warm_start = False
+        if init_assignment is not None: # of the input formula
+            assert self.preprocessor is None and len(init_assignment) == self.nvars
+            self.assignment = list(init_assignment)
+            self.warm_start = True
 
-        for clause in self.list_clauses:
-            assert len(clause) > 0
+        if self.formula.read_only:
+            assert np.all(np.diff(self.formula.clause_arrays()[0]) > 0)
+        else:
+            for clause in self.list_clauses:
+                assert len(clause) > 0
 
-    def generate(self):
-        self.assignment = []
+    def add_driver(self, driver):
+        self.drivers.append(driver)
+        return driver
+
+    def begin_try(self):
+        # Counters of a new try, its cutoff (MAX_FLIPS) may be set by a driver (restart schedule)
+        for driver in self.drivers:
+            driver.begin_try(self)
         self.nb_tries += 1
         self.nb_flips = 0
+        if self.saved_limits is not None: # stopped: limits set by the drivers are overridden, the try is empty
+            self.MAX_TRIES, self.MAX_FLIPS = self.nb_tries, 0
+
+    def generate(self):
+        self.begin_try()
+        self.age.reset()
+        if self.warm_start and len(self.assignment) == self.nvars:
+            self.warm_start = False
+            self.assignment = self.assignment.copy()
+            self.apply_assumptions()
+            return
+        self.warm_start = False
+        elite = self.exchange() if len(self.assignment) == self.nvars else None
+        if elite is not None:
+            self.assignment = elite
+        elif self.init_mode == 'polarity':
+            self.assignment = self.polarity_assignment()
+        elif self.init_mode == 'greedy':
+            self.assignment = self.greedy_assignment()
+        elif self.init_mode == 'best' and self.best_found_assignment is not None:
+            self.assignment = self.best_found_assignment.copy()
+        else:
+            self.assignment = []
+            for x in range(1, self.nvars+1):
+                choice = [-1,1]
+                self.assignment.append(x * random.choice(choice))
+        if self.init_mode != 'random' or elite is not None:
+            for x in range(1, self.nvars+1):
+                if random.random() < self.init_noise:
+                    self.assignment[x-1] *= -1
+        if self.complete == 'interleaved' and self.nb_tries > 1:
+            self.run_complete(self.complete_conflicts)
+        self.apply_assumptions()
+
+    def polarity_assignment(self):
+        # Requires the occurrence index (initialize_pool)
+        assignment = []
         for x in range(1, self.nvars+1):
-            choice = [-1,1]
-            self.assignment.append(x * random.choice(choice))
+            pos = sum(self.weights[i] for i in self.pool[x])
+            neg = sum(self.weights[i] for i in self.pool[-x])
+            if pos == neg:
+                assignment.append(x * random.choice([-1,1]))
+            else:
+                assignment.append(x if pos > neg else -x)
+        return assignment
 
-    def initialize_pool(self): 
+    def greedy_assignment(self):
+        '''
+        Greedy construction over the occurrence index (requires initialize_pool)
+            - nb_true[i] / nb_false[i]: nb of literals of clause i currently true / false
+            - open clause = no true literal yet
+            - clause with no true literal and only 1 unassigned literal => this literal is propagated
+        '''
+        value = [0 for _ in range(self.nvars+1)]
+        nb_true = [0 for _ in self.list_clauses]
+        nb_false = [0 for _ in self.list_clauses]
+        units = []
+
+        def assign(literal):
+            value[abs(literal)] = 1 if literal > 0 else -1
+            for i in self.pool[literal]:
+                nb_true[i] += 1
+            for i in self.pool[-literal]:
+                nb_false[i] += 1
+                clause = self.list_clauses[i]
+                if nb_true[i] == 0 and nb_false[i] == len(clause) - 1:
+                    for lit in clause:
+                        if value[abs(lit)] == 0:
+                            units.append(lit)
+                            break
+
+        order = list(range(1, self.nvars+1))
+        random.shuffle(order)
+        for x in order:
+            if value[x] != 0:
+                continue
+            pos = sum(self.weights[i] for i in self.pool[x] if nb_true[i] == 0)
+            neg = sum(self.weights[i] for i in self.pool[-x] if nb_true[i] == 0)
+            if pos == neg:
+                assign(x * random.choice([-1,1]))
+            else:
+                assign(x if pos > neg else -x)
+            while len(units) > 0: # conflicts are ignored, local search will repair them
+                literal = units.pop()
+                if value[abs(literal)] == 0:
+                    assign(literal)
+        return [x * value[x] for x in range(1, self.nvars+1)]
+
+    def initialize_pool(self):
+        if self.formula.read_only: # shared formula => view on its occurrence arrays
+            self.pool = self.formula.occurrences()
+            return
+        self.pool = dict()
+        for x in range(1, self.nvars+1):
+            self.pool[x] = []
+            self.pool[-x] = []
         for i, clause in enumerate(self.list_clauses):
             for literal in clause:
-                if literal in self.pool.keys():
-                    self.pool[literal].append(i)
-                else:
-                    self.pool[literal] = [i]
+                self.pool[literal].append(i)
 
     def initialize_cost(self):
         # Compute nb of literals make clause true (i.e. for clause Ci, if fi>0 => T, fi==0 => F)
-        # Let's call it cost ! 
+        # Let's call it cost !
+        # Besides, compute weighted break/make of every variable and weighted cost of the assignment
         assert len(self.assignment) > 0
+        if self.formula.read_only:
+            self.initialize_cost_arrays()
+            return
         self.id_unsat_clauses = []
+        self.unsat_weight = 0
+        self.break_score.fill(0)
+        self.make_score.fill(0)
+        assignment = self.assignment
         for i, clause in enumerate(self.list_clauses):
-            self.costs[i] = 0
-            for literal in clause:
-                if literal in self.assignment:
-                    self.costs[i] += 1
+            true_literals = [literal for literal in clause if assignment[abs(literal)-1] == literal]
+            self.costs[i] = len(true_literals)
+            w = self.score_weights[i]
             if self.costs[i] == 0: #Clause[i] is currently UNSAT
-                self.id_unsat_clauses.append(i)
-    
+                self.add_unsat(i)
+                self.unsat_weight += self.weights[i]
+                for literal in clause:
+                    self.make_score[abs(literal)] += w
+            else:
+                self.unsat_position[i] = -1
+                if self.costs[i] == 1:
+                    self.break_score[abs(true_literals[0])] += w
+        for x in self.frozen:
+            self.break_score[x] += self.FROZEN_PENALTY
+        self.update_best()
+
+    def initialize_cost_arrays(self):
+        '''
+        initialize_cost() of an array formula (shared or compact), vectorized over its clause arrays
+            - critical clause (1 true literal): its only true literal is its first true one in clause order
+              => clause ids of the critical true literals are the critical clauses in increasing order
+        '''
+        clause_start, clause_lits = self.formula.clause_arrays()
+        lengths = np.diff(clause_start)
+        value = np.zeros(self.nvars+1, dtype=np.int8)
+        assignment = np.asarray(self.assignment, dtype=np.int64)
+        value[np.abs(assignment)] = np.sign(assignment)
+        true_literals = value[np.abs(clause_lits)] * clause_lits > 0
+        self.costs[:] = np.add.reduceat(true_literals, clause_start[:-1], dtype=self.costs.dtype) if len(lengths) else 0
+        unsat = np.flatnonzero(self.costs == 0)
+        critical = np.flatnonzero(self.costs == 1)
+        in_unsat = np.repeat(self.costs == 0, lengths)
+        self.make_score[:] = np.bincount(np.abs(clause_lits[in_unsat]), minlength=self.nvars+1,
+                                         weights=np.repeat(self.score_weights[unsat], lengths[unsat]))
+        in_critical = true_literals & np.repeat(self.costs == 1, lengths)
+        self.break_score[:] = np.bincount(np.abs(clause_lits[in_critical]), minlength=self.nvars+1,
+                                          weights=self.score_weights[critical])
+        self.id_unsat_clauses = unsat.tolist()
+        self.unsat_position.fill(-1)
+        self.unsat_position[unsat] = np.arange(len(unsat))
+        self.unsat_weight = int(self.weights[unsat].sum())
+        for x in self.frozen:
+            self.break_score[x] += self.FROZEN_PENALTY
+        self.update_best()
+
+    def clause_lengths(self):
+        # Length of each clause (array of the type of costs in compact mode)
+        if self.compact:
+            return np.diff(self.formula.clause_arrays()[0]).astype(self.costs.dtype)
+        return [len(clause) for clause in self.list_clauses]
+
+    def memory_footprint(self):
+        '''
+        Approximate nb of bytes of the solver (see compact.footprint), key: attribute -> nb of bytes
+        Objects shared by several attributes are counted once, under the first one
+        '''
+        seen = set()
+        return {name: footprint(value, seen) for name, value in vars(self).items()}
+
     def check(self):
-        # check if all is SAT 
+        # check if all is SAT
         return len(self.id_unsat_clauses) == 0
 
+    def cost(self):
+        # Weighted number of unsat clauses (= number of unsat clauses for CNF)
+        return self.unsat_weight
+
+    @property
+    def best_found_assignment(self):
+        if self.best_is_current:
+            return self.best_ref.copy()
+        return self.best_copy
+
+    def update_best(self, flipped=None):
+        # Anytime: keep the best assignment seen so far, over all tries
+        if self.best_is_current and self.best_ref is not self.assignment: # current assignment has been replaced
+            self.best_copy = self.best_ref.copy()
+            self.best_is_current = False
+        if self.unsat_weight < self.best_found_cost:
+            self.best_found_cost = self.unsat_weight
+            self.best_ref = self.assignment
+            self.best_is_current = True
+            self.history.append((self.best_found_cost, self.nb_flips, self.nb_tries, time.time() - self.start_time))
+            if self.callback is not None:
+                self.callback(self.best_found_cost, self.assignment, self.nb_flips, time.time() - self.start_time)
+        elif self.best_is_current and self.unsat_weight > self.best_found_cost:
+            # leaving the best assignment => copy it, i.e. the assignment before the last flip
+            self.best_copy = self.assignment.copy()
+            if flipped is not None:
+                self.best_copy[flipped-1] *= -1
+            self.best_is_current = False
+
+    def model(self, assignment):
+        # Assignment of the input formula (extended if the formula has been preprocessed)
+        if self.preprocessor is not None:
+            return self.preprocessor.extend(assignment)
+        return assignment
+
+    def add_unsat(self, i):
+        self.unsat_position[i] = len(self.id_unsat_clauses)
+        self.id_unsat_clauses.append(i)
+
+    def remove_unsat(self, i):
+        # swap with the last unsat clause => O(1)
+        pos = self.unsat_position[i]
+        last = self.id_unsat_clauses.pop()
+        if last != i:
+            self.id_unsat_clauses[pos] = last
+            self.unsat_position[last] = pos
+        self.unsat_position[i] = -1
+
     def evaluate_breakcount(self, literal, bs=1, ms=1):
         # Compute the breakcount score: #clause which turn SAT -> UNSAT
-        ind = 0
-        if literal in self.assignment:  
-            ind = self.assignment.index(literal)
-        elif -literal in self.assignment:
-            ind = self.assignment.index(-literal) 
-        original_literal = self.assignment[ind]
-        # when flipping literal -> -literal
-        # For every clause which contains literal => cost--
-        breakcount = 0
-        if original_literal in self.pool.keys():
-            for i in self.pool[original_literal]:
-                if self.costs[i] == 1:
-                    breakcount += 1
-        # For every clause which contains -literal => cost ++
-        makecount = 0 
-        if -original_literal in self.pool.keys():
-            for j in self.pool[-original_literal]:
-                if self.costs[j] == 0:
-                    makecount += 1
-        # Score = break - make
-        score = bs*breakcount - ms*makecount
+        # Score = break - make (weighted), read from the cache maintained by flip()
+        x = abs(literal)
+        score = bs*self.break_score[x] - ms*self.make_score[x]
         return score
 
+    def pick_clause_literals(self):
+        '''
+        Clause-local selection (Novelty family): only the literals of one random unsat clause are evaluated
+        Return its literals sorted by cost = break - make (ties => least recently flipped first), their costs
+        and the most recently flipped variable of the clause (None if none of them has been flipped)
+        '''
+        clause = self.list_clauses[random.choice(self.id_unsat_clauses)]
+        last = self.age.last
+        ranked = []
+        most_recent, most_recent_step = None, -1 # found in the same pass (no second scan of the clause)
+        for lit in clause:
+            step = last[abs(lit)]
+            ranked.append((self.evaluate_breakcount(lit, bs=1, ms=1), step, lit))
+            if step > most_recent_step:
+                most_recent, most_recent_step = abs(lit), step
+        ranked.sort()
+        literals = [lit for _, _, lit in ranked]
+        cost = [c for c, _, _ in ranked]
+        return literals, cost, most_recent
+
     def flip(self, literal):
         self.nb_flips += 1
         # Flip variable in assignment
-        ind = 0
-        if literal in self.assignment:
-            ind = self.assignment.index(literal)
-        elif -literal in self.assignment:
-            ind = self.assignment.index(-literal) 
-        old_literal = self.assignment[ind]
-        self.assignment[ind] *= -1
+        x = abs(literal)
+        if self.frozen and x in self.frozen: # assumption => no-op move
+            return
+        old_literal = self.assignment[x-1]
+        self.assignment[x-1] *= -1
+        self.age.touch(old_literal, self.nb_flips)
+        if self.flat is not None:
+            self.flip_arrays(x, old_literal)
+            self.update_best(x)
+            return
         # Update cost
         # Clause contains literal => cost --
-        if old_literal in self.pool.keys():
-            for i in self.pool[old_literal]:
-                self.costs[i] -= 1
-                if self.costs[i] == 0: # if SAT -> UNSAT: add to list of  unsat clauses
-                    self.id_unsat_clauses.append(i)
+        for i in self.pool[old_literal]:
+            self.costs[i] -= 1
+            w = self.score_weights[i]
+            if self.costs[i] == 0: # if SAT -> UNSAT: add to list of  unsat clauses
+                self.add_unsat(i)
+                self.unsat_weight += self.weights[i]
+                self.break_score[x] -= w
+                for lit in self.list_clauses[i]:
+                    self.make_score[abs(lit)] += w
+            elif self.costs[i] == 1: # the last true literal becomes critical
+                for lit in self.list_clauses[i]:
+                    if self.assignment[abs(lit)-1] == lit:
+                        self.break_score[abs(lit)] += w
+                        break
+        # Clause contains -literal => cost ++
+        for j in self.pool[-old_literal]:
+            w = self.score_weights[j]
+            if self.costs[j] == 0: # if UNSAT -> SAT: remove from list of unsat clauses
+                self.remove_unsat(j)
+                self.unsat_weight -= self.weights[j]
+                for lit in self.list_clauses[j]:
+                    self.make_score[abs(lit)] -= w
+                self.break_score[x] += w
+            elif self.costs[j] == 1: # the previous true literal is no longer critical
+                for lit in self.list_clauses[j]:
+                    if abs(lit) != x and self.assignment[abs(lit)-1] == lit:
+                        self.break_score[abs(lit)] -= w
+                        break
+            self.costs[j] += 1
+        self.update_best(x)
+
+    def flip_arrays(self, x, old_literal):
+        '''
+        Cost and score updates of flip() on an array formula (shared or compact), same updates in the same order
+        Through the views list_clauses / pool (a list allocated per access, see shared_formula.py) a flip costs
+        ~2x a flip on list clauses, reading the CSR arrays directly ~1.6x (uf100: 11 / 24 / 18 us per flip):
+        one list of clause ids per polarity, literals sliced only for the clauses changing state
+        '''
+        clause_start, clause_lits, occ_start, occ_clauses = self.flat
+        assignment, costs, score_weights = self.assignment, self.costs, self.score_weights
+        break_score, make_score = self.break_score, self.make_score
+        k = 2*x + (old_literal < 0)
+        # Clause contains literal => cost --
+        for i in occ_clauses[occ_start[k]:occ_start[k+1]].tolist():
+            nb_true = costs[i] - 1
+            costs[i] = nb_true
+            if nb_true == 0: # SAT -> UNSAT
+                w = score_weights[i]
+                self.add_unsat(i)
+                self.unsat_weight += self.weights[i]
+                break_score[x] -= w
+                for lit in clause_lits[clause_start[i]:clause_start[i+1]].tolist():
+                    make_score[abs(lit)] += w
+            elif nb_true == 1: # the last true literal becomes critical
+                for lit in clause_lits[clause_start[i]:clause_start[i+1]].tolist():
+                    if assignment[abs(lit)-1] == lit:
+                        break_score[abs(lit)] += score_weights[i]
+                        break
         # Clause contains -literal => cost ++
-        if -old_literal in self.pool.keys():
-            for j in self.pool[-old_literal]:
-                if self.costs[j] == 0: # if UNSAT -> SAT: remove from list of unsat clauses
-                    self.id_unsat_clauses.remove(j)
-                self.costs[j] += 1
+        k = 2*x + (old_literal > 0)
+        for j in occ_clauses[occ_start[k]:occ_start[k+1]].tolist():
+            nb_true = costs[j]
+            costs[j] = nb_true + 1
+            if nb_true == 0: # UNSAT -> SAT
+                w = score_weights[j]
+                self.remove_unsat(j)
+                self.unsat_weight -= self.weights[j]
+                for lit in clause_lits[clause_start[j]:clause_start[j+1]].tolist():
+                    make_score[abs(lit)] -= w
+                break_score[x] += w
+            elif nb_true == 1: # the previous true literal is no longer critical
+                for lit in clause_lits[clause_start[j]:clause_start[j+1]].tolist():
+                    if abs(lit) != x and assignment[abs(lit)-1] == lit:
+                        break_score[abs(lit)] -= score_weights[j]
+                        break
+
+    def set_score_weight(self, i, w):
+        # Change the weight of clause i used by break/make => only variables of clause i are updated
+        delta = w - self.score_weights[i]
+        self.score_weights[i] = w
+        if self.costs[i] == 0:
+            for literal in self.list_clauses[i]:
+                self.make_score[abs(literal)] += delta
+        elif self.costs[i] == 1:
+            for literal in self.list_clauses[i]:
+                if self.assignment[abs(literal)-1] == literal:
+                    self.break_score[abs(literal)] += delta
+                    break
+
+    def run_complete(self, max_conflicts=None):
+        '''
+        Run CDCL, seeded with the best assignment found so far
+            - SAT   => the model becomes the current assignment (found by the next check())
+            - UNSAT => proven_unsat, search is stopped
+        Return True if the instance is settled
+        '''
+        if self.cdcl is None: # assumptions are unit clauses for CDCL
+            self.cdcl = CDCL(list(self.list_clauses) + [[literal] for literal in self.frozen.values()], self.nvars)
+        if self.best_found_assignment is not None:
+            self.cdcl.set_phases(self.best_found_assignment)
+        result = self.cdcl.solve(max_conflicts)
+        if result is True:
+            self.assignment = self.cdcl.model()
+        elif result is False:
+            self.proven_unsat = True
+            self.stop()
+        return result is not None
+
+    def stop(self):
+        '''
+        Exhaust the budget => every solver leaves its loops at the next check
+        Sticky until changed(): a try begun afterwards is empty whatever its drivers set (see begin_try)
+        '''
+        if self.saved_limits is None:
+            self.saved_limits = (self.MAX_TRIES, self.MAX_FLIPS)
+        self.MAX_TRIES = self.nb_tries
+        self.MAX_FLIPS = self.nb_flips
+
+    def exchange(self):
+        # Assignment to restart from proposed by a driver (e.g. elite of a cooperative search), None otherwise
+        for driver in self.drivers:
+            assignment = driver.exchange(self)
+            if assignment is not None:
+                return assignment
+        return None
+
+    '''
+    Incremental API
+    - new_var(), add_clause(), add_clauses(): the occurrence index, clause costs, break/make scores
+      and unsat clauses are updated in place for the current assignment
+    - add_clause(..., activation=True): clause C is added as (C or -a) with a new activation variable a,
+      enable(a) / disable(a) assume a / -a (disabled clause = satisfied by -a)
+    - assume(literals): variables of literals are frozen to these values for the next solve()
+    Next solve() warm-starts from the current assignment, preprocessed solvers are not incremental
+    '''
+
+    def resize(self):
+        # Variables and/or clauses have been added: grow per variable / per clause structures of the solver
+        self.age.resize(self.nvars)
+        if hasattr(self, 'tabu'):
+            self.tabu.resize(self.nvars)
+
+    def new_var(self):
+        assert self.preprocessor is None and not self.formula.read_only
+        self.nvars += 1
+        self.formula.nvars = self.nvars
+        x = self.nvars
+        if len(self.pool) > 0:
+            self.pool[x] = []
+            self.pool[-x] = []
+        self.break_score = np.append(self.break_score, 0.0)
+        self.make_score = np.append(self.make_score, 0.0)
+        if len(self.assignment) == x - 1:
+            self.assignment.append(-x)
+        self.resize()
+        self.changed()
+        return x
+
+    def add_clause(self, clause, weight=1, activation=False):
+        '''
+        Return the activation variable if activation, otherwise the id of the new clause
+        '''
+        if activation:
+            a = self.new_var()
+            self.add_clauses([list(clause) + [-a]], [weight])
+            self.enable(a)
+            return a
+        return self.add_clauses([clause], [weight])[0]
+
+    def add_clauses(self, clauses, weights=None):
+        assert self.preprocessor is None and not self.formula.read_only
+        if weights is None:
+            weights = [1 for _ in clauses]
+        clauses = [list(dict.fromkeys(clause)) for clause in clauses]
+        for clause in clauses:
+            assert len(clause) > 0
+            while max(abs(literal) for literal in clause) > self.nvars:
+                self.new_var()
+        first = len(self.list_clauses)
+        ids = list(range(first, first + len(clauses)))
+        self.list_clauses.extend(clauses) # shared with self.formula
+        self.formula.weights.extend(weights)
+        self.weights = np.concatenate((self.weights, np.array(weights, dtype=np.int64)))
+        self.score_weights = np.concatenate((self.score_weights, np.array(weights, dtype=np.float64)))
+        self.costs = np.concatenate((self.costs, np.zeros(len(clauses), dtype=self.costs.dtype)))
+        self.unsat_position.extend(-1 for _ in clauses)
+        if len(self.pool) > 0:
+            for i, clause in zip(ids, clauses):
+                for literal in clause:
+                    self.pool[literal].append(i)
+        if len(self.assignment) == self.nvars:
+            for i, clause in zip(ids, clauses):
+                true_literals = [literal for literal in clause if self.assignment[abs(literal)-1] == literal]
+                self.costs[i] = len(true_literals)
+                w = self.score_weights[i]
+                if len(true_literals) == 0:
+                    self.add_unsat(i)
+                    self.unsat_weight += self.weights[i]
+                    for literal in clause:
+                        self.make_score[abs(literal)] += w
+                elif len(true_literals) == 1:
+                    self.break_score[abs(true_literals[0])] += w
+        self.resize()
+        self.changed()
+        return ids
+
+    def assume(self, literals):
+        '''
+        Replace the assumptions: each literal is fixed to true during the next solve() calls
+        '''
+        for x in self.frozen:
+            self.break_score[x] -= self.FROZEN_PENALTY
+        self.frozen = dict()
+        for literal in literals:
+            self.frozen[abs(literal)] = literal
+            self.break_score[abs(literal)] += self.FROZEN_PENALTY
+        if len(self.assignment) == self.nvars and any(self.assignment[x-1] != l for x, l in self.frozen.items()):
+            self.apply_assumptions()
+            self.initialize_cost()
+        self.changed()
+
+    def enable(self, a):
+        assumptions = [literal for x, literal in self.frozen.items() if x != abs(a)]
+        self.assume(assumptions + [a])
+
+    def disable(self, a):
+        assumptions = [literal for x, literal in self.frozen.items() if x != abs(a)]
+        self.assume(assumptions + [-a])
+
+    def apply_assumptions(self):
+        # Frozen variables take their assumed values in a new assignment (before initialize_cost)
+        for x, literal in self.frozen.items():
+            self.assignment[x-1] = literal
+
+    def changed(self):
+        '''
+        The formula (or the assumptions) changed => previous results are no longer valid,
+        the next solve() warm-starts from the current assignment
+        '''
+        if self.saved_limits is not None:
+            self.MAX_TRIES, self.MAX_FLIPS = self.saved_limits
+            self.saved_limits = None
+        for driver in self.drivers:
+            driver.reset(self)
+        self.nb_tries = 0
+        self.is_sat = False
+        self.proven_unsat = False
+        self.cdcl = None
+        self.best_found_cost = self.weights.sum() + 1
+        self.best_ref, self.best_copy, self.best_is_current = None, None, False
+        self.history = []
+        self.warm_start = True
+
+    def report(self, initial):
+        for driver in self.drivers:
+            driver.end_try(self, self.is_sat)
+        if self.complete is not None and not self.is_sat and not self.proven_unsat:
+            if self.run_complete():
+                self.is_sat = not self.proven_unsat
+        end = time.time()
+        print('Nb flips:  {0}      '.format(self.nb_flips))
+        print('Nb tries:  {0}      '.format(self.nb_tries))
+        print('CPU time:  {0:10.4f} s '.format(end-initial))
+        if self.verbose:
+            print('Memory:    {0:10.2f} MB'.format(sum(self.memory_footprint().values()) / 2**20))
+        if self.formula.is_weighted:
+            print('Best cost: {0}      '.format(self.best_found_cost))
+        if self.proven_unsat:
+            print('UNSAT')
+            return None
+        if self.is_sat:
+            print('SAT')
+            return list(self.model(self.assignment)) # copy: the solver may go on (incremental solving)
+        else:
+            print('UNKNOWN')
+            return None
+
+    def solve_anytime(self, callback=None):
+        '''
+        Run solve() and return (best cost, best assignment, history of improvements) when the budget expires
+        callback(cost, assignment, nb_flips, time) is called on every improvement of the best cost
+        (assignment is the current one of the solved formula: copy it to keep it, model() extends it to the input formula)
+        '''
+        self.callback = callback
+        self.start_time = time.time()
+        try:
+            self.solve()
+        finally:
+            self.callback = None
+        cost, best = self.best_found_cost, self.best_found_assignment
+        if self.is_sat: # e.g. model found by the complete solver
+            cost, best = 0, self.assignment
+        return cost, (self.model(best) if best is not None else None), self.history
+
+    def improvements(self):
+        '''
+        Generator version: yield (cost, assignment, nb_flips, time) for every improvement of the best cost,
+        search runs in a background thread (stopped if the generator is closed before the end of the search)
+        Assignments are extended to the input formula in the consumer, the search thread only copies them
+        '''
+        events = queue.Queue()
+        done = object()
+        def run():
+            try:
+                self.solve_anytime(lambda cost, assignment, flips, t: events.put((cost, list(assignment), flips, t)))
+            finally:
+                events.put(done)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                event = events.get()
+                if event is done:
+                    break
+                cost, assignment, flips, t = event
+                yield cost, self.model(assignment), flips, t
+        finally:
+            if thread.is_alive():
+                self.stop()
+            thread.join()
 
     def solve(self):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
@@ -0,0 +1,151 @@
+'''
+References
+[1] S. Cai and K. Su, “Local search for Boolean Satisfiability with configuration checking and subscore,” Artif. Intell., vol. 204, pp. 75–98, 2013, doi: 10.1016/j.artint.2013.09.001.
+[2] S. Cai, C. Luo, and K. Su, “CCAnr: A configuration checking based local search solver for non-random satisfiability,” in Theory and Applications of Satisfiability Testing - SAT 2015, 2015, vol. 9340, pp. 1–8, doi: 10.1007/978-3-319-24318-4_1.
+'''
+
+from clause_weighting import Clause_Weighting
+from indexed_set import Indexed_Set
+from parameters import Parameter
+import random
+import time
+
+class CCAnr(Clause_Weighting):
+    '''
+    Configuration checking (CC) local search
+    - Configuration of x = values of its neighbours (variables sharing a clause with x)
+    - x may be flipped only if its configuration has changed since its last flip (conf_changed[x])
+        - flip x => conf_changed[x] = False, conf_changed[y] = True for each neighbour y of x
+    - score = make - break (weighted by the dynamic clause weights)
+    - CCD variables (CC-decreasing) = score > 0 and conf_changed, kept in an Indexed_Set updated on every flip
+      (only x and its neighbours can change their score or configuration)
+    - Pick:
+        1. CCD not empty => best CCD variable, ties broken by age (oldest)
+        2. Aspiration => best significant decreasing variable (score > average clause weight), ties broken by age
+        3. Otherwise => update clause weights (+ initial weight for UNSAT clauses, smoothing if the average
+           weight exceeds gamma), then pick the oldest among best variables of a random UNSAT clause
+    '''
+
+    PARAMETERS = dict(Clause_Weighting.PARAMETERS,
+                      gamma=Parameter('int', (50, 2000), 300, log=True),
+                      rho=Parameter('real', (0.0, 1.0), 0.3))
+
+    def __init__(self, input_cnf_file, verbose, gamma=300, rho=0.3, **kwargs):
+        super(CCAnr, self).__init__(input_cnf_file, verbose, **kwargs)
+        self.gamma = gamma # threshold on average weight for smoothing
+        self.rho = rho
+        self.neighbors = []
+        self.conf_changed = [True for _ in range(self.nvars+1)]
+        self.ccd = Indexed_Set(self.nvars+1, self.compact)  # CC-decreasing variables
+        self.good = Indexed_Set(self.nvars+1, self.compact) # variables with score > 0
+        self.total_weight = 0
+
+    def resize(self):
+        super(CCAnr, self).resize()
+        self.ccd.resize(self.nvars+1)
+        self.good.resize(self.nvars+1)
+
+    def initialize_neighbors(self):
+        # Computed once from the occurrence index (pool)
+        self.neighbors = [[] for _ in range(self.nvars+1)]
+        for x in range(1, self.nvars+1):
+            nbrs = set()
+            for i in self.pool[x] + self.pool[-x]:
+                for literal in self.list_clauses[i]:
+                    nbrs.add(abs(literal))
+            nbrs.discard(x)
+            self.neighbors[x] = list(nbrs)
+
+    def initialize_candidates(self):
+        self.conf_changed = [True for _ in range(self.nvars+1)]
+        self.ccd.clear()
+        self.good.clear()
+        for x in range(1, self.nvars+1):
+            self.update_candidate(x)
+        self.total_weight = self.score_weights.sum()
+
+    def score(self, x):
+        return self.make_score[x] - self.break_score[x]
+
+    def update_candidate(self, x):
+        if self.score(x) > self.EPSILON:
+            self.good.add(x)
+            if self.conf_changed[x]:
+                self.ccd.add(x)
+            else:
+                self.ccd.remove(x)
+        else:
+            self.good.remove(x)
+            self.ccd.remove(x)
+
+    def flip(self, literal):
+        super(CCAnr, self).flip(literal)
+        x = abs(literal)
+        if self.frozen and x in self.frozen: # assumption => no-op move, configurations are unchanged
+            return
+        self.conf_changed[x] = False
+        self.update_candidate(x)
+        for y in self.neighbors[x]:
+            self.conf_changed[y] = True
+            self.update_candidate(y)
+
+    def set_weight(self, i, w):
+        old = self.score_weights[i]
+        super(CCAnr, self).set_weight(i, w) # may round w to the initial weight
+        self.total_weight += self.score_weights[i] - old
+        for literal in self.list_clauses[i]:
+            self.update_candidate(abs(literal))
+
+    def pick_best(self, variables):
+        '''
+        Variable with the best score, ties broken by age (least recently flipped)
+        '''
+        best, best_score = None, None
+        for x in variables:
+            s = self.score(x)
+            if best is None or s > best_score + self.EPSILON or \
+                    (s > best_score - self.EPSILON and self.age.is_older(x, best)):
+                best, best_score = x, s
+        return best, best_score
+
+    def update_weights(self):
+        for i in list(self.id_unsat_clauses):
+            self.set_weight(i, self.score_weights[i] + self.base_weights[i])
+        '''
+        Smoothing when the average weight exceeds gamma
+        Note: only raised clauses are smoothed, toward their initial weight (see SAPS)
+        '''
+        if self.total_weight > self.gamma * len(self.list_clauses):
+            for i in list(self.raised):
+                base = self.base_weights[i]
+                self.set_weight(i, base + self.rho * (self.score_weights[i] - base))
+
+    def solve(self):
+        initial =  time.time()
+        self.initialize_pool()
+        self.initialize_neighbors()
+        while self.nb_tries < self.MAX_TRIES and not self.is_sat:
+            self.generate()
+            self.reset_weights()
+            self.initialize_cost()
+            self.initialize_candidates()
+            while self.nb_flips < self.MAX_FLIPS and not self.is_sat:
+                if self.check() == 1: # if no unsat clause => finish
+                    self.is_sat = True
+                    break
+                if len(self.ccd) > 0:
+                    x, _ = self.pick_best(self.ccd)
+                    self.flip(x)
+                    continue
+                # Aspiration: significant decreasing variable, even if its configuration has not changed
+                x, score = self.pick_best(self.good)
+                if x is not None and score > self.total_weight / len(self.list_clauses):
+                    self.flip(x)
+                    continue
+                # Diversification
+                self.update_weights()
+                unsat_clause = self.list_clauses[random.choice(self.id_unsat_clauses)]
+                x, _ = self.pick_best(abs(literal) for literal in unsat_clause)
+                self.flip(x)
+
+        return self.report(initial)
@@ -0,0 +1,248 @@
+'''
+Complete solver used to settle the instances local search cannot (UNKNOWN)
+
+References
+[1] J. P. Marques-Silva and K. A. Sakallah, “GRASP: A search algorithm for propositional satisfiability,” IEEE Trans. Comput., vol. 48, no. 5, pp. 506–521, 1999, doi: 10.1109/12.769433.
+[2] M. W. Moskewicz, C. F. Madigan, Y. Zhao, L. Zhang, and S. Malik, “Chaff: Engineering an efficient SAT solver,” in Proc. Design Automation Conference, 2001, pp. 530–535, doi: 10.1145/378239.379017.
+[3] K. Pipatsrisawat and A. Darwiche, “A lightweight component caching scheme for satisfiability solvers,” in Theory and Applications of Satisfiability Testing - SAT 2007, 2007, vol. 4501, pp. 294–299, doi: 10.1007/978-3-540-72788-0_28.
+'''
+
+import heapq
+
+class CDCL:
+    '''
+    Conflict-driven clause learning
+    - Two watched literals per clause (positions 0 and 1 of the clause)
+    - First UIP learning and non chronological backjumping
+    - VSIDS-like activities (heap with lazy deletion), phase saving
+    - Luby restarts
+    solve() can be called several times with a budget of conflicts: learnt clauses, activities and phases
+    are kept => local search and CDCL can be interleaved. set_phases() seeds the phases, e.g. with
+    the best assignment found by local search.
+    '''
+
+    def __init__(self, clauses, nvars):
+        self.nvars = nvars
+        self.clauses = []
+        self.watches = dict() #key: literal -> id of clauses watching literal
+        for x in range(1, nvars+1):
+            self.watches[x] = []
+            self.watches[-x] = []
+        self.value = [0 for _ in range(nvars+1)] # +1 / -1 / 0 (unassigned)
+        self.level = [0 for _ in range(nvars+1)]
+        self.reason = [None for _ in range(nvars+1)]
+        self.phase = [-1 for _ in range(nvars+1)]
+        self.activity = [0.0 for _ in range(nvars+1)]
+        self.heap = [(0.0, x) for x in range(1, nvars+1)]
+        self.var_inc = 1.0
+        self.trail = []
+        self.trail_lim = [] # position in trail of each decision
+        self.qhead = 0
+        self.nb_conflicts = 0
+        self.is_unsat = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        '''
+        Only called at level 0
+        '''
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return
+        clause = [literal for literal in clause if self.literal_value(literal) != -1 or self.level[abs(literal)] > 0]
+        if any(self.literal_value(literal) == 1 for literal in clause):
+            return
+        if len(clause) == 0:
+            self.is_unsat = True
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        i = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(i)
+        self.watches[clause[1]].append(i)
+        return i
+
+    def literal_value(self, literal):
+        v = self.value[abs(literal)]
+        return v if literal > 0 else -v
+
+    def decision_level(self):
+        return len(self.trail_lim)
+
+    def enqueue(self, literal, reason):
+        x = abs(literal)
+        self.value[x] = 1 if literal > 0 else -1
+        self.level[x] = self.decision_level()
+        self.reason[x] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        '''
+        Return the id of a conflicting clause, None if no conflict
+        Clauses watching -literal (now false) look for a new watch, become unit or conflicting
+        '''
+        while self.qhead < len(self.trail):
+            false_literal = -self.trail[self.qhead]
+            self.qhead += 1
+            watchers = self.watches[false_literal]
+            kept = []
+            k = 0
+            while k < len(watchers):
+                i = watchers[k]
+                k += 1
+                clause = self.clauses[i]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.literal_value(clause[0]) == 1:
+                    kept.append(i)
+                    continue
+                for j in range(2, len(clause)):
+                    if self.literal_value(clause[j]) != -1:
+                        clause[1], clause[j] = clause[j], clause[1]
+                        self.watches[clause[1]].append(i)
+                        break
+                else:
+                    kept.append(i)
+                    if self.literal_value(clause[0]) == -1: # conflict
+                        kept.extend(watchers[k:])
+                        self.watches[false_literal] = kept
+                        self.qhead = len(self.trail)
+                        return i
+                    self.enqueue(clause[0], i)
+            self.watches[false_literal] = kept
+        return None
+
+    def bump(self, x):
+        self.activity[x] += self.var_inc
+        if self.activity[x] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[y], y) for y in range(1, self.nvars+1) if self.value[y] == 0]
+            heapq.heapify(self.heap)
+        if self.value[x] == 0:
+            heapq.heappush(self.heap, (-self.activity[x], x))
+
+    def analyze(self, conflict):
+        '''
+        First UIP: resolve the conflicting clause with the reasons of the literals of the current level
+        until only 1 literal of the current level is left
+        Return the learnt clause (asserting literal first) and the backjump level
+        '''
+        seen = set()
+        learnt = [None]
+        counter = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in clause:
+                if literal is not None and q == literal:
+                    continue
+                x = abs(q)
+                if x not in seen and self.level[x] > 0:
+                    seen.add(x)
+                    self.bump(x)
+                    if self.level[x] == self.decision_level():
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.clauses[self.reason[abs(literal)]]
+        learnt[0] = -literal
+        self.var_inc /= 0.95
+        if len(learnt) == 1:
+            return learnt, 0
+        # second watch = literal of the highest level among the others
+        k = max(range(1, len(learnt)), key=lambda j: self.level[abs(learnt[j])])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def backtrack(self, level):
+        if self.decision_level() <= level:
+            return
+        for literal in reversed(self.trail[self.trail_lim[level]:]):
+            x = abs(literal)
+            self.phase[x] = self.value[x] # phase saving
+            self.value[x] = 0
+            self.reason[x] = None
+            heapq.heappush(self.heap, (-self.activity[x], x))
+        del self.trail[self.trail_lim[level]:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pick_branching_literal(self):
+        while len(self.heap) > 0:
+            _, x = heapq.heappop(self.heap)
+            if self.value[x] == 0:
+                return x * self.phase[x]
+        return None
+
+    def set_phases(self, assignment):
+        # assignment is a list of literals, i.e. assignment[x-1] = x or -x
+        for literal in assignment:
+            self.phase[abs(literal)] = 1 if literal > 0 else -1
+
+    def model(self):
+        return [x * (self.value[x] if self.value[x] != 0 else self.phase[x]) for x in range(1, self.nvars+1)]
+
+    @staticmethod
+    def luby(i):
+        # i-th element (from 1) of the Luby sequence 1 1 2 1 1 2 4 1 1 2 ...
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+        while (1 << k) - 1 != i:
+            i -= (1 << (k-1)) - 1
+            k = 1
+            while (1 << k) - 1 < i:
+                k += 1
+        return 1 << (k-1)
+
+    def solve(self, max_conflicts=None, restart_base=100):
+        '''
+        Return True (SAT, see model()), False (UNSAT) or None (budget of conflicts exhausted)
+        '''
+        if self.is_unsat:
+            return False
+        self.backtrack(0)
+        budget = self.nb_conflicts + max_conflicts if max_conflicts is not None else None
+        nb_restarts = 0
+        while True:
+            nb_restarts += 1
+            restart_limit = self.nb_conflicts + restart_base * self.luby(nb_restarts)
+            while True:
+                conflict = self.propagate()
+                if conflict is not None:
+                    self.nb_conflicts += 1
+                    if self.decision_level() == 0:
+                        self.is_unsat = True
+                        return False
+                    learnt, level = self.analyze(conflict)
+                    self.backtrack(level)
+                    if len(learnt) == 1:
+                        self.enqueue(learnt[0], None)
+                    else:
+                        self.enqueue(learnt[0], self.attach(learnt))
+                    continue
+                if budget is not None and self.nb_conflicts >= budget:
+                    self.backtrack(0)
+                    return None
+                if self.nb_conflicts >= restart_limit:
+                    self.backtrack(0)
+                    break
+                literal = self.pick_branching_literal()
+                if literal is None:
+                    return True
+                self.trail_lim.append(len(self.trail))
+                self.enqueue(literal, None)
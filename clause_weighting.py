@@ -0,0 +1,164 @@
+'''
+References
+[1] F. Hutter, D. A. D. Tompkins, and H. H. Hoos, “Scaling and probabilistic smoothing: Efficient dynamic local search for SAT,” in Principles and Practice of Constraint Programming - CP 2002, 2002, vol. 2470, pp. 233–248, doi: 10.1007/3-540-46135-3_16.
+[2] J. Thornton, D. N. Pham, S. Bain, and V. Ferreira, “Additive versus multiplicative clause weighting for SAT,” Proc. Natl. Conf. Artif. Intell., pp. 191–196, 2004.
+'''
+
+from base_solver import Base_Solver
+from indexed_set import Indexed_Set
+from parameters import Parameter
+import numpy as np
+import random
+import time
+
+class Clause_Weighting(Base_Solver):
+    '''
+    Dynamic local search with clause weights
+    - Greedy descent w.r.t. score = break - make, computed with the dynamic clause weights (score_weights)
+    - At a local minimum (no improving move) => change clause weights, so that this local minimum disappears
+    - Only clauses concerned by an update change their weight (UNSAT clauses, clauses whose weight has been raised)
+      and set_score_weight() only updates break/make of the variables of these clauses
+    - Objective (cost) still uses the weights of the instance
+    '''
+
+    def __init__(self, input_cnf_file, verbose, **kwargs):
+        super(Clause_Weighting, self).__init__(input_cnf_file, verbose, **kwargs)
+        self.base_weights = self.score_weights.copy() # initial weights = weights of the instance
+        self.raised = Indexed_Set(len(self.list_clauses), self.compact) # clauses whose weight differs from its initial one
+        self.EPSILON = 1e-9
+
+    def resize(self):
+        super(Clause_Weighting, self).resize()
+        n = len(self.list_clauses)
+        self.base_weights = np.concatenate((self.base_weights, self.score_weights[len(self.base_weights):n]))
+        self.raised.resize(n)
+
+    def reset_weights(self):
+        '''
+        Back to initial weights, break/make are recomputed by initialize_cost()
+        '''
+        for i in self.raised:
+            self.score_weights[i] = self.base_weights[i]
+        self.raised.clear()
+
+    def set_weight(self, i, w):
+        base = self.base_weights[i]
+        if abs(w - base) < 1e-3 * base: # close enough => back to initial weight
+            w = base
+        self.set_score_weight(i, w)
+        if w != base:
+            self.raised.add(i)
+        else:
+            self.raised.remove(i)
+
+    def candidate_vars(self):
+        variables = set()
+        for i in self.id_unsat_clauses:
+            for literal in self.list_clauses[i]:
+                variables.add(abs(literal))
+        return np.fromiter(variables, dtype=np.int64, count=len(variables))
+
+    def pick_best(self, variables):
+        '''
+        Variable minimizing break - make, ties broken randomly
+        '''
+        scores = self.break_score[variables] - self.make_score[variables]
+        best_score = scores.min()
+        ties = np.flatnonzero(scores <= best_score + self.EPSILON)
+        return int(variables[random.choice(ties)]), best_score
+
+    def escape(self, variables, x, score):
+        # Weight update at a local minimum, specific to each scheme
+        raise NotImplementedError
+
+    def solve(self):
+        initial =  time.time()
+        self.initialize_pool()
+        while self.nb_tries < self.MAX_TRIES and not self.is_sat:
+            self.generate()
+            self.reset_weights()
+            self.initialize_cost()
+            while self.nb_flips < self.MAX_FLIPS and not self.check():
+                '''
+                - Among all variables that occur in unsat clauses
+                - Flip the best one if it improves the weighted score
+                - Otherwise => local minimum => update clause weights
+                '''
+                variables = self.candidate_vars()
+                x, score = self.pick_best(variables)
+                if score < -self.EPSILON:
+                    self.flip(x)
+                else:
+                    self.escape(variables, x, score)
+            if self.check():
+                self.is_sat = True
+
+        return self.report(initial)
+
+
+class SAPS(Clause_Weighting):
+    '''
+    Scaling And Probabilistic Smoothing
+    - Local minimum => random walk step with probability wp
+    - Scaling: weights of UNSAT clauses are multiplied by alpha
+    - Smoothing (with probability p_smooth): w = rho*w + (1-rho)*w_0
+      Note: smoothing only applies to raised clauses and pulls them back toward their initial weight w_0
+      (instead of toward the mean weight of all clauses) => clauses never scaled up are not touched
+    '''
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      alpha=Parameter('real', (1.01, 2.0), 1.3, log=True),
+                      rho=Parameter('real', (0.0, 1.0), 0.8),
+                      p_smooth=Parameter('real', (0.0, 0.2), 0.05),
+                      wp=Parameter('real', (0.0, 0.1), 0.01))
+
+    def __init__(self, input_cnf_file, verbose, alpha=1.3, rho=0.8, p_smooth=0.05, wp=0.01, **kwargs):
+        super(SAPS, self).__init__(input_cnf_file, verbose, **kwargs)
+        self.alpha = alpha
+        self.rho = rho
+        self.p_smooth = p_smooth
+        self.wp = wp
+
+    def escape(self, variables, x, score):
+        if random.random() < self.wp:
+            self.flip(int(random.choice(variables)))
+        # Scaling
+        for i in self.id_unsat_clauses:
+            self.set_weight(i, self.score_weights[i] * self.alpha)
+        # Smoothing
+        if random.random() < self.p_smooth:
+            for i in list(self.raised):
+                base = self.base_weights[i]
+                self.set_weight(i, base + self.rho * (self.score_weights[i] - base))
+
+
+class PAWS(Clause_Weighting):
+    '''
+    Pure Additive Weighting Scheme
+    - Local minimum => take a flat move (score = 0) with probability p_flat
+    - Otherwise: weights of UNSAT clauses are increased by their initial weight (1 for CNF)
+    - Every max_inc increases: weights of all raised clauses are decreased by their initial weight
+    '''
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      p_flat=Parameter('real', (0.0, 0.5), 0.15),
+                      max_inc=Parameter('int', (2, 100), 10, log=True))
+
+    def __init__(self, input_cnf_file, verbose, p_flat=0.15, max_inc=10, **kwargs):
+        super(PAWS, self).__init__(input_cnf_file, verbose, **kwargs)
+        self.p_flat = p_flat
+        self.max_inc = max_inc
+        self.nb_increases = 0
+
+    def escape(self, variables, x, score):
+        if score <= self.EPSILON and random.random() < self.p_flat: # flat move
+            self.flip(x)
+            return
+        # Increase
+        for i in self.id_unsat_clauses:
+            self.set_weight(i, self.score_weights[i] + self.base_weights[i])
+        self.nb_increases += 1
+        # Decrease
+        if self.nb_increases % self.max_inc == 0:
+            for i in list(self.raised):
+                self.set_weight(i, self.score_weights[i] - self.base_weights[i])
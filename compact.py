@@ -0,0 +1,135 @@
+'''
+Compact memory layout for very large instances (Base_Solver(..., compact=True))
+
+Python lists cost 8 bytes per item plus ~28 bytes per int object (beyond the small cached ints), i.e.
+~200 bytes per 3-literal clause once the clauses and the occurrence index (pool) are built.
+In compact mode every per-clause / per-variable structure is a numpy array of the smallest type that fits:
+    - clauses and pool: Array_Formula (see shared_formula.py) on int32 CSR arrays, built by streaming the
+      DIMACS file by chunks (load_compact) => the formula is never held as Python lists
+    - weights of a CNF: one broadcast 1 (no memory), score weights: float32
+    - nb of true literals of each clause (costs): uint8 / uint16 (by the length of the longest clause)
+    - position of unsat clauses, per-clause metadata of the solvers (AMLS, WalkSAT/Tabu, clause weighting),
+      age of variables: int32 / int64 arrays
+Break / make scores (float64 per variable) and the assignment (list of literals) are kept as is.
+Compact formulas are read-only => no incremental API.
+
+    footprint(obj) => approximate nb of bytes (Base_Solver.memory_footprint() => breakdown by attribute)
+'''
+
+from dimacs_parser import print_statistics
+from formula import occurrence_arrays
+from shared_formula import Array_Formula
+from verifier import stream_clauses
+import numpy as np
+import sys
+import time
+
+def index_type(max_value):
+    return np.int32 if max_value < 2**31 else np.int64
+
+def counter_type(max_value):
+    # Smallest unsigned type holding counts in [0, max_value]
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+def build(clause_start, clause_lits, weights, nvars, top, is_weighted):
+    '''
+    Array_Formula on the smallest index types, weights = None for a CNF (every clause has weight 1)
+    '''
+    nclauses = len(clause_start) - 1
+    clause_start = clause_start.astype(index_type(len(clause_lits)), copy=False)
+    clause_lits = clause_lits.astype(index_type(nvars), copy=False)
+    occ_start, occ_clauses = occurrence_arrays(clause_start, clause_lits, nvars, index_type(nclauses))
+    if weights is None:
+        weights = np.broadcast_to(np.int64(1), (nclauses,))
+        top = nclauses + 1
+    return Array_Formula([clause_start, clause_lits, occ_start, occ_clauses, weights], nvars, top, is_weighted)
+
+def compact_formula(formula):
+    # Compact copy of a (list based) Formula
+    clause_start, clause_lits = formula.clause_arrays()
+    weights = np.asarray(formula.weights, dtype=np.int64) if formula.is_weighted else None
+    return build(clause_start, clause_lits, weights, formula.nvars, formula.top, formula.is_weighted)
+
+def remove_duplicates(clause_start, clause_lits):
+    # Duplicate literals of each clause are removed (first occurrence kept, order preserved)
+    lengths = np.diff(clause_start)
+    ids = np.repeat(np.arange(len(lengths)), lengths)
+    order = np.lexsort((clause_lits, ids))
+    duplicate = (ids[order[1:]] == ids[order[:-1]]) & (clause_lits[order[1:]] == clause_lits[order[:-1]])
+    if not duplicate.any():
+        return clause_start, clause_lits
+    keep = np.ones(len(clause_lits), dtype=bool)
+    keep[order[1:][duplicate]] = False
+    clause_start = np.zeros(len(lengths)+1, dtype=np.int64)
+    np.cumsum(np.bincount(ids[keep], minlength=len(lengths)), out=clause_start[1:])
+    return clause_start, clause_lits[keep]
+
+def load_compact(filename, verbose, chunk_size=100000):
+    '''
+    Read a CNF / WCNF file (same formats as dimacs_parser.parse_formula) into a compact Array_Formula
+    Clauses are parsed by chunks of chunk_size clauses => Python objects never exceed one chunk
+    '''
+    initial_time = time.time()
+    lengths, literals, weights = [], [], []
+    for clause_start, clause_lits, chunk_weights, hard in stream_clauses(filename, chunk_size):
+        if clause_start is None:
+            nvars, top, weighted = clause_lits, chunk_weights, hard
+            break
+        clause_start, clause_lits = remove_duplicates(clause_start, clause_lits)
+        lengths.append(np.diff(clause_start).astype(np.int32))
+        literals.append(clause_lits.astype(index_type(np.abs(clause_lits).max(initial=0))))
+        weights.append(chunk_weights)
+    lengths = np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int32)
+    clause_lits = np.concatenate(literals) if literals else np.zeros(0, dtype=np.int32)
+    del literals
+    clause_start = np.zeros(len(lengths)+1, dtype=index_type(len(clause_lits)))
+    np.cumsum(lengths, out=clause_start[1:])
+    nvars = max(nvars, int(np.abs(clause_lits).max()) if len(clause_lits) > 0 else 0)
+    if weighted:
+        weights = np.concatenate(weights) if weights else np.zeros(0, dtype=np.int64)
+        if top is None:
+            top = int(weights[weights > 0].sum()) + 1
+        weights[weights < 0] = top # clauses marked h
+    else:
+        weights = None
+    formula = build(clause_start, clause_lits, weights, nvars, top, weighted)
+    if verbose:
+        print_statistics(formula, time.time() - initial_time)
+    return formula
+
+
+def footprint(obj, seen=None, sample=1000):
+    '''
+    Approximate nb of bytes of obj and of everything it references (each object counted once):
+    numpy arrays (broadcast arrays: 1 item), lists / tuples / dicts / sets (items of long lists are sampled),
+    objects with __dict__ / __slots__. Not counted: ints in [-5, 256] (cached by Python) and arrays on
+    buffers the process does not own (shared memory block, memory-mapped file of a shared formula)
+    '''
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or obj is None or isinstance(obj, (bool, type)) or callable(obj):
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        if obj.base is not None and not obj.flags.owndata: # view: counted through its base
+            return footprint(obj.base, seen) if isinstance(obj.base, np.ndarray) else 0
+        return obj.nbytes if 0 not in obj.strides else obj.itemsize
+    if isinstance(obj, int):
+        return 0 if -5 <= obj <= 256 else sys.getsizeof(obj)
+    if isinstance(obj, (float, str, bytes, np.generic)):
+        return sys.getsizeof(obj)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        items = list(obj.keys()) + list(obj.values())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = list(obj)
+    else:
+        items = [getattr(obj, name) for name in getattr(type(obj), '__slots__', ()) if hasattr(obj, name)]
+        items += list(getattr(obj, '__dict__', {}).values())
+    if len(items) > 2*sample and isinstance(obj, (list, tuple)): # estimate from evenly spaced items
+        step = len(items) // sample
+        return size + step * sum(footprint(item, seen) for item in items[::step][:sample])
+    return size + sum(footprint(item, seen) for item in items)
@@ -0,0 +1,249 @@
+'''
+Cooperative parallel search: workers share their best assignments through an elite pool
+
+Each worker runs its own solver on the shared formula (see shared_formula.py) and, at its exchange points
+(every restart, every perturbation of IRoTS / AMLS, see Elite_Exchange, the driver added to its solver):
+    - publishes its best assignment if it improved since the last exchange
+    - draws an elite assignment, better than its current one and far enough from it, to restart from
+Assignments are bit-packed (1 bit per variable) in a multiprocessing.shared_memory block. The lock is only held
+to copy a few bytes in / out of the block => no worker ever waits for another one to finish anything.
+
+Diversity (Hamming distance d): a published assignment closer than min_distance to an elite only replaces it
+if it is better, otherwise it replaces the worst elite (if better). Draws skip elites closer than min_distance.
+
+References
+[1] T. G. Crainic and M. Toulouse, “Parallel strategies for meta-heuristics,” in Handbook of Metaheuristics, 2003, vol. 57, pp. 475–513, doi: 10.1007/0-306-48056-5_17.
+[2] M. Lozano and C. García-Martínez, “Hybrid metaheuristics with evolutionary algorithms specializing in intensification and diversification: Overview and progress report,” Comput. Oper. Res., vol. 37, no. 3, pp. 481–497, 2010, doi: 10.1016/j.cor.2009.02.010.
+'''
+
+from base_solver import Driver
+from dimacs_parser import parse_formula
+from shared_formula import Shared_Formula
+from utils import build_solver
+from multiprocessing import shared_memory
+import multiprocessing as mp
+import numpy as np
+import contextlib
+import queue
+import io
+import random
+
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+
+class Elite_Pool:
+    '''
+    Shared block: int64 header [done, nb of publications], int64 costs[size] (EMPTY if free slot),
+    then size bit-packed assignments
+    Picklable: pass it to worker processes at their creation (multiprocessing.Process args)
+    '''
+
+    EMPTY = np.iinfo(np.int64).max
+
+    def __init__(self, nvars, size=8, min_distance=None, context=None):
+        self.nvars = nvars
+        self.size = size
+        self.min_distance = min_distance if min_distance is not None else max(1, nvars // 20)
+        self.nbytes = (nvars + 7) // 8
+        self.lock = (context or mp).Lock()
+        self.shm = shared_memory.SharedMemory(create=True, size=8*(2+size) + size*self.nbytes)
+        self.owner = True
+        self.map()
+        self.header[:] = 0
+        self.costs[:] = self.EMPTY
+
+    def map(self):
+        self.header = np.ndarray(2, dtype=np.int64, buffer=self.shm.buf)
+        self.costs = np.ndarray(self.size, dtype=np.int64, buffer=self.shm.buf, offset=16)
+        self.bits = np.ndarray((self.size, self.nbytes), dtype=np.uint8, buffer=self.shm.buf, offset=8*(2+self.size))
+
+    def __getstate__(self):
+        return (self.shm.name, self.nvars, self.size, self.min_distance, self.lock)
+
+    def __setstate__(self, state):
+        name, self.nvars, self.size, self.min_distance, self.lock = state
+        self.nbytes = (self.nvars + 7) // 8
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False) # Python >= 3.13
+        except TypeError:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = False
+        self.map()
+
+    def close(self):
+        # Views are released before the block
+        del self.header, self.costs, self.bits
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def pack(self, assignment):
+        # assignment is a list of literals, i.e. assignment[x-1] = x or -x
+        return np.packbits(np.asarray(assignment) > 0)
+
+    def unpack(self, bits):
+        values = np.unpackbits(bits, count=self.nvars).astype(bool)
+        return [x if v else -x for x, v in zip(range(1, self.nvars+1), values)]
+
+    def distances(self, bits, elites):
+        return POPCOUNT[np.bitwise_xor(elites, bits)].sum(axis=1)
+
+    def is_done(self):
+        # An assignment of cost 0 has been published (SAT)
+        return self.header[0] != 0
+
+    def set_done(self):
+        self.header[0] = 1
+
+    def publish(self, assignment, cost):
+        bits = self.pack(assignment)
+        with self.lock:
+            if cost == 0:
+                self.header[0] = 1
+            self.header[1] += 1
+            used = self.costs != self.EMPTY
+            distances = self.distances(bits, self.bits)
+            close = np.flatnonzero(used & (distances < self.min_distance))
+            if len(close) > 0: # too similar => only replaces the closest elite
+                j = close[np.argmin(distances[close])]
+            elif not used.all():
+                j = np.flatnonzero(~used)[0]
+            else:
+                j = np.argmax(self.costs)
+            if cost < self.costs[j]:
+                self.costs[j] = cost
+                self.bits[j] = bits
+
+    def elites(self):
+        # Snapshot (costs, bits) of the used slots
+        with self.lock:
+            costs, bits = self.costs.copy(), self.bits.copy()
+        used = costs != self.EMPTY
+        return costs[used], bits[used]
+
+    def draw(self, assignment=None, cost=None):
+        '''
+        Binary tournament between the elites which are better than cost (if given) and
+        at distance >= min_distance from assignment (if given). Return None if there is none
+        '''
+        costs, bits = self.elites()
+        keep = np.ones(len(costs), dtype=bool)
+        if cost is not None:
+            keep &= costs < cost
+        if assignment is not None and len(costs) > 0:
+            keep &= self.distances(self.pack(assignment), bits) >= self.min_distance
+        candidates = np.flatnonzero(keep)
+        if len(candidates) == 0:
+            return None
+        i, j = random.choice(candidates), random.choice(candidates)
+        return self.unpack(bits[i if costs[i] <= costs[j] else j])
+
+    def best(self):
+        # (cost, assignment) of the best elite, (None, None) if the pool is empty
+        costs, bits = self.elites()
+        if len(costs) == 0:
+            return None, None
+        i = np.argmin(costs)
+        return int(costs[i]), self.unpack(bits[i])
+
+
+class Elite_Exchange(Driver):
+    '''
+    Driver of a worker's solver (see base_solver.Driver): at each exchange, publish the best assignment if it
+    improved since the last exchange, then return an elite assignment better than the current one and far
+    enough from it (None if there is none). Stop the search once another worker found a model
+    '''
+
+    def __init__(self, elite):
+        self.elite = elite
+        self.published_cost = None
+
+    def exchange(self, solver):
+        if self.elite.is_done():
+            solver.stop()
+            return None
+        best = solver.best_found_assignment
+        if best is not None and (self.published_cost is None or solver.best_found_cost < self.published_cost):
+            self.published_cost = solver.best_found_cost
+            self.elite.publish(best, solver.best_found_cost)
+        return self.elite.draw(solver.assignment, solver.cost())
+
+    def reset(self, solver):
+        self.published_cost = None
+
+
+def run_worker(index, handle, solver_class, kwargs, elite, results, seed):
+    # Report: (index, solver name, cost, model, nb of tries, error), errors are reported instead of raised
+    try:
+        random.seed(seed)
+        np.random.seed(seed)
+        solver = build_solver(solver_class, handle, 0, elite=elite, **kwargs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cost, model, _ = solver.solve_anytime()
+        if cost == 0:
+            elite.set_done()
+        results.put((index, solver_class.__name__, int(cost), model, solver.nb_tries, None))
+    except Exception as e:
+        results.put((index, solver_class.__name__, None, None, 0, repr(e)))
+
+
+def collect_reports(workers, results, poll=0.5):
+    '''
+    One report per worker: a worker which died without reporting (killed, crashed interpreter) gets an error report
+    '''
+    reports = [None for _ in workers]
+    while any(report is None for report in reports):
+        try:
+            report = results.get(timeout=poll)
+            reports[report[0]] = report
+            continue
+        except queue.Empty:
+            pass
+        for index, worker in enumerate(workers):
+            if reports[index] is None and not worker.is_alive():
+                try: # its report may have been queued just before it exited
+                    while True:
+                        report = results.get_nowait()
+                        reports[report[0]] = report
+                except queue.Empty:
+                    pass
+                if reports[index] is None:
+                    name = worker.name
+                    reports[index] = (index, name, None, None, 0, 'exit code {0}'.format(worker.exitcode))
+    return [report[1:] for report in reports]
+
+
+def solve_cooperative(input_cnf_file, solvers, elite_size=8, min_distance=None, seed=None):
+    '''
+    Run the solvers (list of (solver class, kwargs), one process each) cooperatively on the input formula
+    Return (best cost, best model, [(solver name, cost, model, nb of tries, error) for each worker])
+    Workers stop at their next exchange once one of them found a model, otherwise when their budget expires
+    A failed worker reports cost None and its error, RuntimeError if every worker failed
+    '''
+    formula = parse_formula(input_cnf_file, 0)
+    context = mp.get_context()
+    rng = random.Random(seed)
+    with Shared_Formula(formula) as shared:
+        elite = Elite_Pool(formula.nvars, elite_size, min_distance, context)
+        workers, done = [], False
+        try:
+            results = context.Queue()
+            workers = [context.Process(target=run_worker, args=(index, shared.handle, solver_class, kwargs, elite,
+                                                               results, rng.randrange(2**31)),
+                                       name=solver_class.__name__)
+                       for index, (solver_class, kwargs) in enumerate(solvers)]
+            for worker in workers:
+                worker.start()
+            reports = collect_reports(workers, results)
+            done = True
+        finally:
+            for worker in workers:
+                if not done and worker.is_alive():
+                    worker.terminate()
+                if worker.pid is not None:
+                    worker.join()
+            elite.close()
+    solved = [report for report in reports if report[1] is not None]
+    if len(solved) == 0:
+        raise RuntimeError('every worker failed: {0}'.format('; '.join(report[4] for report in reports)))
+    best = min(solved, key=lambda report: report[1])
+    return best[1], best[2], reports
@@ -4,6 +4,7 @@
     Reference: https://github.com/marcmelis/dpll-sat/blob/master/solvers/original_dpll.py 
 '''
 import time
+from formula import Formula
 
 def parse(filename, verbose):
     initial_time = time.time()
@@ -30,6 +31,94 @@ def parse(filename, verbose):
 
     return clauses, int(nvars)
 
+def read_clauses(lines, info):
+    '''
+    DIMACS tokenizer shared by parse_formula and verifier.stream_clauses
+        - p cnf nvars nclauses               => no weights
+        - p wcnf nvars nclauses [top]        => first number of each clause is its weight
+        - no p line                          => new WCNF format, first token of each clause is its weight or "h" (hard)
+    A clause may span several lines and ends by 0, lines after % are ignored (end of SATLIB instances)
+    Yield (weight, literals) for each non-empty clause: weight None (CNF), "h" or an int, literals as ints
+    (duplicates kept). info (dict) receives nvars (of the p line, 0 if none), top (None if not given) and weighted
+    '''
+    info.update(nvars=0, top=None, weighted=False)
+    header = False
+    tokens = [] # tokens of the current clause
+    for line in lines:
+        if line.startswith('c'): continue
+        if line.startswith('%'): break
+        if line.startswith('p'):
+            fields = line.split()
+            header = True
+            info['weighted'] = fields[1] == 'wcnf'
+            info['nvars'] = int(fields[2])
+            if info['weighted'] and len(fields) > 4:
+                info['top'] = int(fields[4])
+            continue
+        if not header:
+            header = True
+            info['weighted'] = True
+        weighted = info['weighted']
+        for token in line.split():
+            if (weighted and len(tokens) == 0) or token != '0':
+                tokens.append(token)
+                continue
+            # 0 => end of clause
+            weight = None
+            if weighted:
+                weight = tokens[0] if tokens[0] == 'h' else int(tokens[0])
+            clause = [int(x) for x in (tokens[1:] if weighted else tokens)]
+            tokens = []
+            if len(clause) > 0:
+                yield weight, clause
+
+def parse_formula(filename, verbose):
+    '''
+    Read a CNF or a WCNF (MaxSAT) file and return a Formula (formats: see read_clauses)
+        - CNF => every clause has weight 1
+        - WCNF => weight >= top => hard, clauses marked h have weight top (default: sum of soft weights + 1)
+    Duplicate literals are removed
+    filename may also be an open text file (e.g. io.StringIO of a DIMACS payload)
+    '''
+    initial_time = time.time()
+    lines = open(filename) if isinstance(filename, str) else filename
+    info = dict()
+    clauses, weights, hard = [], [], []
+    nvars = 0
+    for weight, literals in read_clauses(lines, info):
+        clause = list(dict.fromkeys(literals))
+        clauses.append(clause)
+        hard.append(weight == 'h')
+        weights.append(1 if weight is None or weight == 'h' else weight)
+        for literal in clause:
+            nvars = max(nvars, abs(literal))
+    nvars = max(nvars, info['nvars'])
+    top = info['top']
+
+    if info['weighted']:
+        if top is None:
+            top = sum(w for w, h in zip(weights, hard) if not h) + 1
+        weights = [top if h else w for w, h in zip(weights, hard)]
+        formula = Formula(clauses, nvars, weights, top)
+    else:
+        formula = Formula(clauses, nvars)
+
+    if verbose:
+        print_statistics(formula, time.time() - initial_time)
+
+    return formula
+
+def print_statistics(formula, parse_time):
+    print('=====================[ Problem Statistics ]=====================')
+    print('|                                                              |')
+    print('|   Nb of variables:      {0:10d}                           |'.format(formula.nvars))
+    print('|   Nb of clauses:        {0:10d}                           |'.format(formula.nclauses))
+    if formula.is_weighted:
+        print('|   Nb of hard clauses:   {0:10d}                           |'.format(formula.nb_hard()))
+        print('|   Top weight:           {0:10d}                           |'.format(formula.top))
+    print('|   Parse time:      {0:10.4f}s                               |'.format(parse_time))
+    print('|                                                              |')
+
 # # Unit test 
 # cnf, maxvar = parse("cnf_instances/test.cnf")
 # print(cnf, maxvar)
@@ -0,0 +1,96 @@
+'''
+Instance features for algorithm selection (see selector.py)
+
+Computed from the flat clause arrays of the parsed formula (one vectorized pass), then a short probing run:
+    - size:        nb of variables, nb of clauses, clauses / variables ratio
+    - clauses:     length mean / std / min / max, fraction of unit, binary, ternary and Horn clauses
+                   (Horn = at most one positive literal), fraction of positive literals
+    - variables:   occurrence degree mean / std / min / max, coefficient of variation
+    - weights:     weighted (MaxSAT) or not, fraction of hard clauses
+    - probing:     WalkSAT/Random Walk for probe_tries tries of probe_flips flips, with a fixed seed:
+                   best cost (relative to the total weight), solved or not, flips to reach the best cost
+                   (relative to the budget) and mean cost improvement per flip
+
+References
+[1] L. Xu, F. Hutter, H. H. Hoos, and K. Leyton-Brown, “SATzilla: Portfolio-based algorithm selection for SAT,” J. Artif. Intell. Res., vol. 32, pp. 565–606, 2008, doi: 10.1613/jair.2490.
+[2] F. Hutter, L. Xu, H. H. Hoos, and K. Leyton-Brown, “Algorithm runtime prediction: Methods & evaluation,” Artif. Intell., vol. 206, pp. 79–111, 2014, doi: 10.1016/j.artint.2013.10.003.
+'''
+
+from dimacs_parser import parse_formula
+from formula import Formula
+from walksat import WalkSAT
+import numpy as np
+import contextlib
+import random
+import io
+
+FEATURE_NAMES = ['nvars', 'nclauses', 'ratio',
+                 'length_mean', 'length_std', 'length_min', 'length_max',
+                 'unit_fraction', 'binary_fraction', 'ternary_fraction', 'horn_fraction', 'positive_fraction',
+                 'degree_mean', 'degree_std', 'degree_min', 'degree_max', 'degree_cv',
+                 'weighted', 'hard_fraction',
+                 'probe_cost', 'probe_solved', 'probe_progress', 'probe_slope']
+
+def static_features(formula):
+    clause_start, clause_lits = formula.clause_arrays()
+    nvars, nclauses = formula.nvars, len(clause_start) - 1
+    lengths = np.diff(clause_start)
+    degrees = np.bincount(np.abs(clause_lits), minlength=nvars+1)[1:]
+    if nclauses > 0:
+        nb_positive = np.add.reduceat(clause_lits > 0, clause_start[:-1], dtype=np.int64)
+    else:
+        nb_positive = np.zeros(0, dtype=np.int64)
+    weights = np.asarray(formula.weights, dtype=np.int64)
+
+    def stats(values):
+        if len(values) == 0:
+            return 0.0, 0.0, 0.0, 0.0
+        return float(values.mean()), float(values.std()), float(values.min()), float(values.max())
+
+    features = dict(zip(['nvars', 'nclauses', 'ratio'], [nvars, nclauses, nclauses / max(nvars, 1)]))
+    features.update(zip(['length_mean', 'length_std', 'length_min', 'length_max'], stats(lengths)))
+    for name, length in (('unit_fraction', 1), ('binary_fraction', 2), ('ternary_fraction', 3)):
+        features[name] = float(np.mean(lengths == length)) if nclauses > 0 else 0.0
+    features['horn_fraction'] = float(np.mean(nb_positive <= 1)) if nclauses > 0 else 0.0
+    features['positive_fraction'] = float(np.mean(clause_lits > 0)) if len(clause_lits) > 0 else 0.0
+    features.update(zip(['degree_mean', 'degree_std', 'degree_min', 'degree_max'], stats(degrees)))
+    features['degree_cv'] = features['degree_std'] / features['degree_mean'] if features['degree_mean'] > 0 else 0.0
+    features['weighted'] = float(formula.is_weighted)
+    features['hard_fraction'] = float(np.mean(weights >= formula.top)) if formula.is_weighted and nclauses > 0 else 0.0
+    return features
+
+def probe_features(formula, probe_flips=1000, probe_tries=2, seed=0):
+    '''
+    Short WalkSAT/Random Walk run, the random state of the caller is restored afterwards
+    '''
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        solver = WalkSAT(formula, 0, random_walk=True)
+        solver.MAX_TRIES = probe_tries
+        solver.MAX_FLIPS = probe_flips
+        with contextlib.redirect_stdout(io.StringIO()):
+            cost, _, history = solver.solve_anytime()
+    finally:
+        random.setstate(state)
+    total = max(int(np.asarray(formula.weights, dtype=np.int64).sum()), 1)
+    first, flips = (history[0][0], history[-1][1]) if history else (cost, 0)
+    return {'probe_cost': float(cost) / total,
+            'probe_solved': float(solver.is_sat),
+            'probe_progress': flips / probe_flips,
+            'probe_slope': float(first - cost) / total / max(flips, 1)}
+
+def extract_features(input_cnf_file, probe_flips=1000, probe_tries=2, seed=0):
+    '''
+    input_cnf_file: path of a CNF / WCNF file or a Formula, return key: name (FEATURE_NAMES) -> value
+    '''
+    formula = input_cnf_file if isinstance(input_cnf_file, Formula) else parse_formula(input_cnf_file, 0)
+    features = static_features(formula)
+    if formula.nclauses > 0 and probe_flips > 0:
+        features.update(probe_features(formula, probe_flips, probe_tries, seed))
+    else:
+        features.update(dict.fromkeys(['probe_cost', 'probe_slope', 'probe_progress'], 0.0), probe_solved=1.0)
+    return features
+
+def feature_vector(features):
+    return np.array([features.get(name, 0.0) for name in FEATURE_NAMES], dtype=np.float64)
@@ -0,0 +1,85 @@
+'''
+Formula: clauses, number of variables and clause weights (MaxSAT)
+    - CNF: every clause has weight 1
+    - WCNF: soft clauses have their own weight, hard clauses have weight top
+Cost of an assignment = sum of weights of UNSAT clauses
+'''
+
+import numpy as np
+
+class Formula:
+
+    read_only = False # see shared_formula.py
+
+    def __init__(self, clauses, nvars, weights=None, top=None):
+        self.clauses = clauses
+        self.nvars = nvars
+        self.is_weighted = weights is not None
+        if weights is None:
+            weights = [1 for _ in clauses]
+        assert len(weights) == len(clauses)
+        self.weights = weights
+        if top is None:
+            top = sum(weights) + 1
+        self.top = top # any clause with weight >= top is hard
+
+    @property
+    def nclauses(self):
+        return len(self.clauses)
+
+    def is_hard(self, i):
+        return self.weights[i] >= self.top
+
+    def nb_hard(self):
+        return sum(1 for w in self.weights if w >= self.top)
+
+    def satisfied(self, assignment):
+        '''
+        Vectorized check (one pass over the literals): satisfied[i] <=> clause i is satisfied by assignment
+        '''
+        clause_start, clause_lits = self.clause_arrays()
+        if len(clause_lits) == 0:
+            return np.zeros(self.nclauses, dtype=bool)
+        value = np.zeros(self.nvars+1, dtype=np.int64)
+        assignment = np.asarray(assignment, dtype=np.int64)
+        value[np.abs(assignment)] = np.sign(assignment)
+        true_literals = value[np.abs(clause_lits)] * clause_lits > 0
+        return np.logical_or.reduceat(true_literals, clause_start[:-1])
+
+    def cost(self, assignment):
+        '''
+        Weighted number of UNSAT clauses (assignment is a list of literals, i.e. assignment[x-1] = x or -x)
+        '''
+        cost = 0
+        for clause, w in zip(self.clauses, self.weights):
+            if not any(assignment[abs(literal)-1] == literal for literal in clause):
+                cost += w
+        return cost
+
+    def clause_arrays(self):
+        # literals of clause i: clause_lits[clause_start[i]:clause_start[i+1]]
+        lengths = np.array([len(clause) for clause in self.clauses], dtype=np.int64)
+        clause_start = np.zeros(len(self.clauses)+1, dtype=np.int64)
+        np.cumsum(lengths, out=clause_start[1:])
+        clause_lits = np.fromiter((literal for clause in self.clauses for literal in clause),
+                                  dtype=np.int64, count=int(clause_start[-1]))
+        return clause_start, clause_lits
+
+    def flat_arrays(self):
+        '''
+        Array (CSR) storage for compiled kernels, literal l has index 2*|l| + (l < 0)
+            - literals of clause i: clause_lits[clause_start[i]:clause_start[i+1]]
+            - clauses containing literal l: occ_clauses[occ_start[k]:occ_start[k+1]], k = index of l
+        '''
+        clause_start, clause_lits = self.clause_arrays()
+        return (clause_start, clause_lits) + occurrence_arrays(clause_start, clause_lits, self.nvars)
+
+
+def occurrence_arrays(clause_start, clause_lits, nvars, dtype=np.int64):
+    # (occ_start, occ_clauses) of Formula.flat_arrays, occ_clauses of type dtype
+    index = 2*np.abs(clause_lits) + (clause_lits < 0)
+    order = np.argsort(index, kind='stable')
+    occ_clauses = (np.searchsorted(clause_start, order, side='right') - 1).astype(dtype, copy=False) # clause of each position
+    occ_start = np.zeros(2*(nvars+1)+1, dtype=np.int64)
+    np.cumsum(np.bincount(index, minlength=2*(nvars+1)), out=occ_start[1:])
+    return occ_start, occ_clauses
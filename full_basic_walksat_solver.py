@@ -18,12 +18,19 @@ class WalkSAT_Solver:
         self.nb_flips = 0 
         self.is_sat = False
         self.noise_parameter = 0.2
+        self.drivers = [] # see base_solver.Driver (restart schedule only: no exchange, no incremental solving)
 
         for clause in self.list_clauses:
             assert len(clause) > 0
 
+    def add_driver(self, driver):
+        self.drivers.append(driver)
+        return driver
+
     def generate(self):
         self.assignment = []
+        for driver in self.drivers:
+            driver.begin_try(self)
         self.nb_tries += 1
         self.nb_flips = 0
         for x in range(1, self.nvars+1):
@@ -132,6 +139,8 @@ class WalkSAT_Solver:
                         x = unsat_clause[np.argmin(break_count)]
                     self.flip(x) 
 
+        for driver in self.drivers:
+            driver.end_try(self, self.is_sat)
         end = time.time()
         print('Nb flips:  {0}      '.format(self.nb_flips))
         print('Nb tries:  {0}      '.format(self.nb_tries))
@@ -4,17 +4,34 @@ References
 '''
 
 from base_solver import Base_Solver
+from k_flip_neighborhood import K_Flip_Neighborhood
+from parameters import Parameter
 import numpy as np
 import random
 import time
 from itertools import chain
 
 class GSAT(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      random_walk=Parameter('cat', (False, True), False),
+                      noise_parameter=Parameter('real', (0.0, 1.0), 0.2),
+                      neighborhood=Parameter('cat', (1, 2, 3), 1))
     
-    def __init__(self, input_cnf_file, verbose, random_walk = False, noise_parameter = 0.2):
-        super(GSAT, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, random_walk = False, noise_parameter = 0.2, neighborhood = 1, **kwargs):
+        super(GSAT, self).__init__(input_cnf_file, verbose, **kwargs)
         self.random_walk = random_walk
         self.noise_parameter = noise_parameter
+        '''
+        neighborhood = 2 or 3 => try 2-flip (then 3-flip) moves when no 1-flip move improves
+        '''
+        self.neighborhood = neighborhood
+        self.k_flip = K_Flip_Neighborhood(self, neighborhood) if neighborhood > 1 else None
+
+    def resize(self):
+        super(GSAT, self).resize()
+        if self.k_flip is not None: # neighbours / shared clauses have changed
+            self.k_flip = K_Flip_Neighborhood(self, self.k_flip.max_k)
 
     def solve(self):
         initial =  time.time()
@@ -44,6 +61,18 @@ class GSAT(Base_Solver):
                     for literal in all_unsat_lits:
                         break_count.append(self.evaluate_breakcount(literal, bs=1, ms=1))
                     '''
+                    k-flip neighborhood: at a 1-flip local optimum, take an improving 2-flip/3-flip move
+                    '''
+                    move = None
+                    if self.k_flip is not None and min(break_count) >= 0:
+                        move, move_cost = self.k_flip.best_move(all_unsat_lits)
+                        if move_cost >= 0:
+                            move = None
+                    if move is not None:
+                        for x in move:
+                            self.flip(x)
+                        continue
+                    '''
                     Random walk  
                     '''
                     if self.random_walk:
@@ -56,15 +85,6 @@ class GSAT(Base_Solver):
                         x = all_unsat_lits[np.argmin(break_count)]
                     self.flip(x) 
 
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
@@ -4,53 +4,74 @@ References
 '''
 
 from base_solver import Base_Solver
+from tabu import Tabu_List
+from k_flip_neighborhood import K_Flip_Neighborhood
+from parameters import Parameter
 import numpy as np
 import random
 import time
 from itertools import chain
 
 class GSAT_Tabu(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      random_walk=Parameter('cat', (False, True), False),
+                      noise_parameter=Parameter('real', (0.0, 1.0), 0.2),
+                      tabu_ratio=Parameter('real', (0.0, 0.2), 0.01875),
+                      tabu_base=Parameter('real', (0.0, 20.0), 2.8125),
+                      neighborhood=Parameter('cat', (1, 2, 3), 1))
     
-    def __init__(self, input_cnf_file, verbose, random_walk = False, noise_parameter = 0.2, tabu_length=None):
-        super(GSAT_Tabu, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, random_walk = False, noise_parameter = 0.2, tabu_length=None,
+                 tabu_ratio = 0.01875, tabu_base = 2.8125, neighborhood = 1, **kwargs):
+        super(GSAT_Tabu, self).__init__(input_cnf_file, verbose, **kwargs)
         self.random_walk = random_walk
         self.noise_parameter = noise_parameter
         '''
         Initialize tabu list and its length
-        Note that tabu list is a circular list 
+        A variable flipped at iteration t stays tabu for the next tabu_length iterations
+        (same behaviour as a circular list of length tabu_length)
         '''
-        if tabu_length is None:
-            self.tabu_length = int(0.01875*self.nvars + 2.8125)
+        if tabu_length is None: # linear in nvars, by default the fit of [1]
+            self.tabu_length = int(tabu_ratio*self.nvars + tabu_base)
         else:
             self.tabu_length = tabu_length
-        self.tabu_list = []
+        self.tabu = Tabu_List(self.nvars, self.tabu_length)
+        '''
+        neighborhood = 2 or 3 => try non-tabu 2-flip (then 3-flip) moves when no 1-flip move improves
+        '''
+        self.neighborhood = neighborhood
+        self.k_flip = K_Flip_Neighborhood(self, neighborhood) if neighborhood > 1 else None
 
     def add_tabu(self, literal):
         '''
         Add a move to tabu list
         '''
-        if len(self.tabu_list) < self.tabu_length:
-            self.tabu_list.append(abs(literal))
-        else: # tabu list is full
-            self.tabu_list.pop(0)
-            self.tabu_list.append(literal)
+        self.tabu.add(literal, self.nb_flips)
 
-    def pick_all_lits(self,id_unsat_clauses, tabu_list=None):
+    def is_allowed(self, x):
+        return not self.tabu.is_tabu(x, self.nb_flips)
+
+    def pick_all_lits(self,id_unsat_clauses, tabu=False):
         all_allowed_lits = []
         for ind in id_unsat_clauses:
             all_allowed_lits += self.list_clauses[ind]   
-        if tabu_list is not None:
-            all_allowed_lits = list(set(all_allowed_lits)^set(tabu_list))
-        else:
-            all_allowed_lits = list(set(all_allowed_lits))
+        all_allowed_lits = list(set(all_allowed_lits))
+        if tabu:
+            all_allowed_lits, _ = self.tabu.partition(all_allowed_lits, self.nb_flips)
         return all_allowed_lits
 
+    def resize(self):
+        super(GSAT_Tabu, self).resize()
+        if self.k_flip is not None: # neighbours / shared clauses have changed
+            self.k_flip = K_Flip_Neighborhood(self, self.k_flip.max_k)
+
     def solve(self):
         initial =  time.time()
         self.initialize_pool()
         while self.nb_tries < self.MAX_TRIES and not self.is_sat:
             self.generate()
             self.initialize_cost()
+            self.tabu.reset()
             while self.nb_flips < self.MAX_FLIPS and not self.is_sat:
                 if self.check() == 1: # if no unsat clause => finish
                     self.is_sat = True
@@ -62,7 +83,7 @@ class GSAT_Tabu(Base_Solver):
                     - Choose a variable x which minimizes cost to flip
                     '''
                     # compute allowed literals wrt tabu list
-                    all_allowed_lits = self.pick_all_lits(self.id_unsat_clauses, self.tabu_list)
+                    all_allowed_lits = self.pick_all_lits(self.id_unsat_clauses, tabu=True)
                     if len(all_allowed_lits) == 0: # else take all_allowed_lits and ignore tabu
                         all_allowed_lits = self.pick_all_lits(self.id_unsat_clauses)
                     '''
@@ -73,6 +94,19 @@ class GSAT_Tabu(Base_Solver):
                     for literal in all_allowed_lits:
                         break_count.append(self.evaluate_breakcount(literal, bs=1, ms=1))
                     '''
+                    k-flip neighborhood: at a 1-flip local optimum, take an improving 2-flip/3-flip move
+                    '''
+                    move = None
+                    if self.k_flip is not None and min(break_count) >= 0:
+                        move, move_cost = self.k_flip.best_move(all_allowed_lits, self.is_allowed)
+                        if move_cost >= 0:
+                            move = None
+                    if move is not None:
+                        for x in move:
+                            self.flip(x)
+                            self.add_tabu(x)
+                        continue
+                    '''
                     Random walk  
                     '''
                     if self.random_walk:
@@ -87,15 +121,6 @@ class GSAT_Tabu(Base_Solver):
                     self.flip(x) 
                     self.add_tabu(x)
         
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
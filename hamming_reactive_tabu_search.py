@@ -5,36 +5,42 @@ References
 '''
 
 from base_solver import Base_Solver
+from parameters import Parameter
+from tabu import Tabu_List
 import numpy as np
 import random
 import time
 from itertools import chain
 
 class H_RTS(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      tf_init=Parameter('real', (0.025, 0.25), 0.1),
+                      tf_step=Parameter('real', (0.001, 0.05), 0.01, log=True),
+                      tf_min=Parameter('real', (0.005, 0.05), 0.025),
+                      tf_max=Parameter('real', (0.1, 0.5), 0.25))
     
-    def __init__(self, input_cnf_file, verbose):
-        super(H_RTS, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, tf_init = 0.1, tf_step = 0.01, tf_min = 0.025, tf_max = 0.25, **kwargs):
+        super(H_RTS, self).__init__(input_cnf_file, verbose, **kwargs)
         '''
         Initialize tabu list and its length
-        Note that tabu list is a circular list 
+        A variable flipped at iteration t stays tabu for the next tabu_tenure iterations
+        Fractional prohibition Tf: starts at TF_INIT, reacts by +/- TF_STEP within [TF_MIN, TF_MAX]
         '''
-        self.tabu_list = []
-        self.Tf = 0.1
+        self.TF_INIT, self.TF_STEP, self.TF_MIN, self.TF_MAX = tf_init, tf_step, tf_min, tf_max
+        self.Tf = self.TF_INIT
         self.tabu_tenure = 0
+        self.tabu = Tabu_List(self.nvars, self.tabu_tenure)
 
     def initialize_tabu(self, tabu_tenure):
-        self.tabu_list = []
         self.tabu_tenure = tabu_tenure
+        self.tabu.reset(tabu_tenure)
         
     def add_tabu(self, literal):
         '''
         Add a move to tabu list
         '''
-        if len(self.tabu_list) < self.tabu_tenure:
-            self.tabu_list.append(abs(literal))
-        else: # tabu list is full
-            self.tabu_list.pop(0)
-            self.tabu_list.append(literal)
+        self.tabu.add(literal, self.nb_flips)
 
     def hamming_distance(self,a, b):
         c = np.bitwise_xor(a, b)
@@ -44,23 +50,22 @@ class H_RTS(Base_Solver):
     def react(self, X_f, X_i):
         deriv = float(self.hamming_distance(X_f, X_i) / (self.tabu_tenure+1)) -1
         if deriv <= 0:
-            self.Tf += 0.01
+            self.Tf += self.TF_STEP
         elif deriv > 0.5:
-            self.Tf -= 0.01
-        if self.Tf > 0.25:
-            self.Tf = 0.25
-        elif self.Tf < 0.025:
-            self.Tf = 0.025
+            self.Tf -= self.TF_STEP
+        if self.Tf > self.TF_MAX:
+            self.Tf = self.TF_MAX
+        elif self.Tf < self.TF_MIN:
+            self.Tf = self.TF_MIN
         return max(int(self.Tf*self.nvars), 4)
 
-    def pick_all_lits(self,id_unsat_clauses, tabu_list=None):
+    def pick_all_lits(self,id_unsat_clauses, tabu=False):
         all_allowed_lits = []
         for ind in id_unsat_clauses:
             all_allowed_lits += self.list_clauses[ind]   
-        if tabu_list is not None:
-            all_allowed_lits = list(set(all_allowed_lits)^set(tabu_list))
-        else:
-            all_allowed_lits = list(set(all_allowed_lits))
+        all_allowed_lits = list(set(all_allowed_lits))
+        if tabu:
+            all_allowed_lits, _ = self.tabu.partition(all_allowed_lits, self.nb_flips)
         return all_allowed_lits
 
     def solve(self):
@@ -69,8 +74,8 @@ class H_RTS(Base_Solver):
         while self.nb_tries < self.MAX_TRIES and not self.is_sat:
             self.generate()
             self.initialize_cost()
-            self.Tf = 0.1
-            self.tabu_tenure = int(self.Tf * self.nvars)
+            self.Tf = self.TF_INIT
+            self.initialize_tabu(int(self.Tf * self.nvars))
             '''
             TODO: NOB_LS here
             '''
@@ -92,7 +97,7 @@ class H_RTS(Base_Solver):
                     break_make_count = []
                     for literal in all_allowed_lits:
                         break_make_count.append(self.evaluate_breakcount(literal, bs=1, ms=1))
-                    nb_unsat = len(self.id_unsat_clauses)
+                    nb_unsat = self.cost()
                     if nb_unsat + min(break_make_count) < nb_unsat:
                         x = all_allowed_lits[np.argmin(break_make_count)]
                         self.flip(x)
@@ -110,7 +115,7 @@ class H_RTS(Base_Solver):
                 it = 0
                 while not self.check() and it < 2*(self.tabu_tenure+1):
                     # compute allowed literals wrt tabu list
-                    all_allowed_lits = self.pick_all_lits(self.id_unsat_clauses, self.tabu_list)
+                    all_allowed_lits = self.pick_all_lits(self.id_unsat_clauses, tabu=True)
                     if len(all_allowed_lits) == 0: # else take all_allowed_lits and ignore tabu
                         all_allowed_lits = self.pick_all_lits(self.id_unsat_clauses)
                     break_make_count = []
@@ -136,17 +141,9 @@ class H_RTS(Base_Solver):
                 Update tabu tenure based on search history
                 '''
                 self.tabu_tenure = self.react(X_f, X_i)
+                self.tabu.set_tenure(self.tabu_tenure)
             if self.check():
                 self.is_sat = True
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
@@ -0,0 +1,61 @@
+'''
+Set of integers in [0, size) with O(1) add / remove / membership / random choice
+(items are kept in a list, position of each item is kept in an array => remove = swap with the last item)
+compact: positions in an int32 array instead of a list
+'''
+
+import numpy as np
+import random
+
+class Indexed_Set:
+
+    __slots__ = ('items', 'position')
+
+    def __init__(self, size, compact=False):
+        self.items = []
+        if compact:
+            self.position = np.full(size, -1, dtype=np.int32)
+        else:
+            self.position = [-1 for _ in range(size)]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return self.position[item] >= 0
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, item):
+        if self.position[item] < 0:
+            self.position[item] = len(self.items)
+            self.items.append(item)
+
+    def remove(self, item):
+        pos = self.position[item]
+        if pos < 0:
+            return
+        last = self.items.pop()
+        if last != item:
+            self.items[pos] = last
+            self.position[last] = pos
+        self.position[item] = -1
+
+    def resize(self, size):
+        if size > len(self.position):
+            if isinstance(self.position, np.ndarray):
+                self.position = np.concatenate((self.position, np.full(size - len(self.position), -1, dtype=np.int32)))
+            else:
+                self.position.extend(-1 for _ in range(size - len(self.position)))
+
+    def clear(self):
+        if isinstance(self.position, np.ndarray):
+            self.position[self.items] = -1
+        else:
+            for item in self.items:
+                self.position[item] = -1
+        self.items = []
+
+    def choice(self):
+        return random.choice(self.items)
@@ -4,50 +4,60 @@ References
 '''
 
 from base_solver import Base_Solver
+from parameters import Parameter
+from tabu import Tabu_List
 import numpy as np
 import random
 import time
 from itertools import chain
 
 class IRoTS(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      tenure_ratio=Parameter('real', (0.01, 0.5), 0.1, log=True),
+                      tenure_base=Parameter('int', (0, 20), 4),
+                      perturb_ratio=Parameter('real', (0.05, 1.0), 0.5),
+                      escape_ratio=Parameter('real', (0.01, 1.0), 0.25, log=True),
+                      perturbation_ratio=Parameter('real', (0.05, 2.0), 0.9, log=True),
+                      check_ratio=Parameter('int', (1, 50), 10, log=True))
     
-    def __init__(self, input_cnf_file, verbose):
-        super(IRoTS, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, tenure_ratio = 0.1, tenure_base = 4, perturb_ratio = 0.5,
+                 escape_ratio = 0.25, perturbation_ratio = 0.9, check_ratio = 10, **kwargs):
+        super(IRoTS, self).__init__(input_cnf_file, verbose, **kwargs)
         '''
-        Instead of using a circular list, use a list for tracking last move of each variable
-        If current_time - last_move < tabu_tenure => a tabu move ! 
+        Instead of using a circular list, use a "last move" array (see tabu.py)
+        If current_time < last_move + tabu_tenure => a tabu move ! 
         Else => non-tabu moves
-        Initialize all by -1
+        Last move of each variable is tracked by self.age (forced flips)
+        Tabu tenures: tenure_ratio * nvars + tenure_base (LS), perturb_ratio * nvars (perturbation)
+        LS ends after escape_ratio * nvars^2 non-improving steps, a perturbation lasts perturbation_ratio * nvars steps
         '''
-        self.tabu_tenure_LS = int(self.nvars/10 + 4)
+        self.tabu_tenure_LS = int(tenure_ratio*self.nvars + tenure_base)
         # self.tabu_tenure_LS_MIN = int(self.nvars/10)
         # self.tabu_tenure_LS_MAX = int(self.nvars/10) * 3
-        self.tabu_tenure_Perturb = int(self.nvars/2)
-        self.last_move = [-1 for _ in self.assignment]
-        self.best_cost = len(self.list_clauses)
-        self.CHECK_FREQ = self.nvars * 10
+        self.tabu_tenure_Perturb = int(perturb_ratio*self.nvars)
+        self.tabu = Tabu_List(self.nvars)
+        self.best_cost = self.weights.sum()
+        self.CHECK_FREQ = self.nvars * check_ratio
         self.nb_no_improvements = 0
-        self.ESCAPE_THRESHOLD = int(self.nvars*self.nvars/4)
+        self.ESCAPE_THRESHOLD = int(escape_ratio*self.nvars*self.nvars)
         self.nb_perturbations = 0
-        self.MAX_PERTURBATIONS = int(9*self.nvars/10)
+        self.MAX_PERTURBATIONS = int(perturbation_ratio*self.nvars)
 
-    def pick_allowed_lits(self,id_unsat_clauses, tabu_tenure):
+    def pick_allowed_lits(self,id_unsat_clauses, tabu=True):
         all_allowed_lits = []
         non_allowed_lits = []
         for ind in id_unsat_clauses:
             all_allowed_lits += self.list_clauses[ind]   
         all_allowed_lits = list(set(all_allowed_lits))
-        if tabu_tenure > 0:
-            for lit in all_allowed_lits:
-                if self.nb_flips - self.last_move[abs(lit)-1] < tabu_tenure: #tabu move
-                    all_allowed_lits.remove(lit)
-                    non_allowed_lits.append(lit)
+        if tabu:
+            all_allowed_lits, non_allowed_lits = self.tabu.partition(all_allowed_lits, self.nb_flips)
         return all_allowed_lits, non_allowed_lits
 
     def pick_necessary_flip(self):
-        oldest_move = min(self.last_move)
-        if self.nb_flips - oldest_move > self.CHECK_FREQ:
-            return self.assignment[self.last_move.index(oldest_move)]
+        oldest_var = self.age.oldest()
+        if oldest_var is not None and self.nb_flips - self.age.last_flip(oldest_var) > self.CHECK_FREQ:
+            return self.assignment[oldest_var-1]
         else: 
             return None 
 
@@ -61,20 +71,21 @@ class IRoTS(Base_Solver):
         elif mode_Perturbation:
             condition =  self.nb_perturbations < self.MAX_PERTURBATIONS
             tabu_tenure = self.tabu_tenure_Perturb
+        self.tabu.set_tenure(tabu_tenure)
         
         while condition and self.nb_flips < self.MAX_FLIPS and not self.check() :
             '''
             compute allowed literals wrt tabu list
             '''
-            all_allowed_lits, non_allowed_lits = self.pick_allowed_lits(self.id_unsat_clauses, tabu_tenure)
+            all_allowed_lits, non_allowed_lits = self.pick_allowed_lits(self.id_unsat_clauses, tabu=True)
             if len(all_allowed_lits) == 0: # else take all_allowed_lits and ignore tabu
-                all_allowed_lits, non_allowed_lits = self.pick_allowed_lits(self.id_unsat_clauses, 0)
+                all_allowed_lits, non_allowed_lits = self.pick_allowed_lits(self.id_unsat_clauses, tabu=False)
             '''
             Compute cost of every (tabu and non tabu) moves
             Cost = break - make
             '''
             ntb_cost, tb_cost = [], []
-            current_cost = len(self.id_unsat_clauses)
+            current_cost = self.cost()
             for literal in all_allowed_lits:
                 ntb_cost.append(self.evaluate_breakcount(literal, bs=1, ms=1))
             x_ntb = all_allowed_lits[np.argmin(ntb_cost)]
@@ -90,9 +101,9 @@ class IRoTS(Base_Solver):
                 x = x_ntb
             
             self.flip(x) 
-            self.last_move[abs(x)-1] = self.nb_flips
-            if len(self.id_unsat_clauses) < self.best_cost:
-                self.best_cost = len(self.id_unsat_clauses)
+            self.tabu.add(x, self.nb_flips)
+            if self.cost() < self.best_cost:
+                self.best_cost = self.cost()
                 self.nb_no_improvements = 0
             else: 
                 self.nb_no_improvements += 1
@@ -104,9 +115,9 @@ class IRoTS(Base_Solver):
                 x = self.pick_necessary_flip()
                 if x is not None: 
                     self.flip(x)
-                    self.last_move[abs(x)-1] = self.nb_flips
-                    if len(self.id_unsat_clauses) < self.best_cost:
-                        self.best_cost = len(self.id_unsat_clauses)
+                    self.tabu.add(x, self.nb_flips)
+                    if self.cost() < self.best_cost:
+                        self.best_cost = self.cost()
                         self.nb_no_improvements = 0
                     else:
                         self.nb_no_improvements += 1
@@ -132,8 +143,8 @@ class IRoTS(Base_Solver):
             '''
             self.generate()
             self.initialize_cost()
-            self.last_move = [-1 for _ in self.assignment]
-            self.best_cost = len(self.id_unsat_clauses)
+            self.tabu.reset()
+            self.best_cost = self.cost()
             # self.tabu_tenure_LS = int(self.nvars/10 + 4)
             # self.tabu_tenure_Perturb = int(self.nvars/2)
             '''
@@ -142,22 +153,34 @@ class IRoTS(Base_Solver):
             self.is_sat = self.RoTS(mode_LS=True)
             while not self.is_sat and self.nb_flips < self.MAX_FLIPS:
                 '''
+                Cooperative search: restart from an elite assignment of the other workers (if any)
+                '''
+                elite = self.exchange()
+                if elite is not None:
+                    self.assignment = elite
+                    self.initialize_cost()
+                    self.best_cost = min(self.best_cost, self.cost())
+                '''
                 Pertubation Operator
                 '''
                 x_star = self.assignment.copy()
-                x_star_cost = len(self.id_unsat_clauses)
-                self.last_move = [-1 for _ in self.assignment]
+                x_star_cost = self.cost()
+                self.age.reset()
+                self.tabu.reset()
                 self.is_sat = self.RoTS(mode_Perturbation=True)
                 '''
                 LS
                 '''
                 xp_star = self.assignment.copy()
-                xp_star_cost = len(self.id_unsat_clauses)
-                self.last_move = [-1 for _ in self.assignment]
+                xp_star_cost = self.cost()
+                self.age.reset()
+                self.tabu.reset()
                 if not self.is_sat:
                     self.is_sat = self.RoTS(mode_LS=True)
                     xp_star = self.assignment.copy()
-                    xp_star_cost = len(self.id_unsat_clauses)
+                    xp_star_cost = self.cost()
+                if self.is_sat: # keep the satisfying assignment, do not go back to x_star
+                    break
                 '''
                 Acceptance Criterion
                 '''
@@ -184,15 +207,6 @@ class IRoTS(Base_Solver):
                 self.initialize_cost()
                 
 
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
@@ -0,0 +1,174 @@
+'''
+References
+[1] M. Yagiura and T. Ibaraki, “Efficient 2 and 3-flip neighborhood search algorithms for the MAX SAT,” Lect. Notes Comput. Sci. (including Subser. Lect. Notes Artif. Intell. Lect. Notes Bioinformatics), vol. 1449, no. 2, pp. 105–116, 1998, doi: 10.1007/3-540-68535-9_14.
+'''
+
+class K_Flip_Neighborhood:
+    '''
+    2-flip and 3-flip moves evaluated on top of the occurrence index (pool) of a solver
+
+    - Flipping variables which do not share any clause = sum of their 1-flip moves
+      => only pairs (and triples) of variables sharing clauses are considered
+    - cost(x,y) = cost(x) + cost(y) + interaction(x,y), where interaction(x,y) only depends on
+      the clauses containing both x and y
+    - cost(x,y,z) = cost(x) + cost(y) + cost(z) + interaction(x,y) + interaction(x,z) + interaction(y,z)
+      + a correction over the clauses containing x, y and z
+    - Cost = break - make, as returned by evaluate_breakcount(literal, bs=1, ms=1)
+    - Clauses shared by each pair of variables are indexed once (only pairs occurring together in a clause,
+      O(sum of squared clause lengths) memory), costs and interaction terms are cached and, after a flip of x,
+      only the entries of the variables and pairs of the clauses containing x are dropped (the other clauses
+      are unchanged)
+    '''
+
+    __slots__ = ('solver', 'max_k', 'neighbors', 'shared', 'interactions', 'costs', 'stamp', 'assignment')
+
+    def __init__(self, solver, max_k=2):
+        assert max_k in (2, 3)
+        self.solver = solver
+        self.max_k = max_k
+        self.shared = dict()    # key: (x, y) with x < y -> id of clauses containing both x and y
+        for i, clause in enumerate(solver.list_clauses):
+            variables = sorted(set(abs(literal) for literal in clause))
+            for a, x in enumerate(variables):
+                for y in variables[a+1:]:
+                    self.shared.setdefault((x, y), []).append(i)
+        self.neighbors = dict() # key: variable -> variables sharing at least one clause with it
+        for x, y in self.shared:
+            self.neighbors.setdefault(x, []).append(y)
+            self.neighbors.setdefault(y, []).append(x)
+        self.interactions = dict() # key: (x, y) with x < y -> interaction term, valid at iteration self.stamp
+        self.costs = dict()     # key: variable -> 1-flip cost, valid at iteration self.stamp
+        self.stamp = -1
+        self.assignment = None  # assignment of the try self.stamp belongs to
+
+    def occurrences(self, x):
+        pool = self.solver.pool
+        occ = []
+        if x in pool:
+            occ += pool[x]
+        if -x in pool:
+            occ += pool[-x]
+        return occ
+
+    def get_neighbors(self, x):
+        return self.neighbors.get(x, [])
+
+    def shared_clauses(self, x, y):
+        return self.shared.get((x, y) if x < y else (y, x), [])
+
+    def refresh(self):
+        '''
+        Costs and interaction terms depend on the current assignment => drop the entries of the variables sharing
+        a clause with a variable flipped since the last call (flipped variables: tail of the recency list of the
+        solver), all of them at a new try
+        '''
+        solver = self.solver
+        if solver.assignment is not self.assignment or solver.nb_flips < self.stamp:
+            self.interactions = dict()
+            self.costs = dict()
+        elif solver.nb_flips != self.stamp:
+            age = solver.age
+            x = age.prev[0]
+            while x != 0 and age.last[x] > self.stamp:
+                self.invalidate(x)
+                x = age.prev[x]
+        self.assignment = solver.assignment
+        self.stamp = solver.nb_flips
+
+    def invalidate(self, x):
+        for i in self.occurrences(x):
+            variables = [abs(literal) for literal in self.solver.list_clauses[i]]
+            for y in variables:
+                self.costs.pop(y, None)
+                for z in variables:
+                    if y < z:
+                        self.interactions.pop((y, z), None)
+
+    def cost(self, x):
+        if x not in self.costs:
+            self.costs[x] = self.solver.evaluate_breakcount(x, bs=1, ms=1)
+        return self.costs[x]
+
+    def clause_delta(self, i, variables):
+        '''
+        Change of the (weighted) cost due to clause i when flipping all variables together
+        (+w: SAT -> UNSAT, -w: UNSAT -> SAT, 0 otherwise), w: score weight of the clause as for break / make
+        '''
+        clause = self.solver.list_clauses[i]
+        assignment = self.solver.assignment
+        nb_true = self.solver.costs[i]
+        new_nb_true = nb_true
+        for x in variables:
+            if assignment[x-1] in clause: # literal of x is currently true in clause i
+                new_nb_true -= 1
+            else:
+                new_nb_true += 1
+        return (int(new_nb_true == 0) - int(nb_true == 0)) * self.solver.score_weights[i]
+
+    def interaction(self, x, y):
+        key = (x, y) if x < y else (y, x)
+        if key not in self.interactions:
+            if key not in self.shared: # no common clause
+                return 0
+            term = 0
+            for i in self.shared[key]:
+                term += self.clause_delta(i, key) - self.clause_delta(i, (x,)) - self.clause_delta(i, (y,))
+            self.interactions[key] = term
+        return self.interactions[key]
+
+    def pair_cost(self, x, y):
+        return self.cost(x) + self.cost(y) + self.interaction(x, y)
+
+    def triple_cost(self, x, y, z):
+        total = self.pair_cost(x, y) + self.cost(z) + self.interaction(x, z) + self.interaction(y, z)
+        for i in self.shared_clauses(x, y):
+            if i in self.shared_clauses(x, z):
+                # clause contains x, y and z => replace the pairwise terms by the exact joint change
+                total += self.clause_delta(i, (x, y, z)) - self.clause_delta(i, (x, y)) \
+                    - self.clause_delta(i, (x, z)) - self.clause_delta(i, (y, z)) \
+                    + self.clause_delta(i, (x,)) + self.clause_delta(i, (y,)) + self.clause_delta(i, (z,))
+        return total
+
+    def generate_moves(self, candidates, k=2, allowed=None):
+        '''
+        Move generator: yield (variables to flip, cost) for every k-flip move such that
+        - the first variable occurs in candidates (e.g. literals of UNSAT clauses)
+        - the variables are chained by shared clauses
+        - allowed(variable) is True for every variable of the move (e.g. non tabu moves)
+        '''
+        self.refresh()
+        first_vars = set(abs(literal) for literal in candidates)
+        if allowed is not None:
+            first_vars = [x for x in first_vars if allowed(x)]
+        seen = set()
+        for x in first_vars:
+            for y in self.get_neighbors(x):
+                if allowed is not None and not allowed(y):
+                    continue
+                if k == 2:
+                    move = (x, y) if x < y else (y, x)
+                    if move not in seen:
+                        seen.add(move)
+                        yield move, self.pair_cost(x, y)
+                else:
+                    for z in set(self.get_neighbors(x) + self.get_neighbors(y)):
+                        if z == x or z == y or (allowed is not None and not allowed(z)):
+                            continue
+                        move = tuple(sorted((x, y, z)))
+                        if move not in seen:
+                            seen.add(move)
+                            yield move, self.triple_cost(x, y, z)
+
+    def best_move(self, candidates, allowed=None):
+        '''
+        Best 2-flip move, then best 3-flip move if no 2-flip move improves (max_k = 3)
+        Return (None, 0) if there is no compound move
+        '''
+        best_move, best_cost = None, 0
+        for k in range(2, self.max_k+1):
+            for move, cost in self.generate_moves(candidates, k, allowed):
+                if best_move is None or cost < best_cost:
+                    best_move, best_cost = move, cost
+            if best_move is not None and best_cost < 0:
+                break
+        return best_move, best_cost
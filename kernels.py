@@ -0,0 +1,245 @@
+'''
+Optional compiled kernels for the hot primitives of local search
+
+Same primitives as Base_Solver, on array storage (Formula.flat_arrays) instead of lists / dicts:
+    - flip with clause cost update, incremental break/make scores and unsat set maintenance
+    - break/make evaluation
+    - a whole WalkSAT step, and a WalkSAT run (keeping the best assignment of the run)
+Kernels are compiled with numba when it is installed, otherwise the very same functions run as plain Python.
+
+State arrays
+    - value[x] = +1 / -1, literal l is true <=> value[|l|] * l > 0
+    - nb_true[i] = nb of true literals of clause i (= costs of Base_Solver)
+    - unsat_list[:counters[0]] = unsat clauses, unsat_pos[i] = position of clause i in unsat_list (-1 if SAT)
+    - counters[0] = nb of unsat clauses, counters[1] = weighted cost
+'''
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # numba is absent => kernels stay plain Python functions
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+
+@njit(cache=True)
+def seed(value):
+    # numba has its own random generator, seeded from compiled code
+    np.random.seed(value)
+
+
+@njit(cache=True)
+def literal_index(literal):
+    return 2*abs(literal) + (1 if literal < 0 else 0)
+
+
+@njit(cache=True)
+def add_unsat(i, unsat_list, unsat_pos, counters):
+    unsat_pos[i] = counters[0]
+    unsat_list[counters[0]] = i
+    counters[0] += 1
+
+
+@njit(cache=True)
+def remove_unsat(i, unsat_list, unsat_pos, counters):
+    # swap with the last unsat clause => O(1)
+    pos = unsat_pos[i]
+    last = unsat_list[counters[0]-1]
+    unsat_list[pos] = last
+    unsat_pos[last] = pos
+    unsat_pos[i] = -1
+    counters[0] -= 1
+
+
+@njit(cache=True)
+def initialize(value, nb_true, clause_start, clause_lits, weights, cost_weights,
+               break_score, make_score, unsat_list, unsat_pos, counters):
+    break_score[:] = 0.0
+    make_score[:] = 0.0
+    counters[0] = 0
+    counters[1] = 0
+    for i in range(len(nb_true)):
+        count = 0
+        critical = 0
+        for q in range(clause_start[i], clause_start[i+1]):
+            literal = clause_lits[q]
+            if value[abs(literal)] * literal > 0:
+                count += 1
+                critical = abs(literal)
+        nb_true[i] = count
+        unsat_pos[i] = -1
+        if count == 0:
+            add_unsat(i, unsat_list, unsat_pos, counters)
+            counters[1] += cost_weights[i]
+            for q in range(clause_start[i], clause_start[i+1]):
+                make_score[abs(clause_lits[q])] += weights[i]
+        elif count == 1:
+            break_score[critical] += weights[i]
+
+
+@njit(cache=True)
+def evaluate(x, break_score, make_score, bs, ms):
+    # Score = break - make (weighted)
+    return bs*break_score[x] - ms*make_score[x]
+
+
+@njit(cache=True)
+def flip(x, value, nb_true, clause_start, clause_lits, occ_start, occ_clauses, weights, cost_weights,
+         break_score, make_score, unsat_list, unsat_pos, counters):
+    old_literal = x if value[x] > 0 else -x
+    value[x] = -value[x]
+    # Clause contains old literal => cost --
+    k = literal_index(old_literal)
+    for p in range(occ_start[k], occ_start[k+1]):
+        i = occ_clauses[p]
+        nb_true[i] -= 1
+        w = weights[i]
+        if nb_true[i] == 0: # SAT -> UNSAT
+            add_unsat(i, unsat_list, unsat_pos, counters)
+            counters[1] += cost_weights[i]
+            break_score[x] -= w
+            for q in range(clause_start[i], clause_start[i+1]):
+                make_score[abs(clause_lits[q])] += w
+        elif nb_true[i] == 1: # the last true literal becomes critical
+            for q in range(clause_start[i], clause_start[i+1]):
+                literal = clause_lits[q]
+                if value[abs(literal)] * literal > 0:
+                    break_score[abs(literal)] += w
+                    break
+    # Clause contains -old literal => cost ++
+    k = literal_index(-old_literal)
+    for p in range(occ_start[k], occ_start[k+1]):
+        i = occ_clauses[p]
+        w = weights[i]
+        if nb_true[i] == 0: # UNSAT -> SAT
+            remove_unsat(i, unsat_list, unsat_pos, counters)
+            counters[1] -= cost_weights[i]
+            for q in range(clause_start[i], clause_start[i+1]):
+                make_score[abs(clause_lits[q])] -= w
+            break_score[x] += w
+        elif nb_true[i] == 1: # the previous true literal is no longer critical
+            for q in range(clause_start[i], clause_start[i+1]):
+                literal = clause_lits[q]
+                if abs(literal) != x and value[abs(literal)] * literal > 0:
+                    break_score[abs(literal)] -= w
+                    break
+        nb_true[i] += 1
+
+
+@njit(cache=True)
+def walksat_step(noise, skc, value, nb_true, clause_start, clause_lits, occ_start, occ_clauses, weights, cost_weights,
+                 break_score, make_score, unsat_list, unsat_pos, counters):
+    '''
+    WalkSAT step (same rule as WalkSAT.solve): random unsat clause, then
+    SKC (a literal with zero break-count) / random walk with probability noise / literal with min break-count
+    Return the flipped variable
+    '''
+    i = unsat_list[np.random.randint(counters[0])]
+    start, end = clause_start[i], clause_start[i+1]
+    best, best_break, zero = -1, np.inf, -1
+    for q in range(start, end):
+        x = abs(clause_lits[q])
+        b = break_score[x]
+        if b == 0 and zero < 0:
+            zero = x
+        if b < best_break:
+            best, best_break = x, b
+    if skc and zero >= 0:
+        x = zero
+    elif noise > 0 and np.random.random() < noise:
+        x = abs(clause_lits[start + np.random.randint(end - start)])
+    else:
+        x = best
+    flip(x, value, nb_true, clause_start, clause_lits, occ_start, occ_clauses, weights, cost_weights,
+         break_score, make_score, unsat_list, unsat_pos, counters)
+    return x
+
+
+@njit(cache=True)
+def walksat_run(max_flips, noise, skc, value, nb_true, clause_start, clause_lits, occ_start, occ_clauses, weights,
+                cost_weights, break_score, make_score, unsat_list, unsat_pos, counters, best_value):
+    '''
+    WalkSAT steps until SAT or max_flips, return the nb of flips and the best (weighted) cost
+    best_value = assignment of the best cost (copied on improvements only)
+    '''
+    nb_flips = 0
+    best_cost = counters[1]
+    best_value[:] = value
+    while counters[0] > 0 and nb_flips < max_flips:
+        walksat_step(noise, skc, value, nb_true, clause_start, clause_lits, occ_start, occ_clauses, weights,
+                     cost_weights, break_score, make_score, unsat_list, unsat_pos, counters)
+        nb_flips += 1
+        if counters[1] < best_cost:
+            best_cost = counters[1]
+            best_value[:] = value
+    return nb_flips, best_cost
+
+
+class Kernel_State:
+    '''
+    Array state of a solver for the kernels (formula arrays are built once, scores use the solver's score_weights)
+    '''
+
+    def __init__(self, solver):
+        self.nvars = solver.nvars
+        self.clause_start, self.clause_lits, self.occ_start, self.occ_clauses = solver.formula.flat_arrays()
+        nclauses = len(self.clause_start) - 1
+        # compact solver: same types as its own state (see compact.py)
+        index = solver.unsat_position.dtype if solver.compact else np.int64
+        self.weights = solver.score_weights if solver.compact else np.asarray(solver.score_weights, dtype=np.float64)
+        self.cost_weights = np.asarray(solver.weights, dtype=np.int64)
+        self.value = np.ones(self.nvars+1, dtype=np.int8 if solver.compact else np.int64)
+        self.best_value = np.ones(self.nvars+1, dtype=self.value.dtype)
+        self.nb_true = np.zeros(nclauses, dtype=solver.costs.dtype if solver.compact else np.int64)
+        self.break_score = np.zeros(self.nvars+1)
+        self.make_score = np.zeros(self.nvars+1)
+        self.unsat_list = np.zeros(nclauses, dtype=index)
+        self.unsat_pos = np.full(nclauses, -1, dtype=index)
+        self.counters = np.zeros(2, dtype=np.int64)
+
+    def load(self, assignment):
+        # assignment is a list of literals, i.e. assignment[x-1] = x or -x
+        self.value[1:] = np.sign(np.asarray(assignment, dtype=np.int64))
+        initialize(self.value, self.nb_true, self.clause_start, self.clause_lits, self.weights, self.cost_weights,
+                   self.break_score, self.make_score, self.unsat_list, self.unsat_pos, self.counters)
+
+    def assignment(self, best=False):
+        value = self.best_value if best else self.value
+        return (np.arange(1, self.nvars+1) * value[1:]).tolist()
+
+    def nb_unsat(self):
+        return int(self.counters[0])
+
+    def cost(self):
+        return int(self.counters[1])
+
+    def unsat_clauses(self):
+        return self.unsat_list[:self.counters[0]].tolist()
+
+    def evaluate(self, literal, bs=1, ms=1):
+        return evaluate(abs(literal), self.break_score, self.make_score, bs, ms)
+
+    def flip(self, literal):
+        flip(abs(literal), self.value, self.nb_true, self.clause_start, self.clause_lits, self.occ_start,
+             self.occ_clauses, self.weights, self.cost_weights, self.break_score, self.make_score,
+             self.unsat_list, self.unsat_pos, self.counters)
+
+    def walksat_step(self, noise, skc=True):
+        return walksat_step(noise, skc, self.value, self.nb_true, self.clause_start, self.clause_lits, self.occ_start,
+                            self.occ_clauses, self.weights, self.cost_weights, self.break_score, self.make_score,
+                            self.unsat_list, self.unsat_pos, self.counters)
+
+    def walksat(self, max_flips, noise, skc=True):
+        # Return the nb of flips and the best cost, see assignment(best=True)
+        nb_flips, best_cost = walksat_run(max_flips, noise, skc, self.value, self.nb_true, self.clause_start,
+                                          self.clause_lits, self.occ_start, self.occ_clauses, self.weights,
+                                          self.cost_weights, self.break_score, self.make_score, self.unsat_list,
+                                          self.unsat_pos, self.counters, self.best_value)
+        return int(nb_flips), int(best_cost)
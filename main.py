@@ -1,20 +1,81 @@
 #!/usr/bin/env python
 
 import numpy as np
-from utils import get_args
+from utils import get_args, load_solver, build_solver
 from full_basic_walksat_solver import WalkSAT_Solver
+from base_solver import Base_Solver
+from verifier import verify_file, print_solution
+from dimacs_parser import parse_formula
+from selector import Selector
+from parameters import load_configuration
+import contextlib
+import sys
+import io
 
 def main():
     try:
         args = get_args()
         input_cnf_file = args.input
         verbose = args.verbose
+        solver_class = WalkSAT_Solver if args.solver in ('basic', 'auto') else load_solver(args.solver)
     except:
         print("missing or invalid arguments")
         exit(0)
 
-    solver = WalkSAT_Solver(input_cnf_file, verbose)
-    solver.solve()
+    '''
+    auto: solver and parameters chosen from the features of the instance (see selector.py),
+    the parsed formula is passed to the solver
+    '''
+    options = dict()
+    if args.solver == 'auto':
+        input_formula = parse_formula(input_cnf_file, 0)
+        name, options = Selector().select(input_formula)
+        print('c auto: {0} {1}'.format(name, options))
+        solver_class = load_solver(name)
+    '''
+    config: tuned options of the solver (see tuning.py), overridden by the options of the selector
+    '''
+    if args.config is not None and args.solver != 'basic':
+        options = dict(load_configuration(name if args.solver == 'auto' else args.solver, args.config), **options)
+
+    '''
+    Competition output: solver logs as c lines, then o / s / v lines
+    The model is verified against the input file before being printed
+    '''
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        if solver_class is WalkSAT_Solver:
+            solver = build_solver(solver_class, input_cnf_file, verbose, restarts=args.restarts)
+        else:
+            if args.compact:
+                options['compact'] = True
+            if args.restarts is not None:
+                options['restarts'] = args.restarts
+            solver = build_solver(solver_class, input_formula if args.solver == 'auto' else input_cnf_file, verbose,
+                                  **options)
+        if isinstance(solver, Base_Solver):
+            cost, model, _ = solver.solve_anytime()
+            proven_unsat, weighted = solver.proven_unsat, solver.formula.is_weighted
+        else:
+            model = solver.solve()
+            proven_unsat, weighted = False, False
+    for line in log.getvalue().splitlines():
+        print('c ' + line)
+
+    if proven_unsat:
+        print_solution('UNSAT')
+        sys.exit(20)
+    result = verify_file(input_cnf_file, model) if model is not None else None
+    if result is None or not result.ok:
+        if result is not None and solver.is_sat:
+            print('c model rejected by the verifier: {0} unsat clauses'.format(result.nb_unsat))
+        print_solution('UNKNOWN')
+        sys.exit(0)
+    if weighted:
+        print_solution('OPTIMUM' if result.cost == 0 else 'SAT', model, result.cost)
+        sys.exit(30 if result.cost == 0 else 10)
+    print_solution('SAT', model)
+    sys.exit(10)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -5,19 +5,27 @@ References
 '''
 
 from base_solver import Base_Solver
+from parameters import Parameter
 import numpy as np
 import random
 import time
 from itertools import chain
 
 class Novelty(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      noise_parameter=Parameter('real', (0.0, 1.0), 0.2),
+                      random_walk_noise=Parameter('cat', (None, 0.005, 0.01, 0.02, 0.05), None),
+                      clause_local=Parameter('cat', (False, True), False))
     
-    def __init__(self, input_cnf_file, verbose, noise_parameter = 0.2, random_walk_noise = None):
-        super(Novelty, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, noise_parameter = 0.2, random_walk_noise = None, clause_local = False, **kwargs):
+        super(Novelty, self).__init__(input_cnf_file, verbose, **kwargs)
         self.noise_parameter = noise_parameter
         self.most_recent = None
         # Introduce random walk noise parameter => Novelty+
         self.random_walk_noise = random_walk_noise
+        # Evaluate only the literals of one random unsat clause (original algorithms) instead of all unsat literals
+        self.clause_local = clause_local
 
     def solve(self):
         initial =  time.time()
@@ -36,18 +44,23 @@ class Novelty(Base_Solver):
                     - Among all variables that occur in unsat clauses
                     - Choose a variable x which minimizes cost to flip
                     '''
-                    all_unsat_lits = []
-                    for ind in self.id_unsat_clauses:
-                        all_unsat_lits += self.list_clauses[ind]
-                    all_unsat_lits = list(set(all_unsat_lits)) # flatten & remove redundants
-                    '''
-                    Compute cost when flipping each literal 
-                        cost = break - make
-                    Best var with min cost
-                    '''
-                    cost = []
-                    for literal in all_unsat_lits:
-                        cost.append(self.evaluate_breakcount(literal, bs=1, ms=1))
+                    if self.clause_local:
+                        # Only the literals of a random unsat clause, most recent = most recently flipped in this clause
+                        all_unsat_lits, cost, most_recent = self.pick_clause_literals()
+                    else:
+                        all_unsat_lits = []
+                        for ind in self.id_unsat_clauses:
+                            all_unsat_lits += self.list_clauses[ind]
+                        all_unsat_lits = list(set(all_unsat_lits)) # flatten & remove redundants
+                        '''
+                        Compute cost when flipping each literal 
+                            cost = break - make
+                        Best var with min cost
+                        '''
+                        cost = []
+                        for literal in all_unsat_lits:
+                            cost.append(self.evaluate_breakcount(literal, bs=1, ms=1))
+                        most_recent = self.most_recent
                     '''
                     Random walk
                     '''
@@ -76,7 +89,7 @@ class Novelty(Base_Solver):
                             second_best_id = np.argmin(cost)
                             second_best_var = all_unsat_lits[second_best_id]
                             # best_var, second_best_var = all_unsat_lits[0], all_unsat_lits[1]
-                            if abs(best_var) != self.most_recent: #(1)
+                            if abs(best_var) != most_recent: #(1)
                                 x = best_var
                             else:
                                 p = random.random()
@@ -90,15 +103,6 @@ class Novelty(Base_Solver):
                     self.flip(x) 
                     self.most_recent = abs(x)
 
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
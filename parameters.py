@@ -0,0 +1,78 @@
+'''
+Declared parameter spaces of the solvers and tuned configurations (see tuning.py)
+
+Each solver class lists its tunable constructor options in PARAMETERS, key: option -> Parameter
+    - kind 'real' / 'int': domain = (low, high), log => sampled on a log scale
+    - kind 'cat':          domain = tuple of values
+Defaults are the values of the constructor (i.e. the values of the papers, or of the original code)
+
+Tuned configurations are saved as JSON, key: solver name (utils.SOLVERS) -> options, and loaded with
+    build_solver('walksat', input_cnf_file, verbose, **load_configuration('walksat', 'tuned.json'))   # utils.py
+'''
+
+from collections import namedtuple
+import json
+import math
+import os
+
+Parameter = namedtuple('Parameter', ['kind', 'domain', 'default', 'log'], defaults=[False])
+
+DEFAULT_PATH = 'tuned.json'
+
+
+def defaults(space):
+    return {name: parameter.default for name, parameter in space.items()}
+
+def clip(parameter, value):
+    low, high = parameter.domain
+    value = min(max(value, low), high)
+    return int(round(value)) if parameter.kind == 'int' else float(value)
+
+def sample(space, rng):
+    # Uniform configuration of space (rng: random.Random)
+    configuration = dict()
+    for name, parameter in space.items():
+        if parameter.kind == 'cat':
+            configuration[name] = rng.choice(parameter.domain)
+        elif parameter.log:
+            low, high = parameter.domain
+            configuration[name] = clip(parameter, math.exp(rng.uniform(math.log(low), math.log(high))))
+        else:
+            configuration[name] = clip(parameter, rng.uniform(*parameter.domain))
+    return configuration
+
+def neighbor(space, configuration, spread, rng):
+    '''
+    Configuration sampled around configuration: normal perturbation of standard deviation spread * range
+    (on a log scale for log parameters), categorical values are kept with probability 1 - spread
+    '''
+    new = dict()
+    for name, parameter in space.items():
+        value = configuration.get(name, parameter.default)
+        if parameter.kind == 'cat':
+            new[name] = value if rng.random() >= spread else rng.choice(parameter.domain)
+        elif parameter.log:
+            low, high = parameter.domain
+            x = rng.gauss(math.log(max(value, low)), spread * (math.log(high) - math.log(low)))
+            new[name] = clip(parameter, math.exp(x))
+        else:
+            low, high = parameter.domain
+            new[name] = clip(parameter, rng.gauss(value, spread * (high - low)))
+    return new
+
+def load_configuration(solver, path=DEFAULT_PATH):
+    # Tuned options of solver (name), {} if it has not been tuned
+    if not os.path.exists(path):
+        return dict()
+    with open(path) as f:
+        return dict(json.load(f).get(solver, dict()))
+
+def save_configuration(solver, configuration, path=DEFAULT_PATH):
+    # Configurations of the other solvers in path are kept
+    configurations = dict()
+    if os.path.exists(path):
+        with open(path) as f:
+            configurations = json.load(f)
+    configurations[solver] = configuration
+    with open(path, 'w') as f:
+        json.dump(configurations, f, indent=2, sort_keys=True)
@@ -0,0 +1,292 @@
+'''
+Formula preprocessing before local search
+
+References
+[1] N. Eén and A. Biere, “Effective preprocessing in SAT through variable and clause elimination,” in Theory and Applications of Satisfiability Testing - SAT 2005, 2005, vol. 3569, pp. 61–75, doi: 10.1007/11499107_5.
+[2] M. Järvisalo, M. J. H. Heule, and A. Biere, “Inprocessing rules,” in Automated Reasoning - IJCAR 2012, 2012, vol. 7364, pp. 355–370, doi: 10.1007/978-3-642-31365-3_28.
+'''
+
+from formula import Formula
+import time
+
+class Preprocessor:
+    '''
+    Simplify a CNF formula, variables keep their numbering (removed variables simply do not occur anymore)
+    - Tautologies and duplicate literals are removed when clauses are loaded
+    - Unit propagation
+    - Pure literal elimination
+    - Duplicate clause removal
+    - Backward subsumption: each clause C removes the clauses D containing C,
+      candidates D are read from the occurrence list of the literal of C with the fewest occurrences
+    - Equivalent literals: literals of a strongly connected component of the binary implication graph
+      are equivalent => replaced by one representative literal
+    - Bounded variable elimination (BVE): x is replaced by all resolvents on x,
+      only if the number of clauses does not grow
+    Model extension: stack of (witness literal, clause) => going back through the stack,
+    if the clause is not satisfied by the model, the witness literal is set to true
+    '''
+
+    def __init__(self, formula, verbose=0):
+        self.nvars = formula.nvars
+        self.verbose = verbose
+        self.nclauses = formula.nclauses
+        self.clauses = [] # None for removed clauses
+        self.occurs = dict() #key: literal -> set of id of clauses which contain literal
+        for x in range(1, self.nvars+1):
+            self.occurs[x] = set()
+            self.occurs[-x] = set()
+        self.value = [0 for _ in range(self.nvars+1)] # +1 / -1 for fixed variables, 2 for substituted / eliminated ones
+        self.units = []
+        self.stack = []
+        self.proven_unsat = False
+        self.nb_changes = 0
+        for clause in formula.clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, clause):
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause): # tautology
+            return
+        i = len(self.clauses)
+        self.clauses.append(clause)
+        for literal in clause:
+            self.occurs[literal].add(i)
+        if len(clause) == 0:
+            self.proven_unsat = True
+        elif len(clause) == 1:
+            self.units.append(clause[0])
+
+    def remove_clause(self, i):
+        for literal in self.clauses[i]:
+            self.occurs[literal].discard(i)
+        self.clauses[i] = None
+        self.nb_changes += 1
+
+    def remove_literal(self, i, literal):
+        clause = self.clauses[i]
+        clause.remove(literal)
+        self.occurs[literal].discard(i)
+        self.nb_changes += 1
+        if len(clause) == 0:
+            self.proven_unsat = True
+        elif len(clause) == 1:
+            self.units.append(clause[0])
+
+    def assign(self, literal):
+        '''
+        Fix literal to true: clauses containing literal are satisfied, -literal is removed from the others
+        '''
+        x = abs(literal)
+        if self.value[x] == 2: # outdated unit, its clause has been removed with the variable
+            return
+        if self.value[x] != 0:
+            if self.value[x] != (1 if literal > 0 else -1):
+                self.proven_unsat = True
+            return
+        self.value[x] = 1 if literal > 0 else -1
+        self.stack.append((literal, [literal]))
+        for i in list(self.occurs[literal]):
+            self.remove_clause(i)
+        for i in list(self.occurs[-literal]):
+            self.remove_literal(i, -literal)
+
+    def unit_propagation(self):
+        while len(self.units) > 0 and not self.proven_unsat:
+            self.assign(self.units.pop())
+
+    def pure_literals(self):
+        for x in range(1, self.nvars+1):
+            if self.value[x] != 0:
+                continue
+            if len(self.occurs[x]) > 0 and len(self.occurs[-x]) == 0:
+                self.assign(x)
+            elif len(self.occurs[-x]) > 0 and len(self.occurs[x]) == 0:
+                self.assign(-x)
+
+    def remove_duplicates(self):
+        seen = set()
+        for i, clause in enumerate(self.clauses):
+            if clause is None:
+                continue
+            key = frozenset(clause)
+            if key in seen:
+                self.remove_clause(i)
+            else:
+                seen.add(key)
+
+    def subsumption(self):
+        order = sorted((i for i, clause in enumerate(self.clauses) if clause is not None),
+                       key=lambda i: len(self.clauses[i]))
+        for i in order:
+            clause = self.clauses[i]
+            if clause is None:
+                continue
+            literals = set(clause)
+            pivot = min(clause, key=lambda literal: len(self.occurs[literal]))
+            for j in list(self.occurs[pivot]):
+                if j != i and len(self.clauses[j]) >= len(clause) and literals.issubset(self.clauses[j]):
+                    self.remove_clause(j)
+
+    def equivalent_literals(self):
+        '''
+        Tarjan's algorithm on the binary implication graph: clause (a, b) => edges -a -> b and -b -> a
+        Every literal of a component is replaced by the literal of the component with the smallest variable
+        x and -x in the same component => UNSAT
+        '''
+        graph = dict((literal, []) for literal in self.occurs)
+        for clause in self.clauses:
+            if clause is not None and len(clause) == 2:
+                a, b = clause
+                graph[-a].append(b)
+                graph[-b].append(a)
+        index, low, on_stack = dict(), dict(), set()
+        scc_stack, representative = [], dict()
+        counter = 0
+        for root in graph:
+            if root in index or len(graph[root]) == 0:
+                continue
+            work = [(root, 0)]
+            while len(work) > 0:
+                v, k = work.pop()
+                if k == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    scc_stack.append(v)
+                    on_stack.add(v)
+                if k < len(graph[v]):
+                    work.append((v, k+1))
+                    w = graph[v][k]
+                    if w not in index:
+                        work.append((w, 0))
+                    elif w in on_stack:
+                        low[v] = min(low[v], index[w])
+                    continue
+                if low[v] == index[v]: # v is the root of a component
+                    component = []
+                    while True:
+                        w = scc_stack.pop()
+                        on_stack.discard(w)
+                        component.append(w)
+                        if w == v:
+                            break
+                    if len(component) > 1:
+                        r = min(component, key=abs)
+                        for w in component:
+                            representative[w] = r
+                if len(work) > 0: # back to the parent
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+        for literal, r in representative.items():
+            if representative.get(-literal) == r:
+                self.proven_unsat = True
+                return
+        for literal, r in representative.items():
+            x = abs(literal)
+            if literal < 0 or x == abs(r) or self.value[x] != 0:
+                continue
+            # x <=> r: x is defined by r in the model extension
+            self.stack.append((x, [x, -r]))
+            self.stack.append((-x, [-x, r]))
+            self.value[x] = 2 # substituted, no longer free
+            for i in list(self.occurs[x]) + list(self.occurs[-x]):
+                clause = [r if l == x else (-r if l == -x else l) for l in self.clauses[i]]
+                self.remove_clause(i)
+                self.add_clause(clause)
+
+    def eliminate_variables(self, max_occurrences=10):
+        '''
+        BVE by clause distribution: clauses of x and -x are replaced by their non tautological resolvents
+        if this does not increase the number of clauses (variables with few occurrences only)
+        '''
+        order = sorted((x for x in range(1, self.nvars+1) if self.value[x] == 0),
+                       key=lambda x: len(self.occurs[x]) * len(self.occurs[-x]))
+        for x in order:
+            pos, neg = list(self.occurs[x]), list(self.occurs[-x])
+            if self.value[x] != 0 or len(pos) + len(neg) == 0 or len(pos) + len(neg) > max_occurrences:
+                continue
+            resolvents = []
+            for i in pos:
+                for j in neg:
+                    resolvent = list(dict.fromkeys([l for l in self.clauses[i] if l != x] + [l for l in self.clauses[j] if l != -x]))
+                    if not any(-l in resolvent for l in resolvent):
+                        resolvents.append(resolvent)
+                if len(resolvents) > len(pos) + len(neg):
+                    break
+            if len(resolvents) > len(pos) + len(neg):
+                continue
+            for i in pos:
+                self.stack.append((x, list(self.clauses[i])))
+            for j in neg:
+                self.stack.append((-x, list(self.clauses[j])))
+            self.value[x] = 2 # eliminated
+            for i in pos + neg:
+                self.remove_clause(i)
+            for resolvent in resolvents:
+                self.add_clause(resolvent)
+            if self.proven_unsat:
+                return
+
+    def size(self):
+        # (nb of clauses, nb of free variables)
+        return sum(1 for clause in self.clauses if clause is not None), self.value.count(0) - 1
+
+    def simplify(self):
+        '''
+        Apply every rule until nothing changes (or a conflict is found)
+        '''
+        self.nb_changes = -1
+        while self.nb_changes != 0 and not self.proven_unsat:
+            self.nb_changes = 0
+            self.unit_propagation()
+            if self.proven_unsat:
+                break
+            self.pure_literals()
+            self.remove_duplicates()
+            self.subsumption()
+
+    def run(self, level=1):
+        '''
+        Return the simplified formula
+            - level >= 1: units, pure literals, duplicates, subsumption
+            - level >= 2: + equivalent literals and bounded variable elimination
+        '''
+        initial_time = time.time()
+        if level >= 1:
+            self.simplify()
+        if level >= 2:
+            size = None
+            while not self.proven_unsat and size != self.size():
+                size = self.size()
+                self.equivalent_literals()
+                self.simplify()
+                if self.proven_unsat:
+                    break
+                self.eliminate_variables()
+                self.simplify()
+        clauses = [] if self.proven_unsat else [list(clause) for clause in self.clauses if clause is not None]
+        formula = Formula(clauses, self.nvars)
+        end_time = time.time()
+        if self.verbose:
+            print('=====================[ Preprocessing    ]=====================')
+            print('|                                                              |')
+            print('|   Nb of fixed variables:{0:10d}                           |'.format(sum(1 for v in self.value if v in (1, -1))))
+            if level >= 2:
+                print('|   Nb of eliminated vars:{0:10d}                           |'.format(self.value.count(2)))
+            print('|   Nb of clauses:        {0:10d}                           |'.format(formula.nclauses))
+            print('|   Removed clauses:      {0:10d}                           |'.format(self.nclauses - formula.nclauses))
+            if self.proven_unsat:
+                print('|   Proven UNSAT                                               |')
+            print('|   Preprocess time: {0:10.4f}s                               |'.format(end_time - initial_time))
+            print('|                                                              |')
+        return formula
+
+    def extend(self, assignment):
+        '''
+        Map a model of the simplified formula back to a model of the input formula
+        (assignment is a list of literals, i.e. assignment[x-1] = x or -x)
+        '''
+        model = list(assignment)
+        for witness, clause in reversed(self.stack):
+            if not any(model[abs(literal)-1] == literal for literal in clause):
+                model[abs(witness)-1] = witness
+        return model
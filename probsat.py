@@ -0,0 +1,73 @@
+'''
+References
+[1] A. Balint and U. Schöning, “Choosing probability distributions for stochastic local search and the role of make versus break,” in Theory and Applications of Satisfiability Testing - SAT 2012, 2012, vol. 7317, pp. 16–29, doi: 10.1007/978-3-642-31612-8_3.
+'''
+
+from base_solver import Base_Solver
+from parameters import Parameter
+import random
+import time
+
+class ProbSAT(Base_Solver):
+    '''
+    probSAT
+    - Pick an UNSAT clause randomly
+    - Pick a variable x of this clause with probability proportional to f(break(x))
+        - polynomial: f(b) = (eps + b)^-cb
+        - exponential: f(b) = cb^-b
+    - f(b) is read from a table computed once, indexed by break count (break = break_score, cached by flip())
+      => each step = k table lookups + one weighted draw
+    '''
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      mode=Parameter('cat', ('poly', 'exp'), 'poly'),
+                      cb=Parameter('real', (1.5, 4.0), 2.38),
+                      eps=Parameter('real', (0.1, 2.0), 1.0, log=True))
+
+    def __init__(self, input_cnf_file, verbose, mode='poly', cb=2.38, eps=1.0, **kwargs):
+        super(ProbSAT, self).__init__(input_cnf_file, verbose, **kwargs)
+        assert mode in ('poly', 'exp')
+        self.mode = mode
+        self.cb = cb
+        self.eps = eps
+        self.table = []
+
+    def probability(self, b):
+        if self.mode == 'poly':
+            return (self.eps + b) ** -self.cb
+        return self.cb ** -b
+
+    def initialize_table(self):
+        '''
+        Break count of x <= nb of occurrences of its true literal => one entry for each possible break count
+        Larger or non integer breaks (weighted instances) fall back to the formula
+        '''
+        max_break = max([len(clauses) for clauses in self.pool.values()] + [0])
+        self.table = [self.probability(b) for b in range(max_break+1)]
+
+    def f(self, b):
+        i = int(b)
+        if i == b and i < len(self.table):
+            return self.table[i]
+        return self.probability(b)
+
+    def solve(self):
+        initial =  time.time()
+        self.initialize_pool()
+        self.initialize_table()
+        while self.nb_tries < self.MAX_TRIES and not self.is_sat:
+            self.generate()
+            self.initialize_cost()
+            while self.nb_flips < self.MAX_FLIPS and not self.is_sat:
+                if self.check() == 1: # if no unsat clause => finish
+                    self.is_sat = True
+                else:
+                    unsat_clause = self.list_clauses[random.choice(self.id_unsat_clauses)]
+                    probs = [self.f(self.break_score[abs(literal)]) for literal in unsat_clause]
+                    if sum(probs) > 0:
+                        x = random.choices(unsat_clause, weights=probs)[0]
+                    else: # f underflows for very large (weighted) breaks => least breaking literal
+                        x = min(unsat_clause, key=lambda l: self.break_score[abs(l)])
+                    self.flip(x)
+
+        return self.report(initial)
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+'''
+Restart strategies of the local search solvers: flip cutoff of each try
+
+Run lengths of SLS algorithms (nb of flips to a model) are often heavy-tailed [1]: a fixed cutoff too long
+wastes most of the budget on unlucky tries, too short and the instance is never solved. Policies:
+    - Fixed(cutoff):          every try runs cutoff flips (default: MAX_FLIPS of the solver, as without policy)
+    - Luby(unit):             unit * 1 1 2 1 1 2 4 1 1 2 ..., within a log factor of the optimal strategy for any
+                              run-length distribution (RLD) [2]
+    - Geometric(first, factor): first * factor^i [3]
+    - Fitted(samples):        fixed cutoff t* minimizing the expected nb of flips to a model E[min(T, t)] / P(T <= t)
+                              [2], on the RLD estimated (Kaplan-Meier, unsolved tries are censored) from the tries
+                              it observed and from samples measured beforehand (see main() below); Luby until
+                              min_samples tries have been solved
+All of them are driven by a Budget of flips (and tries), which may be shared by the tries of several solvers
+(threads, successive instances of a benchmark): each try reserves its cutoff and gives back the flips it did not use.
+
+    solver = build_solver('walksat', 'instance.cnf', 0, restarts='luby')   # or Luby(unit=50), 'geometric', 'fitted'
+    budget = Budget(max_flips=10**6)
+    solvers = [build_solver(name, formula, 0, restarts='luby', budget=budget) for name in names]
+    WalkSAT('instance.cnf', 0).add_driver(Restart_Schedule('luby'))    # same as the first line (see utils.build_solver)
+
+By default the budget is MAX_TRIES * MAX_FLIPS flips (same total as the fixed schedule) and the nb of tries is
+only bounded by it.
+
+    python restarts.py walksat instance.cnf --runs 50 --out rld.json      # RLD of single long tries, fitted cutoff
+    solver = build_solver('walksat', 'instance.cnf', 0, restarts=Fitted.load('rld.json'))
+
+References
+[1] H. H. Hoos and T. Stützle, “Towards a characterization of the behaviour of stochastic local search algorithms for SAT,” Artif. Intell., vol. 112, no. 1, pp. 213–232, 1999, doi: 10.1016/S0004-3702(99)00048-X.
+[2] M. Luby, A. Sinclair, and D. Zuckerman, “Optimal speedup of Las Vegas algorithms,” Inf. Process. Lett., vol. 47, no. 4, pp. 173–180, 1993, doi: 10.1016/0020-0190(93)90029-9.
+[3] T. Walsh, “Search in a small world,” in Proceedings of the Sixteenth International Joint Conference on Artificial Intelligence, 1999, pp. 1172–1177.
+'''
+
+from base_solver import Driver
+from cdcl import CDCL
+from dimacs_parser import parse_formula
+from parameters import Parameter
+from utils import SOLVERS, load_solver
+import numpy as np
+import contextlib
+import threading
+import argparse
+import random
+import json
+import sys
+import io
+
+
+# Tunable options of the schedule (see parameters.py), added to the space of every solver by utils.solver_parameters
+PARAMETERS = {
+    'restarts': Parameter('cat', (None, 'luby', 'geometric', 'fitted'), None),
+}
+
+
+class Budget:
+    '''
+    Flips and tries left to the tries drawing from it (None: unbounded), thread-safe
+    '''
+
+    def __init__(self, max_flips=None, max_tries=None):
+        self.max_flips = max_flips
+        self.max_tries = max_tries
+        self.nb_flips = 0 # reserved by the tries, minus the flips given back
+        self.nb_tries = 0
+        self.lock = threading.Lock()
+
+    def remaining_flips(self):
+        return None if self.max_flips is None else max(self.max_flips - self.nb_flips, 0)
+
+    def exhausted(self):
+        with self.lock:
+            return ((self.max_flips is not None and self.nb_flips >= self.max_flips) or
+                    (self.max_tries is not None and self.nb_tries >= self.max_tries))
+
+    def reserve(self, cutoff):
+        # A new try: return the nb of flips granted to it (at most cutoff, 0 if the budget is exhausted)
+        with self.lock:
+            if self.max_tries is not None and self.nb_tries >= self.max_tries:
+                return 0
+            remaining = self.remaining_flips()
+            granted = cutoff if remaining is None else min(cutoff, remaining)
+            self.nb_tries += 1
+            self.nb_flips += granted
+            return granted
+
+    def release(self, flips):
+        # Flips granted to a try but not used
+        # (flips beyond the cutoff are not charged: moves of several flips, perturbation at the end of a try)
+        with self.lock:
+            self.nb_flips -= flips
+
+
+class Restart_Policy:
+    '''
+    start(nvars, base) is called before the first try of a solve (base: MAX_FLIPS of the solver),
+    next_cutoff() before each try, observe(flips, solved) after it
+    '''
+
+    def start(self, nvars, base):
+        self.nb_cutoffs = 0
+
+    def next_cutoff(self):
+        raise NotImplementedError
+
+    def observe(self, flips, solved):
+        pass
+
+
+class Fixed(Restart_Policy):
+
+    def __init__(self, cutoff=None):
+        self.cutoff = cutoff
+
+    def start(self, nvars, base):
+        super(Fixed, self).start(nvars, base)
+        self.current = self.cutoff or base
+
+    def next_cutoff(self):
+        return self.current
+
+
+class Luby(Restart_Policy):
+
+    def __init__(self, unit=None):
+        self.unit = unit
+
+    def start(self, nvars, base):
+        # Default unit: nvars flips, shorter tries could not even visit every variable
+        super(Luby, self).start(nvars, base)
+        self.current = self.unit or max(nvars, 1)
+
+    def next_cutoff(self):
+        self.nb_cutoffs += 1
+        return self.current * CDCL.luby(self.nb_cutoffs)
+
+
+class Geometric(Restart_Policy):
+
+    def __init__(self, first=None, factor=1.5):
+        self.first = first
+        self.factor = factor
+
+    def start(self, nvars, base):
+        super(Geometric, self).start(nvars, base)
+        self.current = self.first or max(nvars, 1)
+
+    def next_cutoff(self):
+        self.nb_cutoffs += 1
+        return int(round(self.current * self.factor**(self.nb_cutoffs - 1)))
+
+
+def fit_cutoff(flips, solved):
+    '''
+    Optimal fixed cutoff of [2] on the RLD of the samples (flips of each try, solved or censored)
+    Return (cutoff, expected nb of flips to a model), (None, None) if no sample is solved
+    E[min(T, t)] is the area under the Kaplan-Meier survival function up to t, the ratio is minimal at
+    one of the solved run lengths
+    '''
+    flips = np.asarray(flips, dtype=np.float64)
+    solved = np.asarray(solved, dtype=bool)
+    if not solved.any():
+        return None, None
+    times = np.unique(flips[solved])
+    at_risk = np.array([(flips >= t).sum() for t in times], dtype=np.float64)
+    events = np.array([(flips[solved] == t).sum() for t in times], dtype=np.float64)
+    survival = np.cumprod(1 - events / at_risk)            # S(t) just after each solved length
+    before = np.concatenate(([1.0], survival[:-1]))         # S on [previous solved length, t)
+    area = np.cumsum(before * np.diff(np.concatenate(([0.0], times))))
+    expected = area / (1 - survival)
+    i = int(np.argmin(expected))
+    return max(int(times[i]), 1), float(expected[i])
+
+
+class Fitted(Restart_Policy):
+    '''
+    samples: [(flips, solved)] of earlier tries (e.g. measured by main() on the instance or its family),
+    completed by every try the policy observes => keep the policy object to learn across solves
+    '''
+
+    def __init__(self, samples=(), min_samples=5, fallback=None):
+        self.samples = [(int(flips), bool(solved)) for flips, solved in samples]
+        self.min_samples = min_samples
+        self.fallback = fallback or Luby()
+        self.cutoff = None
+        self.refit()
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with open(path) as f:
+            return cls([tuple(sample) for sample in json.load(f)], **kwargs)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.samples, f)
+
+    def refit(self):
+        if sum(solved for _, solved in self.samples) < self.min_samples:
+            self.cutoff = None
+            return
+        self.cutoff, self.expected = fit_cutoff(*zip(*self.samples))
+
+    def start(self, nvars, base):
+        super(Fitted, self).start(nvars, base)
+        self.fallback.start(nvars, base)
+
+    def next_cutoff(self):
+        return self.cutoff if self.cutoff is not None else self.fallback.next_cutoff()
+
+    def observe(self, flips, solved):
+        if flips > 0:
+            self.samples.append((int(flips), bool(solved)))
+            self.refit()
+
+
+POLICIES = {'fixed': Fixed, 'luby': Luby, 'geometric': Geometric, 'fitted': Fitted}
+
+def make_policy(restarts):
+    # Policy of a name (POLICIES, default parameters) or the policy itself
+    return POLICIES[restarts]() if isinstance(restarts, str) else restarts
+
+
+class Restart_Schedule(Driver):
+    '''
+    Driver of the tries of one solver under a policy and a budget: before each try, MAX_FLIPS of the solver
+    becomes the cutoff granted by the budget, and MAX_TRIES ends the search once the budget is exhausted
+    (the outer loop of every solver is unchanged: while nb_tries < MAX_TRIES ... while nb_flips < MAX_FLIPS)
+    '''
+
+    def __init__(self, policy=None, budget=None):
+        self.policy = make_policy(policy) or Fixed()
+        self.shared = budget is not None
+        self.budget = budget
+        self.limits = None  # (MAX_TRIES, MAX_FLIPS) of the solver before the first try
+        self.granted = None # flips granted to the current try
+
+    def begin_try(self, solver):
+        # Called before the counters of the new try are reset
+        if self.limits is None:
+            self.limits = (solver.MAX_TRIES, solver.MAX_FLIPS)
+            if self.budget is None:
+                self.budget = Budget(max_flips=solver.MAX_TRIES * solver.MAX_FLIPS)
+            self.policy.start(solver.nvars, solver.MAX_FLIPS)
+            solver.MAX_TRIES = sys.maxsize
+        self.end_try(solver, False)
+        self.granted = self.budget.reserve(max(int(self.policy.next_cutoff()), 1))
+        solver.MAX_FLIPS = self.granted
+        if self.budget.exhausted(): # last try
+            solver.MAX_TRIES = solver.nb_tries + 1
+
+    def end_try(self, solver, solved):
+        if self.granted is None:
+            return
+        self.budget.release(max(self.granted - solver.nb_flips, 0))
+        self.policy.observe(solver.nb_flips, solved)
+        self.granted = None
+
+    def reset(self, solver):
+        # New solve (incremental solving): limits of the solver are restored, a private budget starts again
+        if self.limits is not None:
+            solver.MAX_TRIES, solver.MAX_FLIPS = self.limits
+        self.limits, self.granted = None, None
+        if not self.shared:
+            self.budget = None
+
+
+def run_lengths(solver, input_cnf_file, nb_runs=20, max_flips=None, seed=0):
+    '''
+    RLD of a solver (name) on an instance: nb_runs single tries of max_flips flips (default: 10 * MAX_FLIPS)
+    Return [(flips, solved)]
+    '''
+    formula = parse_formula(input_cnf_file, 0)
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(nb_runs):
+        random.seed(rng.randrange(2**31))
+        instance = load_solver(solver)(formula, 0)
+        instance.MAX_TRIES = 1
+        instance.MAX_FLIPS = max_flips or 10 * instance.MAX_FLIPS
+        with contextlib.redirect_stdout(io.StringIO()):
+            instance.solve()
+        samples.append((int(instance.nb_flips), bool(instance.is_sat)))
+    return samples
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('solver', choices=list(SOLVERS))
+    argparser.add_argument('instance', help='DIMACS file (CNF or WCNF)')
+    argparser.add_argument('--runs', type=int, default=20)
+    argparser.add_argument('--max-flips', type=int, default=None, help='Flips per run (default: 10 * MAX_FLIPS)')
+    argparser.add_argument('--out', default=None, help='Samples (JSON), see Fitted.load')
+    argparser.add_argument('--seed', type=int, default=0)
+    args = argparser.parse_args()
+    samples = run_lengths(args.solver, args.instance, args.runs, args.max_flips, args.seed)
+    flips = np.array([flips for flips, solved in samples if solved])
+    print('{0}/{1} runs solved'.format(len(flips), len(samples)))
+    if len(flips) > 0:
+        print('run length quantiles (10, 50, 90%): {0}'.format(np.percentile(flips, [10, 50, 90]).astype(int)))
+        cutoff, expected = fit_cutoff(*zip(*samples))
+        print('fitted cutoff: {0} flips, expected {1:.0f} flips to a model (mean of the solved runs {2:.0f})'.format(
+            cutoff, expected, flips.mean()))
+    if args.out is not None:
+        Fitted(samples).save(args.out)
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ References
 '''
 
 from base_solver import Base_Solver
+from parameters import Parameter
+from tabu import Tabu_List
 import numpy as np
 import random
 import time
@@ -12,20 +14,29 @@ from itertools import chain
 
 class RoTS(Base_Solver):
 
-    def __init__(self, input_cnf_file, verbose):
-        super(RoTS, self).__init__(input_cnf_file, verbose)
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      tenure_ratio=Parameter('real', (0.01, 0.5), 0.1, log=True),
+                      tenure_base=Parameter('int', (0, 20), 4),
+                      check_ratio=Parameter('int', (1, 50), 10, log=True))
+
+    def __init__(self, input_cnf_file, verbose, tenure_ratio = 0.1, tenure_base = 4, check_ratio = 10, **kwargs):
+        super(RoTS, self).__init__(input_cnf_file, verbose, **kwargs)
         '''
-        Instead of using a circular list, use a list for tracking last move of each variable
-        If current_time - last_move < tabu_tenure => a tabu move ! 
+        Instead of using a circular list, use a "last move" array (see tabu.py)
+        If current_time < last_move + tabu_tenure => a tabu move ! 
         Else => non-tabu moves
-        Initialize all by -1
+        Last move of each variable is tracked by self.age (forced flips)
+        Tabu tenure = tenure_ratio * nvars + tenure_base, then drawn in [tenure_ratio * nvars, 3 * tenure_ratio * nvars]
+        A variable not flipped within check_ratio * nvars iterations is forced
         '''
-        self.tabu_tenure = int(self.nvars/10 + 4)
-        self.tabu_tenure_MIN = int(self.nvars/10)
-        self.tabu_tenure_MAX = int(self.nvars/10) * 3
-        self.last_move = [-1 for _ in self.assignment]
-        self.best_cost = len(self.list_clauses)
-        self.CHECK_FREQ = self.nvars * 10
+        self.tenure_ratio = tenure_ratio
+        self.tenure_base = tenure_base
+        self.tabu_tenure = int(tenure_ratio*self.nvars + tenure_base)
+        self.tabu_tenure_MIN = int(tenure_ratio*self.nvars)
+        self.tabu_tenure_MAX = int(tenure_ratio*self.nvars) * 3
+        self.tabu = Tabu_List(self.nvars, self.tabu_tenure)
+        self.best_cost = self.weights.sum()
+        self.CHECK_FREQ = self.nvars * check_ratio
     
     def pick_allowed_lits(self,id_unsat_clauses, tabu=True):
         all_allowed_lits = []
@@ -34,16 +45,13 @@ class RoTS(Base_Solver):
             all_allowed_lits += self.list_clauses[ind]   
         all_allowed_lits = list(set(all_allowed_lits))
         if tabu:
-            for lit in all_allowed_lits:
-                if self.nb_flips - self.last_move[abs(lit)-1] < self.tabu_tenure: #tabu move
-                    all_allowed_lits.remove(lit)
-                    non_allowed_lits.append(lit)
+            all_allowed_lits, non_allowed_lits = self.tabu.partition(all_allowed_lits, self.nb_flips)
         return all_allowed_lits, non_allowed_lits
 
     def pick_necessary_flip(self):
-        oldest_move = min(self.last_move)
-        if self.nb_flips - oldest_move > self.CHECK_FREQ:
-            return self.assignment[self.last_move.index(oldest_move)]
+        oldest_var = self.age.oldest()
+        if oldest_var is not None and self.nb_flips - self.age.last_flip(oldest_var) > self.CHECK_FREQ:
+            return self.assignment[oldest_var-1]
         else: 
             return None 
 
@@ -53,9 +61,9 @@ class RoTS(Base_Solver):
         while self.nb_tries < self.MAX_TRIES and not self.is_sat:
             self.generate()
             self.initialize_cost()
-            self.last_move = [-1 for _ in self.assignment]
-            self.best_cost = len(self.id_unsat_clauses)
-            self.tabu_tenure = int(self.nvars/10 + 4)
+            self.best_cost = self.cost()
+            self.tabu_tenure = int(self.tenure_ratio*self.nvars + self.tenure_base)
+            self.tabu.reset(self.tabu_tenure)
             ''' 
             RoTS mechanism within MAX_FLIPS
             ''' 
@@ -75,7 +83,7 @@ class RoTS(Base_Solver):
                 Cost = break - make
                 '''
                 ntb_cost, tb_cost = [], []
-                current_cost = len(self.id_unsat_clauses)
+                current_cost = self.cost()
                 for literal in all_allowed_lits:
                     ntb_cost.append(self.evaluate_breakcount(literal, bs=1, ms=1))
                 x_ntb = all_allowed_lits[np.argmin(ntb_cost)]
@@ -91,9 +99,9 @@ class RoTS(Base_Solver):
                     x = x_ntb
                 
                 self.flip(x) 
-                self.last_move[abs(x)-1] = self.nb_flips
-                if len(self.id_unsat_clauses) < self.best_cost:
-                    self.best_cost = len(self.id_unsat_clauses)
+                self.tabu.add(x, self.nb_flips)
+                if self.cost() < self.best_cost:
+                    self.best_cost = self.cost()
                 '''
                 Every 10n iterations, if a variable is not flipped within 10n iterations 
                 => force X to be flipped !
@@ -102,26 +110,18 @@ class RoTS(Base_Solver):
                     x = self.pick_necessary_flip()
                     if x is not None: 
                         self.flip(x)
-                        self.last_move[abs(x)-1] = self.nb_flips
-                        if len(self.id_unsat_clauses) < self.best_cost:
-                            self.best_cost = len(self.id_unsat_clauses)
+                        self.tabu.add(x, self.nb_flips)
+                        if self.cost() < self.best_cost:
+                            self.best_cost = self.cost()
                 '''
                 Every n iterations => change randomly tabu tenure
                 '''
                 if self.nb_flips % self.nvars == 0:
                     self.tabu_tenure = random.randint(self.tabu_tenure_MIN, self.tabu_tenure_MAX)
+                    self.tabu.set_tenure(self.tabu_tenure)
             if self.check():
                 self.is_sat = True
 
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.check():
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+'''
+Algorithm selection: instance features (features.py) -> solver and parameters, learnt from local benchmark results
+
+    python selector.py benchmark cnf_instances/*.cnf --time-limit 10     # run the configurations, append to the db
+    python selector.py evaluate                                          # leave-one-out over the benchmarked instances
+    python selector.py select instance.cnf                               # solver chosen for a new instance
+    python main.py -i instance.cnf -s auto
+
+- Benchmark db: JSON lines, one run per line (instance, features, solver, options, time limit, cost, time, flips)
+- A run is measured by its time if it found a model, otherwise PAR * time limit (penalized average runtime), and
+  by the cost of its best assignment relative to the total weight
+- Relative score of a configuration on an instance (1 = best): ratio of its mean PAR time to the best one, plus
+  ratio of its mean cost to the best one, minus 1 => each term is normalized on its own scale: on an instance no
+  configuration solves (MaxSAT) every PAR time is the same and configurations are ranked by cost alone, on a
+  solved instance runs which did not solve it are penalized by both terms
+- Selection: k nearest benchmarked instances in the standardized feature space (log scale for sizes), then the
+  configuration with the lowest mean relative score on the neighbors (distance weighted)
+  => scores of easy and hard instances are comparable
+
+References
+[1] J. R. Rice, “The algorithm selection problem,” Adv. Comput., vol. 15, pp. 65–118, 1976, doi: 10.1016/S0065-2458(08)60520-3.
+[2] S. Kadioglu, Y. Malitsky, A. Sabharwal, H. Samulowitz, and M. Sellmann, “Algorithm selection and scheduling,” in Principles and Practice of Constraint Programming, 2011, pp. 454–469, doi: 10.1007/978-3-642-23786-7_35.
+'''
+
+from dimacs_parser import parse_formula
+from features import FEATURE_NAMES, extract_features, feature_vector
+from utils import SOLVERS, build_solver
+import numpy as np
+import argparse
+import contextlib
+import threading
+import json
+import time
+import io
+import os
+
+DEFAULT_PATH = 'benchmarks.jsonl'
+DEFAULT = ('walksat', {'random_walk': True}) # no benchmark result yet
+PAR = 10
+LOG_FEATURES = ('nvars', 'nclauses', 'ratio', 'length_max', 'degree_mean', 'degree_max')
+
+# Configurations run by benchmark(): (solver name, options)
+CONFIGURATIONS = [
+    ('walksat', {'random_walk': True}),
+    ('gsat', {'random_walk': True}),
+    ('gsat_tabu', {}),
+    ('walksat_tabu', {}),
+    ('h_rts', {}),
+    ('novelty', {'random_walk_noise': 0.01}),
+    ('r_novelty', {'random_walk_noise': 0.01}),
+    ('adaptive_novelty', {}),
+    ('rots', {}),
+    ('irots', {}),
+    ('amls', {}),
+    ('saps', {}),
+    ('paws', {}),
+    ('probsat', {}),
+    ('ccanr', {}),
+]
+
+def configuration_key(solver, options):
+    return json.dumps([solver, options], sort_keys=True)
+
+def run_configuration(formula, solver, options, time_limit, max_tries=None):
+    '''
+    Run solver (name) with options on formula for at most time_limit seconds
+    Return (best cost, found a model, time, nb of flips)
+    '''
+    initial = time.time()
+    instance = build_solver(solver, formula, 0, **options)
+    if max_tries is not None:
+        instance.MAX_TRIES = min(instance.MAX_TRIES, max_tries)
+    timer = threading.Timer(max(time_limit - (time.time() - initial), 0), instance.stop)
+    timer.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cost, model, _ = instance.solve_anytime()
+    finally:
+        timer.cancel()
+    return int(cost), bool(instance.is_sat), time.time() - initial, int(instance.nb_flips)
+
+def par_time(record):
+    return record['time'] if record['solved'] else PAR * record['time_limit']
+
+def cost_fraction(record):
+    return record['cost'] / max(record['total_weight'], 1)
+
+def relative_to_best(values, epsilon):
+    # values[j, c] (nan: not run) / best value of row j, epsilon => a best value of 0 gives finite ratios
+    return (values + epsilon) / (np.nanmin(values, axis=1, keepdims=True) + epsilon)
+
+def benchmark(instances, configurations=None, path=DEFAULT_PATH, time_limit=10.0, max_tries=None, verbose=0):
+    '''
+    Run every configuration on every instance, results are appended to the db (path)
+    '''
+    configurations = configurations or CONFIGURATIONS
+    with open(path, 'a') as db:
+        for instance in instances:
+            formula = parse_formula(instance, 0)
+            features = extract_features(formula)
+            total_weight = int(np.asarray(formula.weights, dtype=np.int64).sum())
+            for solver, options in configurations:
+                cost, solved, elapsed, flips = run_configuration(formula, solver, options, time_limit, max_tries)
+                record = {'instance': os.path.abspath(instance), 'features': features, 'solver': solver,
+                          'options': options, 'time_limit': time_limit, 'total_weight': total_weight,
+                          'cost': cost, 'solved': solved, 'time': elapsed, 'flips': flips}
+                db.write(json.dumps(record) + '\n')
+                db.flush()
+                if verbose:
+                    print('{0:40s} {1:18s} cost {2:8d} {3:8.3f}s {4}'.format(os.path.basename(instance), solver,
+                                                                             cost, elapsed, 'SAT' if solved else ''))
+
+def load_records(path=DEFAULT_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as db:
+        return [json.loads(line) for line in db if line.strip()]
+
+
+class Selector:
+    '''
+    k nearest neighbors over the benchmarked instances
+        - features[j]: standardized feature vector of instance j
+        - relative[j, c]: relative score of configuration c on instance j (see above)
+          (configurations not run on instance j get the worst relative score of instance j)
+    '''
+
+    def __init__(self, path=DEFAULT_PATH, k=3, records=None):
+        self.k = k
+        records = records if records is not None else load_records(path)
+        self.instances = sorted(set(record['instance'] for record in records))
+        keys = sorted(set(configuration_key(record['solver'], record['options']) for record in records))
+        self.configurations = [tuple(json.loads(key)) for key in keys]
+        self.column = {key: c for c, key in enumerate(keys)}
+        if len(self.instances) == 0:
+            return
+        row = {instance: j for j, instance in enumerate(self.instances)}
+        features = np.zeros((len(self.instances), len(FEATURE_NAMES)))
+        times = np.zeros((len(self.instances), len(keys)))
+        costs = np.zeros((len(self.instances), len(keys)))
+        counts = np.zeros((len(self.instances), len(keys)))
+        for record in records:
+            j, c = row[record['instance']], self.column[configuration_key(record['solver'], record['options'])]
+            features[j] = feature_vector(record['features'])
+            times[j, c] += par_time(record)
+            costs[j, c] += cost_fraction(record)
+            counts[j, c] += 1
+        run = counts > 0
+        times = np.where(run, times / np.maximum(counts, 1), np.nan)
+        costs = np.where(run, costs / np.maximum(counts, 1), np.nan)
+        relative = relative_to_best(times, 1e-3) + relative_to_best(costs, 1e-3) - 1
+        worst = np.nanmax(relative, axis=1, keepdims=True)
+        self.relative = np.where(np.isnan(relative), worst, relative)
+        self.raw = features
+        self.mean, self.scale = None, None
+        self.features = self.standardize(features, fit=True)
+
+    def transform(self, features):
+        features = np.array(features, dtype=np.float64)
+        for name in LOG_FEATURES:
+            i = FEATURE_NAMES.index(name)
+            features[..., i] = np.log1p(np.maximum(features[..., i], 0))
+        return features
+
+    def standardize(self, features, fit=False):
+        features = self.transform(features)
+        if fit:
+            self.mean = features.mean(axis=0)
+            self.scale = features.std(axis=0)
+            self.scale[self.scale == 0] = 1.0
+        return (features - self.mean) / self.scale
+
+    def rank(self, features, exclude=None):
+        '''
+        Configurations sorted by predicted relative score, [(relative score, (solver, options))]
+        exclude: index of a benchmarked instance left out (evaluate)
+        '''
+        if len(self.instances) == 0:
+            return [(1.0, DEFAULT)]
+        x = self.standardize(feature_vector(features))
+        distances = np.sqrt(((self.features - x)**2).sum(axis=1))
+        if exclude is not None:
+            distances[exclude] = np.inf
+        nearest = np.argsort(distances)[:self.k]
+        nearest = nearest[np.isfinite(distances[nearest])]
+        if len(nearest) == 0:
+            return [(1.0, DEFAULT)]
+        weights = 1.0 / (distances[nearest] + 1e-6)
+        predicted = weights @ self.relative[nearest] / weights.sum()
+        order = np.argsort(predicted, kind='stable')
+        return [(float(predicted[c]), (self.configurations[c][0], dict(self.configurations[c][1]))) for c in order]
+
+    def select(self, input_cnf_file):
+        '''
+        input_cnf_file: path, Formula or features (dict), return (solver name, options)
+        '''
+        features = input_cnf_file if isinstance(input_cnf_file, dict) else extract_features(input_cnf_file)
+        return self.rank(features)[0][1]
+
+    def evaluate(self):
+        '''
+        Leave-one-out: relative score of the selected configuration on each benchmarked instance
+        (1 = best configuration of the instance), and of the best single configuration over all instances
+        '''
+        selected = []
+        for j in range(len(self.instances)):
+            solver, options = self.rank(dict(zip(FEATURE_NAMES, self.raw[j])), exclude=j)[0][1]
+            c = self.column.get(configuration_key(solver, options))
+            selected.append(self.relative[j, c] if c is not None else np.nan)
+        single = self.relative.mean(axis=0) if len(self.instances) > 0 else np.zeros(0)
+        return np.array(selected), single
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('command', choices=['benchmark', 'evaluate', 'select'])
+    argparser.add_argument('instances', nargs='*', help='DIMACS files (CNF or WCNF)')
+    argparser.add_argument('--db', default=DEFAULT_PATH, help='Benchmark results (JSON lines)')
+    argparser.add_argument('--solvers', nargs='*', choices=list(SOLVERS),
+                           help='Only these solvers of the default configurations (benchmark)')
+    argparser.add_argument('--time-limit', type=float, default=10.0, help='Seconds per run (benchmark)')
+    argparser.add_argument('-k', type=int, default=3, help='Nb of neighbors')
+    args = argparser.parse_args()
+    if args.command == 'benchmark':
+        configurations = [conf for conf in CONFIGURATIONS if args.solvers is None or conf[0] in args.solvers]
+        benchmark(args.instances, configurations, args.db, args.time_limit, verbose=1)
+    elif args.command == 'evaluate':
+        selector = Selector(args.db, args.k)
+        selected, single = selector.evaluate()
+        print('{0} instances, {1} configurations'.format(len(selector.instances), len(selector.configurations)))
+        if len(selector.instances) > 0:
+            best = np.argmin(single)
+            print('selector (leave-one-out): mean relative score {0:.3f}'.format(np.nanmean(selected)))
+            print('best single configuration {0}: {1:.3f}'.format(selector.configurations[best], single[best]))
+    else:
+        selector = Selector(args.db, args.k)
+        for instance in args.instances:
+            for predicted, (solver, options) in selector.rank(extract_features(instance))[:3]:
+                print('{0:40s} {1:18s} {2:30s} {3:.3f}'.format(os.path.basename(instance), solver,
+                                                              json.dumps(options), predicted))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+'''
+Local solve server: a long-running service for many small requests
+
+    python server.py --unix /tmp/sat.sock --workers 4        (or --tcp 127.0.0.1:7000)
+
+- Jobs are queued and dispatched to a pool of warm worker processes (numpy and every solver module imported once)
+- Parsed and indexed formulas are cached by content hash (LRU, formulas of running jobs are never evicted),
+  each one is published once in shared memory and attached zero-copy by the workers (see shared_formula.py)
+- Progress (improvements of the best cost) and results are streamed back, jobs can be cancelled
+
+Protocol: one JSON object per line, both ways
+    -> {"op": "solve", "id": any, "cnf": "<DIMACS text>" or "path": "<file>", "solver": "walksat",
+        "options": {solver kwargs}, "max_tries": int, "max_flips": int, "time_limit": seconds, "progress": bool}
+       max_flips = flips per try, or flips of the whole solve with a restart policy (options "restarts")
+    <- {"id", "job", "event": "queued"}
+    <- {"id", "job", "event": "progress", "cost", "flips", "time"}                 (on every improvement)
+    <- {"id", "job", "event": "result", "status": "SAT" / "UNSAT" / "UNKNOWN",
+        "cost", "model", "flips", "tries", "time"}                                (model = best assignment)
+    -> {"op": "cancel", "job": int}    <- {"id", "job", "event": "cancelled"}     (instead of the result)
+    -> {"op": "stats"}                 <- {"event": "stats", "jobs", "workers", "cache"}
+    errors: {"id", "job", "event": "error", "message"}
+Jobs of a client are cancelled when it disconnects.
+'''
+
+from dimacs_parser import parse_formula
+from shared_formula import Shared_Formula, attach
+from utils import SOLVERS, load_solver, build_solver
+from restarts import Budget
+from collections import OrderedDict
+import multiprocessing as mp
+from multiprocessing import resource_tracker
+import socketserver
+import contextlib
+import threading
+import argparse
+import hashlib
+import socket
+import json
+import time
+import io
+import os
+
+FINAL_EVENTS = ('result', 'cancelled', 'error')
+
+
+def worker_main(tasks, events, cancel_flags, cache_size):
+    for name in SOLVERS: # warm: later jobs do not pay any import
+        load_solver(name)
+    formulas = OrderedDict() # key -> attached formula (LRU)
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        try:
+            run_job(task, events, cancel_flags, formulas, cache_size)
+        except Exception as e:
+            events.put({'job': task['job'], 'event': 'error', 'message': repr(e)})
+
+
+def run_job(task, events, cancel_flags, formulas, cache_size):
+    job, slot = task['job'], task['slot']
+    if cancel_flags[slot]: # cancelled while queued
+        events.put({'job': job, 'event': 'cancelled'})
+        return
+    formula = formulas.pop(task['key'], None)
+    if formula is None:
+        formula = attach(task['handle'])
+    formulas[task['key']] = formula
+    while len(formulas) > cache_size:
+        formulas.popitem(last=False)
+    options = dict(task['options'])
+    max_tries, max_flips = task.get('max_tries'), task.get('max_flips')
+    if options.get('restarts') is not None and (max_tries is not None or max_flips is not None):
+        # The schedule sets the cutoff of every try => limits of the job bound the whole solve (see restarts.py)
+        options['budget'] = Budget(max_flips=max_flips, max_tries=max_tries)
+        max_tries, max_flips = None, None
+    solver = build_solver(task['solver'], formula, 0, **options)
+    if max_tries is not None:
+        solver.MAX_TRIES = min(solver.MAX_TRIES, max_tries)
+    if max_flips is not None:
+        solver.MAX_FLIPS = max_flips
+    '''
+    Cancellation / time limit: a watcher thread stops the solver (see Base_Solver.stop, sticky: tries begun
+    afterwards by a restart schedule are empty)
+    '''
+    done = threading.Event()
+    deadline = time.time() + task['time_limit'] if task.get('time_limit') else None
+    def watch():
+        while not done.wait(0.05):
+            if cancel_flags[slot] or (deadline is not None and time.time() > deadline):
+                solver.stop()
+                return
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    callback = None
+    if task.get('progress'):
+        callback = lambda cost, assignment, flips, t: events.put({'job': job, 'event': 'progress', 'cost': int(cost),
+                                                                  'flips': int(flips), 'time': t})
+    initial = time.time()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cost, model, _ = solver.solve_anytime(callback)
+    finally:
+        done.set()
+        watcher.join()
+    if cancel_flags[slot]:
+        events.put({'job': job, 'event': 'cancelled'})
+        return
+    status = 'UNSAT' if solver.proven_unsat else ('SAT' if solver.is_sat else 'UNKNOWN')
+    events.put({'job': job, 'event': 'result', 'status': status,
+                'cost': int(cost) if model is not None else None,
+                'model': [int(literal) for literal in model] if model is not None else None,
+                'flips': int(solver.nb_flips), 'tries': int(solver.nb_tries), 'time': time.time() - initial})
+
+
+class Formula_Cache:
+    '''
+    LRU cache: key (sha256 of the DIMACS content) -> [Shared_Formula, nb of jobs using it]
+    '''
+
+    def __init__(self, capacity=16):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data):
+        # Return (key, handle) for the DIMACS content data (bytes), pinned until release(key)
+        key = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                entry[1] += 1
+                self.entries.move_to_end(key)
+                return key, entry[0].handle
+            self.misses += 1
+        shared = Shared_Formula(parse_formula(io.StringIO(data.decode()), 0)) # parsed without holding the lock
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None: # not published by another client meanwhile
+                entry = [shared, 0]
+                self.entries[key] = entry
+            else:
+                shared.close()
+            entry[1] += 1
+            self.entries.move_to_end(key)
+            self.evict()
+            return key, entry[0].handle
+
+    def release(self, key):
+        with self.lock:
+            self.entries[key][1] -= 1
+            self.evict()
+
+    def evict(self):
+        for key in list(self.entries):
+            if len(self.entries) <= self.capacity:
+                break
+            if self.entries[key][1] == 0:
+                self.entries.pop(key)[0].close()
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self.entries), 'capacity': self.capacity, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        with self.lock:
+            for shared, _ in self.entries.values():
+                shared.close()
+            self.entries.clear()
+
+
+class Client:
+    '''
+    Connection of a client, responses of several jobs are interleaved line by line
+    '''
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.lock = threading.Lock()
+        self.closed = False
+        self.jobs = set()
+
+    def send(self, message):
+        with self.lock:
+            if self.closed:
+                return
+            try:
+                self.wfile.write((json.dumps(message) + '\n').encode())
+                self.wfile.flush()
+            except (OSError, ValueError): # disconnected
+                self.closed = True
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+
+
+class Request_Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        server = self.server.solve_server
+        client = Client(self.wfile)
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                request = None
+                try:
+                    request = json.loads(line)
+                    op = request.get('op')
+                    if op == 'solve':
+                        server.submit(client, request)
+                    elif op == 'cancel':
+                        server.cancel(request['job'])
+                    elif op == 'stats':
+                        client.send(server.stats())
+                    else:
+                        raise ValueError('unknown op {0}'.format(op))
+                except Exception as e:
+                    client.send({'id': request.get('id') if isinstance(request, dict) else None,
+                                 'event': 'error', 'message': repr(e)})
+        except OSError:
+            pass
+        finally:
+            client.close()
+            for job in list(client.jobs):
+                server.cancel(job)
+
+
+class Solve_Server:
+
+    def __init__(self, address, nb_workers=None, cache_size=16, max_jobs=1024):
+        '''
+        address: path of a Unix socket, or (host, port) for TCP
+        max_jobs: nb of queued + running jobs, beyond that solve requests are rejected
+        '''
+        self.address = address
+        self.nb_workers = nb_workers or os.cpu_count()
+        self.cache = Formula_Cache(cache_size)
+        context = mp.get_context()
+        self.tasks = context.Queue()
+        self.events = context.Queue()
+        self.cancel_flags = context.RawArray('b', max_jobs)
+        self.free_slots = list(range(max_jobs))
+        self.jobs = dict() # job -> (client, id of the request, cache key, slot)
+        self.nb_jobs = 0
+        self.lock = threading.Lock()
+        self.workers = [context.Process(target=worker_main, args=(self.tasks, self.events, self.cancel_flags, cache_size),
+                                        daemon=True) for _ in range(self.nb_workers)]
+        self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+        self.server = None
+
+    def start(self):
+        # Workers are started before any thread of the server, and after the resource tracker of shared memory
+        # blocks (otherwise each worker would start its own one, which would unlink the blocks it attached)
+        resource_tracker.ensure_running()
+        for worker in self.workers:
+            worker.start()
+        self.dispatcher.start()
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            self.server = socketserver.ThreadingUnixStreamServer(self.address, Request_Handler)
+        else:
+            socketserver.ThreadingTCPServer.allow_reuse_address = True
+            self.server = socketserver.ThreadingTCPServer(self.address, Request_Handler)
+        self.server.daemon_threads = True
+        self.server.solve_server = self
+
+    def serve_forever(self):
+        self.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.server is not None:
+            self.server.server_close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+        for slot in range(len(self.cancel_flags)):
+            self.cancel_flags[slot] = 1
+        for _ in self.workers:
+            self.tasks.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.events.put(None)
+        self.dispatcher.join()
+        self.cache.close()
+
+    def submit(self, client, request):
+        solver = request.get('solver', 'walksat')
+        if solver not in SOLVERS:
+            raise ValueError('unknown solver {0}'.format(solver))
+        if 'cnf' in request:
+            data = request['cnf'].encode()
+        else:
+            with open(request['path'], 'rb') as f:
+                data = f.read()
+        key, handle = self.cache.get(data)
+        with self.lock:
+            if len(self.free_slots) == 0:
+                self.cache.release(key)
+                raise RuntimeError('too many jobs')
+            slot = self.free_slots.pop()
+            self.cancel_flags[slot] = 0
+            self.nb_jobs += 1
+            job = self.nb_jobs
+            self.jobs[job] = (client, request.get('id'), key, slot)
+            client.jobs.add(job)
+        client.send({'id': request.get('id'), 'job': job, 'event': 'queued'})
+        self.tasks.put({'job': job, 'slot': slot, 'key': key, 'handle': handle, 'solver': solver,
+                        'options': request.get('options', {}), 'max_tries': request.get('max_tries'),
+                        'max_flips': request.get('max_flips'), 'time_limit': request.get('time_limit'),
+                        'progress': request.get('progress', False)})
+
+    def cancel(self, job):
+        with self.lock:
+            if job in self.jobs:
+                self.cancel_flags[self.jobs[job][3]] = 1
+
+    def dispatch(self):
+        # Route the events of the workers to the clients
+        while True:
+            event = self.events.get()
+            if event is None:
+                break
+            with self.lock:
+                entry = self.jobs.get(event['job'])
+                if entry is None:
+                    continue
+                client, request_id, key, slot = entry
+                if event['event'] in FINAL_EVENTS:
+                    del self.jobs[event['job']]
+                    self.free_slots.append(slot)
+                    client.jobs.discard(event['job'])
+            if event['event'] in FINAL_EVENTS:
+                self.cache.release(key)
+            client.send(dict(id=request_id, **event))
+
+    def stats(self):
+        with self.lock:
+            nb_jobs = len(self.jobs)
+        return {'event': 'stats', 'jobs': nb_jobs, 'workers': self.nb_workers, 'cache': self.cache.stats()}
+
+
+def request(address, message):
+    '''
+    Client side: send one request, yield the responses until the final event of the job
+    '''
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(address)
+        sock.sendall((json.dumps(message) + '\n').encode())
+        for line in sock.makefile('rb'):
+            response = json.loads(line)
+            yield response
+            if response['event'] in FINAL_EVENTS or response['event'] == 'stats':
+                break
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = argparser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--unix', help='Path of the Unix socket')
+    group.add_argument('--tcp', help='host:port')
+    argparser.add_argument('--workers', type=int, default=None, help='Nb of worker processes (default: nb of CPUs)')
+    argparser.add_argument('--cache', type=int, default=16, help='Nb of cached formulas')
+    args = argparser.parse_args()
+    if args.unix is not None:
+        address = args.unix
+    else:
+        host, port = args.tcp.rsplit(':', 1)
+        address = (host, int(port))
+    Solve_Server(address, args.workers, args.cache).serve_forever()
+
+if __name__ == '__main__':
+    main()
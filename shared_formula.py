@@ -0,0 +1,185 @@
+'''
+Formula shared between processes
+
+The parsed formula is published once, as flat arrays (Formula.flat_arrays + weights), in a
+multiprocessing.shared_memory block or in a memory-mapped file. Workers attach to it zero-copy: clauses and
+the occurrence index (pool) are read-only views on these arrays, each solver only allocates its mutable
+state (assignment, costs, scores, unsat clauses).
+
+    with Shared_Formula(parse_formula('instance.cnf', 0)) as shared:    # or Shared_Formula(formula, path)
+        pool.map(work, [shared.handle] * nb_workers)                    # the handle is picklable
+    def work(handle):
+        return WalkSAT(handle, 0).solve()                               # Base_Solver attaches to it
+
+Attached formulas are read-only => no incremental API (preprocessing builds a private formula as usual)
+'''
+
+from formula import Formula
+from multiprocessing import shared_memory
+from collections import namedtuple
+import numpy as np
+
+FIELDS = ('clause_start', 'clause_lits', 'occ_start', 'occ_clauses', 'weights')
+
+# name: shared memory block (None if path), layout: (offset, length) of each of FIELDS, int64 arrays
+Formula_Handle = namedtuple('Formula_Handle', ['name', 'path', 'nvars', 'top', 'is_weighted', 'layout'])
+
+
+class Shared_Formula:
+    '''
+    Publisher side: owns the shared memory block (or the file) until close()
+    '''
+
+    def __init__(self, formula, path=None):
+        arrays = formula.flat_arrays() + (np.asarray(formula.weights, dtype=np.int64),)
+        layout, size = [], 0
+        for array in arrays:
+            layout.append((size, len(array)))
+            size += array.nbytes
+        size = max(size, 1)
+        self.shm = None
+        if path is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            buffer = self.shm.buf
+        else:
+            buffer = np.memmap(path, dtype=np.uint8, mode='w+', shape=(size,))
+        for array, (offset, length) in zip(arrays, layout):
+            np.ndarray(length, dtype=np.int64, buffer=buffer, offset=offset)[:] = array
+        if path is not None:
+            buffer.flush()
+        del buffer
+        self.handle = Formula_Handle(self.shm.name if self.shm is not None else None, path, formula.nvars,
+                                     formula.top, formula.is_weighted, tuple(layout))
+
+    def close(self):
+        # Workers must be done with the formula: the block is destroyed (a file is left to the caller)
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def attach(handle):
+    # Worker side: Array_Formula on the published arrays, nothing is copied
+    if handle.path is None:
+        try:
+            shm = shared_memory.SharedMemory(name=handle.name, track=False) # Python >= 3.13
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=handle.name)
+        buffer = shm.buf
+    else:
+        shm = None
+        buffer = np.memmap(handle.path, dtype=np.uint8, mode='r')
+    arrays = []
+    for offset, length in handle.layout:
+        array = np.ndarray(length, dtype=np.int64, buffer=buffer, offset=offset)
+        array.flags.writeable = False
+        arrays.append(array)
+    return Array_Formula(arrays, handle.nvars, handle.top, handle.is_weighted, shm)
+
+
+class Clause_View:
+    '''
+    list_clauses of an Array_Formula: clause i is read from clause_lits when accessed (list of int)
+    Every access slices the arrays and allocates a new list (~1 us, vs ~50 ns to index a list of lists)
+    => the hot loops of Base_Solver read the arrays directly (flip_arrays, initialize_cost_arrays)
+    '''
+
+    __slots__ = ('clause_start', 'clause_lits')
+
+    def __init__(self, clause_start, clause_lits):
+        self.clause_start = clause_start
+        self.clause_lits = clause_lits
+
+    def __len__(self):
+        return len(self.clause_start) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        nclauses = len(self.clause_start) - 1
+        if i < 0:
+            i += nclauses
+        if not 0 <= i < nclauses:
+            raise IndexError(i)
+        return self.clause_lits[self.clause_start[i]:self.clause_start[i+1]].tolist()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class Occurrence_View:
+    '''
+    pool of an Array_Formula: key: literal -> ids of clauses which contain literal (list of int)
+    Every access allocates a new list, as Clause_View
+    '''
+
+    __slots__ = ('occ_start', 'occ_clauses', 'nvars')
+
+    def __init__(self, occ_start, occ_clauses, nvars):
+        self.occ_start = occ_start
+        self.occ_clauses = occ_clauses
+        self.nvars = nvars
+
+    def __len__(self):
+        return 2*self.nvars
+
+    def __contains__(self, literal):
+        return 0 < abs(literal) <= self.nvars
+
+    def __getitem__(self, literal):
+        if literal not in self:
+            raise KeyError(literal)
+        k = 2*abs(literal) + (literal < 0)
+        return self.occ_clauses[self.occ_start[k]:self.occ_start[k+1]].tolist()
+
+    def keys(self):
+        for x in range(1, self.nvars+1):
+            yield x
+            yield -x
+
+    def __iter__(self):
+        return self.keys()
+
+    def values(self):
+        return (self[literal] for literal in self.keys())
+
+    def items(self):
+        return ((literal, self[literal]) for literal in self.keys())
+
+
+class Array_Formula(Formula):
+    '''
+    Read-only formula on flat arrays (see attach, and compact.py for private compact formulas)
+    '''
+
+    read_only = True
+
+    def __init__(self, arrays, nvars, top, is_weighted, shm=None):
+        self.arrays = arrays
+        self.shm = shm # keeps the shared memory block mapped
+        clause_start, clause_lits, occ_start, occ_clauses, weights = arrays
+        self.clauses = Clause_View(clause_start, clause_lits)
+        self.nvars = nvars
+        self.weights = weights
+        self.top = top
+        self.is_weighted = is_weighted
+
+    def nb_hard(self):
+        return int(np.count_nonzero(self.weights >= self.top))
+
+    def clause_arrays(self):
+        return tuple(self.arrays[:2])
+
+    def flat_arrays(self):
+        return tuple(self.arrays[:4])
+
+    def occurrences(self):
+        return Occurrence_View(self.arrays[2], self.arrays[3], self.nvars)
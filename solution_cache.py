@@ -0,0 +1,188 @@
+'''
+Persistent solution cache (sqlite), keyed by a canonical hash of the clause set
+
+    cache = Solution_Cache('solutions.db')
+    status, cost, model = cache.solve(WalkSAT, 'instance.cnf', random_walk=True)
+
+- Canonical hash: every clause gets a 64-bit hash which does not depend on the order of its literals
+  (sum of mixed literals, then mixed with its weight), the key of the formula is the sha256 of nvars and
+  of its sorted clause hashes => order of clauses / literals does not matter
+- SAT: the model is stored, UNKNOWN (budget exhausted): the best assignment and its cost, UNSAT: only the status
+- Hit: the cached assignment is verified in one vectorized pass (Formula.satisfied) before being trusted,
+  SAT / UNSAT hits are returned without any search
+- Near hit (same nb of variables, at most near_fraction of the clauses changed) and UNKNOWN hit:
+  the search warm-starts from the cached assignment (init_assignment of the solver)
+- Near-hit candidates are found in SQL: every entry indexes its SKETCH smallest clause hashes (bottom-k sketch),
+  only entries sharing one of them with the formula are compared clause by clause
+  (a formula with 5% of its clauses changed shares none of them with probability ~0.05^16)
+Assignments are stored bit-packed (1 bit per variable).
+'''
+
+from dimacs_parser import parse_formula
+from formula import Formula
+from utils import build_solver
+import numpy as np
+import contextlib
+import hashlib
+import sqlite3
+import time
+import io
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    nvars INTEGER,
+    nclauses INTEGER,
+    status TEXT,
+    cost INTEGER,
+    assignment BLOB,
+    clause_hashes BLOB,
+    updated REAL
+);
+CREATE TABLE IF NOT EXISTS sketches (
+    hash INTEGER,
+    key TEXT,
+    PRIMARY KEY (hash, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS size ON solutions (nvars, nclauses);
+'''
+
+SKETCH = 16
+
+def mix(x):
+    # splitmix64 finalizer on uint64 arrays (wraps around)
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def clause_hashes(formula):
+    # Sorted 64-bit hashes of the (weighted) clauses
+    clause_start, clause_lits = formula.clause_arrays()
+    if formula.nclauses == 0:
+        return np.zeros(0, dtype=np.uint64)
+    mixed = mix(clause_lits.astype(np.int64).view(np.uint64))
+    sums = np.add.reduceat(mixed, clause_start[:-1])
+    weights = np.asarray(formula.weights, dtype=np.int64).view(np.uint64)
+    return np.sort(mix(sums ^ mix(weights)))
+
+def formula_key(formula, hashes=None):
+    if hashes is None:
+        hashes = clause_hashes(formula)
+    digest = hashlib.sha256(np.int64(formula.nvars).tobytes())
+    digest.update(hashes.tobytes())
+    return digest.hexdigest()
+
+def sketch(hashes):
+    # SKETCH smallest distinct clause hashes (sorted), as sqlite integers
+    return [int(h) for h in np.unique(hashes)[:SKETCH].view(np.int64)]
+
+def pack(assignment):
+    # assignment is a list of literals, i.e. assignment[x-1] = x or -x
+    return np.packbits(np.asarray(assignment) > 0).tobytes()
+
+def unpack(data, nvars):
+    values = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=nvars).astype(bool)
+    return [x if v else -x for x, v in zip(range(1, nvars+1), values)]
+
+
+class Solution_Cache:
+
+    def __init__(self, path='solutions.db', near_fraction=0.05):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        for key, data in self.db.execute('SELECT key, clause_hashes FROM solutions WHERE key NOT IN '
+                                         '(SELECT key FROM sketches)').fetchall(): # entries of an older cache
+            self.index(key, np.frombuffer(data, dtype=np.uint64))
+        self.db.commit()
+        self.near_fraction = near_fraction
+
+    def index(self, key, hashes):
+        self.db.execute('DELETE FROM sketches WHERE key = ?', (key,))
+        self.db.executemany('INSERT INTO sketches VALUES (?, ?)', ((h, key) for h in sketch(hashes)))
+
+    def remove(self, key):
+        self.db.execute('DELETE FROM solutions WHERE key = ?', (key,))
+        self.db.execute('DELETE FROM sketches WHERE key = ?', (key,))
+
+    def close(self):
+        self.db.close()
+
+    def verify(self, formula, assignment):
+        # Weighted cost of assignment (vectorized)
+        satisfied = formula.satisfied(assignment)
+        return int(np.asarray(formula.weights, dtype=np.int64)[~satisfied].sum())
+
+    def lookup(self, formula):
+        '''
+        Return (kind, status, cost, assignment)
+            - kind = 'hit':  same clause set, the assignment (if any) has been verified
+            - kind = 'near': assignment of the closest cached formula (cost on this formula)
+            - kind = None:   nothing usable
+        '''
+        hashes = clause_hashes(formula)
+        key = formula_key(formula, hashes)
+        row = self.db.execute('SELECT status, cost, assignment FROM solutions WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            status, cost, data = row
+            if status == 'UNSAT':
+                return 'hit', status, None, None
+            assignment = unpack(data, formula.nvars)
+            if self.verify(formula, assignment) == cost:
+                return 'hit', status, cost, assignment
+            self.remove(key) # corrupted entry
+            self.db.commit()
+        max_changes = int(self.near_fraction * formula.nclauses)
+        best = None
+        signature, distinct = sketch(hashes), np.unique(hashes) # duplicated clauses are not changes
+        for status, data, other in self.db.execute(
+                'SELECT status, assignment, clause_hashes FROM solutions WHERE key IN '
+                '(SELECT DISTINCT key FROM sketches WHERE hash IN ({0})) '
+                'AND nvars = ? AND nclauses BETWEEN ? AND ? AND status != ?'.format(','.join('?' * len(signature))),
+                signature + [formula.nvars, formula.nclauses - max_changes, formula.nclauses + max_changes, 'UNSAT']):
+            other = np.unique(np.frombuffer(other, dtype=np.uint64))
+            changes = len(distinct) + len(other) - 2*len(np.intersect1d(distinct, other, assume_unique=True))
+            if changes <= max_changes and (best is None or changes < best[0]):
+                best = (changes, data)
+        if best is None:
+            return None, None, None, None
+        assignment = unpack(best[1], formula.nvars)
+        return 'near', 'UNKNOWN', self.verify(formula, assignment), assignment
+
+    def store(self, formula, status, cost, assignment):
+        # Keep the better of the cached and the new result (UNSAT / SAT > lower cost)
+        hashes = clause_hashes(formula)
+        key = formula_key(formula, hashes)
+        row = self.db.execute('SELECT status, cost FROM solutions WHERE key = ?', (key,)).fetchone()
+        if row is not None and (row[0] in ('SAT', 'UNSAT') or (status == 'UNKNOWN' and cost >= row[1])):
+            return
+        data = pack(assignment) if assignment is not None else None
+        self.db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        (key, formula.nvars, formula.nclauses, status, cost, data, hashes.tobytes(), time.time()))
+        self.index(key, hashes)
+        self.db.commit()
+
+    def solve(self, solver_class, input_cnf_file, verbose=0, **kwargs):
+        '''
+        Return (status, cost, model): status SAT / UNSAT / UNKNOWN, model = best assignment found
+        solver_class: class or name of the solver, kwargs: its options (see utils.build_solver)
+        '''
+        formula = input_cnf_file if isinstance(input_cnf_file, Formula) else parse_formula(input_cnf_file, verbose)
+        kind, status, cost, assignment = self.lookup(formula)
+        if kind == 'hit' and status in ('SAT', 'UNSAT'):
+            return status, cost, assignment
+        if assignment is not None and not kwargs.get('preprocess'): # warm start from the cached assignment
+            kwargs = dict(kwargs, init_assignment=assignment)
+        solver = build_solver(solver_class, formula, verbose, **kwargs)
+        with contextlib.redirect_stdout(io.StringIO()) if not verbose else contextlib.nullcontext():
+            best_cost, model, _ = solver.solve_anytime()
+        best_cost = int(best_cost) # numpy integer of the solver => same type as a cached cost
+        status = 'UNSAT' if solver.proven_unsat else ('SAT' if solver.is_sat else 'UNKNOWN')
+        if status == 'UNSAT':
+            model, best_cost = None, None
+        elif assignment is not None and (model is None or cost < best_cost): # cached assignment is still the best
+            best_cost, model = cost, assignment
+        if model is not None and best_cost == 0:
+            status = 'SAT'
+        self.store(formula, status, best_cost, model)
+        return status, best_cost, model
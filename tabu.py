@@ -0,0 +1,63 @@
+'''
+Tabu memory shared by the tabu-based solvers (GSAT/Tabu, WalkSAT/Tabu, H-RTS, RoTS, IRoTS, AMLS)
+
+Instead of a FIFO list of flipped variables, keep for every variable the iteration of its last flip
+=> "last move" array (as the last_move lists of the original solvers).
+    - move x is tabu at iteration t  <=>  t - last[|x|] < tabu_tenure
+    - x flipped at iteration t  =>  last[|x|] = t
+The test uses the current tenure => a new tenure applies at once to every past move (RoTS draws a new
+tenure regularly, AMLS every step). Checking a move, adding a move and changing the tabu tenure are all O(1).
+'''
+
+import numpy as np
+
+NEVER = -2**62 # last move of a variable not flipped yet: never tabu
+
+class Tabu_List:
+
+    __slots__ = ('nvars', 'tabu_tenure', 'last')
+
+    def __init__(self, nvars, tabu_tenure=0):
+        self.nvars = nvars
+        self.tabu_tenure = tabu_tenure
+        self.last = np.full(nvars+1, NEVER, dtype=np.int64) # index 0 is unused, variables are 1..nvars
+
+    def reset(self, tabu_tenure=None):
+        '''
+        Forget every tabu move (e.g. at the beginning of a new try)
+        '''
+        self.last.fill(NEVER)
+        if tabu_tenure is not None:
+            self.tabu_tenure = tabu_tenure
+
+    def set_tenure(self, tabu_tenure):
+        '''
+        New tenure also applies to the moves already added
+        '''
+        self.tabu_tenure = tabu_tenure
+
+    def resize(self, nvars):
+        # New variables (incremental solving) are not tabu
+        if nvars > self.nvars:
+            self.last = np.concatenate((self.last, np.full(nvars - self.nvars, NEVER, dtype=np.int64)))
+            self.nvars = nvars
+
+    def add(self, literal, step):
+        self.last[abs(literal)] = step
+
+    def is_tabu(self, literal, step):
+        return step - self.last[abs(literal)] < self.tabu_tenure
+
+    def until(self, literal):
+        # First iteration at which the move is no longer tabu (with the current tenure)
+        return int(self.last[abs(literal)]) + self.tabu_tenure
+
+    def partition(self, literals, step):
+        '''
+        Split candidates into (non tabu moves, tabu moves) in a single vectorized pass
+        '''
+        if len(literals) == 0:
+            return [], []
+        literals = np.asarray(literals)
+        mask = step - self.last[np.abs(literals)] < self.tabu_tenure
+        return literals[~mask].tolist(), literals[mask].tolist()
@@ -0,0 +1,47 @@
+'''
+Exhaustive enumeration of the models of small formulas (reference for the soundness tests)
+'''
+
+import random
+
+import numpy as np
+
+from formula import Formula
+
+
+def all_assignments(nvars):
+    # values[a, x-1] = True <=> x is true in assignment a
+    return (np.arange(2**nvars)[:, None] >> np.arange(nvars)[None, :]) & 1 == 1
+
+
+def models(clauses, nvars):
+    values = all_assignments(nvars)
+    sat = np.ones(len(values), dtype=bool)
+    for clause in clauses:
+        satisfied = np.zeros(len(values), dtype=bool)
+        for literal in clause:
+            column = values[:, abs(literal)-1]
+            satisfied |= column if literal > 0 else ~column
+        sat &= satisfied
+    return [[x if v else -x for x, v in zip(range(1, nvars+1), row)] for row in values[sat]]
+
+
+def satisfies(clauses, assignment):
+    true = set(assignment)
+    return all(any(literal in true for literal in clause) for clause in clauses)
+
+
+def random_cnf(rng, nvars, nclauses):
+    # Mixed lengths (units, binary clauses for equivalences, ternary), repeated literals and tautologies allowed
+    clauses = []
+    for _ in range(nclauses):
+        length = rng.choices([1, 2, 3, 4], weights=[1, 12, 20, 4])[0]
+        clauses.append([rng.randint(1, nvars) * rng.choice([-1, 1]) for _ in range(length)])
+    return Formula(clauses, nvars)
+
+
+def random_instances(seed, count, min_vars=8, max_vars=12):
+    rng = random.Random(seed)
+    for _ in range(count):
+        nvars = rng.randint(min_vars, max_vars)
+        yield random_cnf(rng, nvars, rng.randint(2*nvars, 5*nvars))
@@ -0,0 +1,37 @@
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from formula import Formula
+
+
+def make_random_formula(rng, nvars, nclauses, k=3, weighted=False, max_weight=5):
+    '''
+    Random k-CNF (distinct variables in each clause), weighted => random soft weights and a few hard clauses
+    '''
+    clauses = []
+    for _ in range(nclauses):
+        length = rng.randint(1, k) if k > 3 else k
+        variables = rng.sample(range(1, nvars+1), min(length, nvars))
+        clauses.append([x * rng.choice([-1, 1]) for x in variables])
+    if not weighted:
+        return Formula(clauses, nvars)
+    weights = [rng.randint(1, max_weight) for _ in clauses]
+    top = sum(weights) + 1
+    for i in rng.sample(range(nclauses), nclauses // 10):
+        weights[i] = top
+    return Formula(clauses, nvars, weights, top)
+
+
+@pytest.fixture
+def random_formula():
+    return make_random_formula
+
+
+@pytest.fixture
+def rng():
+    return random.Random(20240601)
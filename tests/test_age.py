@@ -0,0 +1,79 @@
+'''
+Age_Index against a plain array of last flip steps, over random flip sequences
+'''
+
+import random
+
+import pytest
+
+from age import Age_Index
+
+
+def order(age):
+    # Variables from the head (least recently flipped) to the tail of the recency list
+    variables, x = [], age.next[0]
+    while x != 0:
+        variables.append(int(x))
+        x = age.next[x]
+    return variables
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_age_index_matches_last_flip_steps(compact):
+    rng = random.Random(27)
+    for nvars in (1, 2, 5, 40):
+        age = Age_Index(nvars, compact)
+        last = [-1 for _ in range(nvars+1)]
+        assert order(age) == list(range(1, nvars+1))
+        for step in range(1, 300):
+            x = rng.randint(1, nvars) if rng.random() < 0.8 else int(age.most_recent()) # repeated flips
+            age.touch(x * rng.choice([-1, 1]), step)
+            last[x] = step
+            never = [y for y in range(1, nvars+1) if last[y] < 0]
+            assert order(age) == never + sorted((y for y in range(1, nvars+1) if last[y] >= 0), key=last.__getitem__)
+            assert age.oldest() == order(age)[0] and age.most_recent() == x
+            assert age.last_flip(-x) == step
+            candidates = [y * rng.choice([-1, 1]) for y in rng.sample(range(1, nvars+1), rng.randint(1, nvars))]
+            steps = [last[abs(lit)] for lit in candidates]
+            assert age.most_recent_of(candidates) == candidates[steps.index(max(steps))]
+            assert age.least_recent_of(candidates) == candidates[steps.index(min(steps))]
+            accepted = set(abs(lit) for lit in candidates)
+            flipped = [y for y in accepted if last[y] >= 0]
+            assert age.most_recent_where(accepted.__contains__) == \
+                   (max(flipped, key=last.__getitem__) if flipped else None)
+            a, b = rng.randint(1, nvars), rng.randint(1, nvars)
+            assert age.is_older(a, -b) == (last[a] < last[b])
+        age.reset()
+        assert order(age) == list(range(1, nvars+1)) and age.most_recent_where(lambda y: True) is None
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_new_variables_are_the_oldest(compact):
+    age = Age_Index(3, compact)
+    age.touch(2, 1)
+    age.touch(-1, 2)
+    age.resize(5)
+    assert order(age) == [5, 4, 3, 2, 1] and age.last_flip(5) == -1
+    age.touch(4, 3)
+    assert order(age) == [5, 3, 2, 1, 4] and age.oldest() == 5
+
+
+@pytest.mark.parametrize('tabu', [False, True])
+def test_amls_most_recent_allowed_move(rng, tabu):
+    # Read from the recency list: same variable as the scan of the allowed moves
+    from adaptive_memory_LS import AMLS
+    from conftest import make_random_formula
+    solver = AMLS(make_random_formula(rng, 30, 140), 0)
+    random.seed(5)
+    solver.initialize_params(first=True)
+    for _ in range(400):
+        if solver.check():
+            break
+        x = solver.pick_neighborhood()
+        solver.flip(x)
+        solver.tabu.add(x, solver.nb_flips)
+        solver.update_params()
+        allowed, _ = solver.pick_allowed_lits(tabu=tabu)
+        flipped = [abs(lit) for lit in allowed if solver.age.last[abs(lit)] >= 0]
+        expected = abs(solver.age.most_recent_of(flipped)) if flipped else None
+        assert solver.most_recent_allowed(tabu) == expected
@@ -0,0 +1,62 @@
+'''
+Anytime API: improvements reported by solve_anytime / improvements(), models extended only where they are read
+'''
+
+import random
+import threading
+import time
+
+from brute_force import satisfies
+from conftest import make_random_formula
+from walksat import WalkSAT
+
+
+def test_improvements_are_extended_by_the_consumer(rng, capsys):
+    random.seed(39)
+    formula = make_random_formula(rng, 60, 250)
+    clauses = [list(clause) for clause in formula.clauses]
+    solver = WalkSAT(formula, 0, preprocess=1)
+    solver.MAX_TRIES = 5
+    extended = []
+    extend = solver.preprocessor.extend
+    def recorded(assignment):
+        extended.append(threading.current_thread() is threading.main_thread())
+        return extend(assignment)
+    solver.preprocessor.extend = recorded
+    events = list(solver.improvements())
+    assert len(events) > 2
+    costs = [cost for cost, _, _, _ in events]
+    assert costs == sorted(costs, reverse=True) and len(set(costs)) == len(costs)
+    assert all(len(model) == formula.nvars for _, model, _, _ in events)
+    if costs[-1] == 0:
+        assert satisfies(clauses, events[-1][1])
+    assert extended.count(True) == len(events) # one extension per event, read by the consumer
+    assert extended.count(False) <= 2 # search thread: final results of solve() / solve_anytime() only
+
+
+def test_solve_anytime_callback_gets_the_current_assignment(rng, capsys):
+    random.seed(39)
+    solver = WalkSAT(make_random_formula(rng, 40, 170), 0)
+    solver.MAX_TRIES = 3
+    reported = []
+    solver.solve_anytime(lambda cost, assignment, flips, t: reported.append((cost, assignment is solver.assignment)))
+    assert len(reported) > 0 and all(current for _, current in reported)
+    assert reported[-1][0] == solver.best_found_cost
+
+
+def test_closing_improvements_stops_the_search(rng, capsys):
+    random.seed(39)
+    solver = WalkSAT(make_random_formula(rng, 30, 300), 0) # far beyond the threshold => UNSAT
+    solver.MAX_TRIES = 10**6
+    solver.MAX_FLIPS = 1000
+    nb_threads = threading.active_count()
+    events = solver.improvements()
+    next(events)
+    initial = time.time()
+    events.close()
+    assert time.time() - initial < 5
+    assert threading.active_count() == nb_threads
+    assert solver.nb_tries < 10**6
+    nb_tries = solver.nb_tries
+    time.sleep(0.1)
+    assert solver.nb_tries == nb_tries
@@ -0,0 +1,40 @@
+import random
+
+import numpy as np
+import pytest
+
+from conftest import make_random_formula
+from base_solver import Base_Solver
+from shared_formula import Shared_Formula, attach
+
+
+def state(solver):
+    return (np.asarray(solver.costs, dtype=np.int64).tolist(), solver.break_score.tolist(),
+            solver.make_score.tolist(), list(solver.id_unsat_clauses), int(solver.unsat_weight))
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+@pytest.mark.parametrize('mode', ['compact', 'shared'])
+def test_array_flips_match_list_flips(rng, weighted, mode):
+    # flip_arrays() reads the CSR arrays: same costs, scores and unsat list (same order) as flip() on lists
+    formula = make_random_formula(rng, 30, 130, k=4, weighted=weighted)
+    shared = Shared_Formula(formula) if mode == 'shared' else None
+    try:
+        reference = Base_Solver(formula, 0)
+        solver = Base_Solver(attach(shared.handle), 0) if shared else Base_Solver(formula, 0, compact=True)
+        assert solver.flat is not None
+        for s in (reference, solver):
+            random.seed(3)
+            s.initialize_pool()
+            s.generate()
+            s.initialize_cost()
+        assert state(solver) == state(reference)
+        for _ in range(300):
+            x = rng.randint(1, formula.nvars)
+            reference.flip(x)
+            solver.flip(x)
+            assert state(solver) == state(reference)
+        assert solver.best_found_cost == reference.best_found_cost
+    finally:
+        if shared:
+            shared.close()
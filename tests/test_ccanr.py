@@ -0,0 +1,50 @@
+'''
+CCAnr: candidate sets maintained on every flip and weight update against a recompute
+'''
+
+import random
+
+import numpy as np
+import pytest
+
+from ccanr import CCAnr
+from conftest import make_random_formula
+
+
+def check_candidates(solver):
+    scores = solver.make_score - solver.break_score
+    good = [x for x in range(1, solver.nvars+1) if scores[x] > solver.EPSILON]
+    assert sorted(solver.good) == good
+    assert sorted(solver.ccd) == [x for x in good if solver.conf_changed[x]]
+    assert solver.total_weight == pytest.approx(solver.score_weights.sum())
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_candidate_sets_match_recompute(rng, weighted):
+    random.seed(32)
+    solver = CCAnr(make_random_formula(rng, 40, 180, weighted=weighted), 0, gamma=2, rho=0.5) # frequent smoothing
+    solver.initialize_pool()
+    solver.initialize_neighbors()
+    solver.generate()
+    solver.reset_weights()
+    solver.initialize_cost()
+    solver.initialize_candidates()
+    check_candidates(solver)
+    for step in range(600):
+        if step % 5 == 0 and len(solver.id_unsat_clauses) > 0:
+            solver.update_weights()
+        else:
+            x = random.randint(1, solver.nvars)
+            neighbors = set(solver.neighbors[x])
+            solver.flip(x)
+            assert not solver.conf_changed[x] and all(solver.conf_changed[y] for y in neighbors)
+        check_candidates(solver)
+    assert len(solver.raised) > 0
+
+
+def test_neighbors():
+    from formula import Formula
+    solver = CCAnr(Formula([[1, -2], [2, 3], [-3, 4], [5]], 5), 0)
+    solver.initialize_pool()
+    solver.initialize_neighbors()
+    assert [sorted(nbrs) for nbrs in solver.neighbors[1:]] == [[2], [1, 3], [2, 4], [3], []]
@@ -0,0 +1,41 @@
+'''
+CDCL against exhaustive enumeration, with and without conflict budgets
+'''
+
+import random
+
+from brute_force import models, random_instances, satisfies
+from cdcl import CDCL
+
+
+def test_cdcl_status_and_models():
+    for formula in random_instances(38, 400):
+        clauses = [list(clause) for clause in formula.clauses]
+        expected = len(models(clauses, formula.nvars)) > 0
+        solver = CDCL(clauses, formula.nvars)
+        result = solver.solve()
+        assert result is expected
+        if result:
+            assert satisfies(clauses, solver.model())
+
+
+def test_cdcl_conflict_budgets():
+    # Runs interrupted by their budget resume (learnt clauses are kept) and end with the right status
+    rng = random.Random(0)
+    for formula in random_instances(39, 200):
+        clauses = [list(clause) for clause in formula.clauses]
+        expected = len(models(clauses, formula.nvars)) > 0
+        solver = CDCL(clauses, formula.nvars)
+        solver.set_phases([x * rng.choice([-1, 1]) for x in range(1, formula.nvars+1)])
+        result = None
+        for _ in range(1000):
+            result = solver.solve(max_conflicts=1)
+            if result is not None:
+                break
+        assert result is expected
+        if result:
+            assert satisfies(clauses, solver.model())
+
+
+def test_luby():
+    assert [CDCL.luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
@@ -0,0 +1,92 @@
+'''
+SAPS / PAWS: incremental scores under dynamic clause weights against a full recompute, bounds of the weights
+'''
+
+import random
+
+import numpy as np
+import pytest
+
+from clause_weighting import SAPS, PAWS
+from conftest import make_random_formula
+
+
+def recompute(solver):
+    # break / make with the dynamic weights, weighted cost with the weights of the instance
+    break_score, make_score = np.zeros(solver.nvars+1), np.zeros(solver.nvars+1)
+    true = set(solver.assignment)
+    unsat, cost = [], 0
+    for i, clause in enumerate(solver.list_clauses):
+        true_literals = [literal for literal in clause if literal in true]
+        if len(true_literals) == 0:
+            unsat.append(i)
+            cost += solver.weights[i]
+            for literal in clause:
+                make_score[abs(literal)] += solver.score_weights[i]
+        elif len(true_literals) == 1:
+            break_score[abs(true_literals[0])] += solver.score_weights[i]
+    return break_score, make_score, sorted(unsat), cost
+
+
+def steps(solver, nb_steps):
+    # Inner loop of Clause_Weighting.solve, one move or weight update per step
+    solver.initialize_pool()
+    solver.generate()
+    solver.reset_weights()
+    solver.initialize_cost()
+    for _ in range(nb_steps):
+        if solver.check():
+            break
+        variables = solver.candidate_vars()
+        x, score = solver.pick_best(variables)
+        if score < -solver.EPSILON:
+            solver.flip(x)
+        else:
+            solver.escape(variables, x, score)
+        yield
+
+
+CONFIGURATIONS = [(SAPS, {}), (SAPS, {'p_smooth': 1.0, 'rho': 0.5, 'wp': 0.2}), (PAWS, {}),
+                  (PAWS, {'max_inc': 2, 'p_flat': 0.0})]
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+@pytest.mark.parametrize('solver_class, options', CONFIGURATIONS)
+def test_incremental_scores_match_recompute(rng, solver_class, options, weighted):
+    random.seed(30)
+    solver = solver_class(make_random_formula(rng, 40, 190, weighted=weighted), 0, **options)
+    nb_updates = 0
+    for _ in steps(solver, 1500):
+        break_score, make_score, unsat, cost = recompute(solver)
+        assert np.allclose(solver.break_score, break_score) and np.allclose(solver.make_score, make_score)
+        assert sorted(solver.id_unsat_clauses) == unsat and solver.unsat_weight == cost
+        assert sorted(solver.raised) == np.flatnonzero(solver.score_weights != solver.base_weights).tolist()
+        nb_updates += len(solver.raised) > 0
+    assert nb_updates > 0 # weights have been changed
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_saps_weights_stay_in_bounds(rng, weighted):
+    # Scaling multiplies by alpha, smoothing pulls back toward the initial weight: w_0 <= w <= w_0 * alpha^scalings
+    random.seed(31)
+    solver = SAPS(make_random_formula(rng, 40, 190, weighted=weighted), 0, p_smooth=0.3)
+    nb_scalings = np.zeros(len(solver.list_clauses))
+    escape = solver.escape
+    def counted(variables, x, score):
+        escape(variables, x, score)
+        nb_scalings[solver.id_unsat_clauses] += 1 # scaled: unsat after the random walk step of escape()
+    solver.escape = counted
+    for _ in steps(solver, 1500):
+        assert np.all(solver.score_weights >= solver.base_weights)
+        assert np.all(solver.score_weights <= solver.base_weights * solver.alpha**nb_scalings * (1 + 1e-9))
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_paws_weights_stay_in_bounds(rng, weighted):
+    # Additive: each weight is a multiple of its initial weight w_0, w_0 <= w <= w_0 * (1 + nb of increases)
+    random.seed(32)
+    solver = PAWS(make_random_formula(rng, 40, 190, weighted=weighted), 0, max_inc=3)
+    for _ in steps(solver, 1500):
+        multiples = solver.score_weights / solver.base_weights
+        assert np.allclose(multiples, np.round(multiples))
+        assert np.all(multiples >= 1) and np.all(multiples <= 1 + solver.nb_increases)
@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+import pytest
+
+from cooperative import Elite_Pool, solve_cooperative
+from walksat import WalkSAT
+from probsat import ProbSAT
+
+
+@pytest.fixture
+def cnf_file(tmp_path, random_formula, rng):
+    formula = random_formula(rng, 20, 80)
+    path = tmp_path / 'f.cnf'
+    path.write_text('p cnf {0} {1}\n'.format(formula.nvars, formula.nclauses) +
+                    ''.join(' '.join(map(str, clause)) + ' 0\n' for clause in formula.clauses))
+    return str(path), formula
+
+
+def test_cooperative_solves(cnf_file):
+    path, formula = cnf_file
+    cost, model, reports = solve_cooperative(path, [(WalkSAT, {'random_walk': True}), (ProbSAT, {})], seed=1)
+    assert len(reports) == 2
+    assert model is not None and cost == formula.cost(model) == 0 # satisfiable instance
+    for name, worker_cost, worker_model, tries, error in reports:
+        assert error is None and worker_cost == formula.cost(worker_model)
+
+
+def test_failed_worker_is_reported(cnf_file):
+    path, _ = cnf_file
+    cost, model, reports = solve_cooperative(path, [(WalkSAT, {'bogus': 1}), (WalkSAT, {'random_walk': True})], seed=1)
+    assert reports[0][1] is None and 'bogus' in reports[0][4]
+    assert reports[1][4] is None and cost == reports[1][1]
+
+
+def test_every_worker_failed(cnf_file):
+    path, _ = cnf_file
+    with pytest.raises(RuntimeError):
+        solve_cooperative(path, [(WalkSAT, {'bogus': 1})])
+
+
+@pytest.fixture
+def pool():
+    pool = Elite_Pool(20, size=3, min_distance=3)
+    yield pool
+    pool.close()
+
+
+def assignment(bits):
+    # bits: set of true variables of 1..20
+    return [x if x in bits else -x for x in range(1, 21)]
+
+
+@pytest.mark.parametrize('nvars', [1, 7, 8, 9, 20, 64])
+def test_pack_round_trip(nvars):
+    rng = random.Random(nvars)
+    pool = Elite_Pool(nvars, size=2)
+    try:
+        for _ in range(20):
+            values = [x * rng.choice([-1, 1]) for x in range(1, nvars+1)]
+            bits = pool.pack(values)
+            assert len(bits) == pool.nbytes == (nvars + 7) // 8
+            assert pool.unpack(bits) == values
+        assert pool.distances(pool.pack(values), np.array([pool.pack([-l for l in values])]))[0] == nvars
+    finally:
+        pool.close()
+
+
+def test_publish_and_draw(pool):
+    assert pool.best() == (None, None) and pool.draw() is None
+    a, b = assignment({1, 2, 3}), assignment({10, 11, 12, 13})
+    pool.publish(a, 5)
+    pool.publish(b, 3)
+    assert pool.best() == (3, b) and not pool.is_done()
+    assert pool.draw(cost=3) is None # only strictly better elites
+    assert pool.draw(cost=4) == b
+    assert pool.draw(assignment=b, cost=10) == a # b is too close to itself
+    random.seed(0)
+    draws = [pool.draw() for _ in range(100)] # binary tournament: the worst elite only wins against itself
+    assert 50 < draws.count(b) < 100 and draws.count(a) == 100 - draws.count(b)
+    pool.publish(assignment(set()), 0)
+    assert pool.is_done() and pool.best()[0] == 0
+
+
+def test_hamming_diversity_replacement(pool):
+    a, b, c = assignment({1, 2, 3}), assignment({10, 11, 12, 13}), assignment({15, 16, 17, 18, 19})
+    for elite, cost in ((a, 5), (b, 6), (c, 7)):
+        pool.publish(elite, cost)
+    # Close to a (distance 1): only replaces a, if better
+    near_a = assignment({1, 2})
+    pool.publish(near_a, 6)
+    assert sorted(pool.elites()[0].tolist()) == [5, 6, 7]
+    pool.publish(near_a, 4)
+    costs, bits = pool.elites()
+    assert sorted(costs.tolist()) == [4, 6, 7] and [pool.unpack(row) for row in bits].count(a) == 0
+    # Far from every elite, pool full: replaces the worst one (c), if better
+    far = assignment({5, 6, 7, 8, 9})
+    pool.publish(far, 8)
+    assert sorted(pool.elites()[0].tolist()) == [4, 6, 7]
+    pool.publish(far, 2)
+    costs, bits = pool.elites()
+    assert sorted(costs.tolist()) == [2, 4, 6]
+    assert sorted(map(tuple, (pool.unpack(row) for row in bits))) == sorted(map(tuple, (near_a, b, far)))
+    assert pool.header[1] == 7 # nb of publications
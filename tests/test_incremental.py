@@ -0,0 +1,151 @@
+'''
+Incremental API (new_var, add_clause(s), assume, enable / disable, warm starts) against exhaustive enumeration
+'''
+
+import random
+
+import numpy as np
+import pytest
+
+from brute_force import models, satisfies
+from conftest import make_random_formula
+from formula import Formula
+from utils import build_solver
+
+
+def fresh(formula):
+    # The solver extends the clause list of its formula (incremental API)
+    return Formula([list(clause) for clause in formula.clauses], formula.nvars)
+
+
+def solve(solver):
+    solver.MAX_TRIES = 5
+    return solver.solve()
+
+
+def scores(solver):
+    return (np.asarray(solver.costs).tolist(), solver.break_score.tolist(), solver.make_score.tolist(),
+            sorted(solver.id_unsat_clauses), int(solver.unsat_weight))
+
+
+def recomputed(solver):
+    solver.initialize_cost()
+    return scores(solver)
+
+
+@pytest.fixture(scope='module')
+def instances():
+    rng = random.Random(40)
+    return [make_random_formula(rng, 10, rng.randint(25, 45)) for _ in range(12)]
+
+
+@pytest.mark.parametrize('name', ['walksat', 'walksat_tabu', 'probsat', 'saps', 'ccanr', 'amls'])
+def test_frozen_variables_never_change(name, instances, capsys):
+    random.seed(1)
+    for formula in instances:
+        assumptions = [random.choice([-1, 1]) * x for x in random.sample(range(1, formula.nvars+1), 2)]
+        expected = [m for m in models(formula.clauses, formula.nvars) if set(assumptions) <= set(m)]
+        solver = build_solver(name, fresh(formula), 0, random_walk=True) if name == 'walksat' else \
+                 build_solver(name, fresh(formula), 0)
+        solver.assume(assumptions)
+        flip = solver.flip
+        def checked(literal):
+            frozen = abs(literal) in solver.frozen
+            memory = [np.copy(getattr(solver, a)) for a in ('vf', 'vs', 'nf', 'ns') if hasattr(solver, 'vf')]
+            configuration = list(getattr(solver, 'conf_changed', []))
+            flip(literal)
+            assert all(solver.assignment[abs(l)-1] == l for l in assumptions)
+            if frozen: # no-op move: AMLS clause memory and CCAnr configurations are unchanged
+                assert all(np.array_equal(m, getattr(solver, a)) for m, a in zip(memory, ('vf', 'vs', 'nf', 'ns')))
+                assert list(getattr(solver, 'conf_changed', [])) == configuration
+        solver.flip = checked
+        model = solve(solver)
+        if len(expected) > 0:
+            assert model is not None and satisfies(formula.clauses, model) and set(assumptions) <= set(model)
+        else:
+            assert model is None
+
+
+def test_frozen_flip_is_not_recorded(instances):
+    # Direct flips of a frozen variable: no change of the AMLS clause memory nor of the CCAnr candidates
+    random.seed(5)
+    formula = instances[0]
+    amls, ccanr = build_solver('amls', fresh(formula), 0), build_solver('ccanr', fresh(formula), 0)
+    ccanr.initialize_pool()
+    ccanr.initialize_neighbors()
+    for solver in (amls, ccanr):
+        solver.generate()
+        solver.initialize_cost()
+    ccanr.initialize_candidates()
+    x = formula.clauses[0][0]
+    for solver in (amls, ccanr):
+        solver.assume([-solver.assignment[abs(x)-1]]) # frozen to the other value, cost recomputed
+        solver.flip(abs(x)) # previous value of x: its clauses become SAT / UNSAT if it were flipped
+    assert not any(amls.vf.tolist() + amls.vs.tolist())
+    ccanr.conf_changed[abs(x)] = True
+    ccanr.flip(abs(x))
+    assert ccanr.conf_changed[abs(x)]
+    assert sorted(ccanr.ccd) == sorted(y for y in ccanr.good if ccanr.conf_changed[y])
+
+
+def test_clauses_added_between_solves(instances, capsys):
+    random.seed(2)
+    for formula in instances:
+        solver = build_solver('walksat', fresh(formula), 0, random_walk=True)
+        first = solve(solver)
+        if first is None:
+            continue
+        blocking = [-literal for literal in random.sample(first, 3)] # excludes the first model
+        x = solver.new_var()
+        assert x == formula.nvars + 1 and len(solver.assignment) == x
+        solver.add_clauses([blocking, [x, first[0]]], [1, 1])
+        assert scores(solver) == recomputed(solver) # incremental costs and scores
+        clauses = formula.clauses + [blocking, [x, first[0]]]
+        model = solve(solver)
+        if len(models(clauses, x)) > 0:
+            assert model is not None and satisfies(clauses, model)
+        else:
+            assert model is None
+
+
+def test_disabled_clauses_are_removed(instances, capsys):
+    random.seed(3)
+    for formula in instances:
+        solutions = models(formula.clauses, formula.nvars)
+        if len(solutions) == 0:
+            continue
+        literal = solutions[0][0] # some model has literal, maybe none has -literal
+        solver = build_solver('walksat', fresh(formula), 0, random_walk=True)
+        a = solver.add_clause([literal], activation=True)
+        b = solver.add_clause([-literal], activation=True)
+        assert solve(solver) is None # both enabled => contradiction
+        solver.disable(b)
+        assert solver.frozen == {a: a, b: -b}
+        model = solve(solver)
+        assert model is not None and satisfies(formula.clauses, model) and literal in model
+        solver.disable(a)
+        solver.enable(b)
+        model = solve(solver)
+        if any(-literal in m for m in solutions):
+            assert model is not None and satisfies(formula.clauses, model) and -literal in model
+        else:
+            assert model is None
+
+
+def test_warm_start_from_previous_assignment(instances, capsys):
+    random.seed(4)
+    for formula in instances:
+        solver = build_solver('walksat', fresh(formula), 0, random_walk=True)
+        if solve(solver) is None:
+            continue
+        previous = list(solver.assignment)
+        solver.add_clause([-previous[0], -previous[1]]) # unsat for the previous assignment
+        starts = []
+        initialize_cost = solver.initialize_cost
+        def recorded():
+            starts.append(list(solver.assignment))
+            initialize_cost()
+        solver.initialize_cost = recorded
+        solve(solver)
+        assert starts[0] == previous
+        assert solver.nb_tries >= 1
@@ -0,0 +1,104 @@
+'''
+Initial assignments of the tries (init_mode, init_noise) on small hand-built formulas
+'''
+
+import random
+
+import pytest
+
+from base_solver import Base_Solver
+from brute_force import satisfies
+from conftest import make_random_formula
+from formula import Formula
+from utils import build_solver
+
+# Occurrences: 1 => 3 positive / 1 negative, 2 => 1 / 3, 3 => 3 / 1
+CLAUSES = [[1, 2], [1, -3], [-2, 3], [-2], [3, -1], [1, -2, 3]]
+
+
+def solver_of(clauses, nvars, weights=None, **options):
+    formula = Formula(clauses, nvars) if weights is None else Formula(clauses, nvars, weights, sum(weights) + 1)
+    solver = Base_Solver(formula, 0, **options)
+    solver.initialize_pool()
+    return solver
+
+
+def test_polarity_assignment():
+    assert solver_of(CLAUSES, 3).polarity_assignment() == [1, -2, 3]
+    assert solver_of(CLAUSES, 3, [1, 5, 1, 1, 1, 1]).polarity_assignment() == [1, -2, -3]
+    assert solver_of(CLAUSES, 3, [1, 1, 1, 1, 9, 1]).polarity_assignment() == [-1, -2, 3]
+    ties = set()
+    for seed in range(10):
+        random.seed(seed)
+        ties.add(tuple(solver_of([[1, 2], [-1, 2]], 2).polarity_assignment()))
+    assert ties == {(1, 2), (-1, 2)} # tie => random polarity
+
+
+def test_greedy_assignment_propagates(monkeypatch):
+    # Order 1..4: -1 (2 open clauses against 1) => 4 (unit of [1, 4]) => 2 (unit of [2, -4]) and -3 (unit of [-3, -4])
+    clauses = [[-1, 2], [-1, -2, 3], [1, 4], [2, -4], [-3, -4]]
+    monkeypatch.setattr(random, 'shuffle', lambda order: None)
+    assignment = solver_of(clauses, 4).greedy_assignment()
+    assert assignment == [-1, 2, -3, 4] and satisfies(clauses, assignment)
+    monkeypatch.setattr(random, 'shuffle', lambda order: order.reverse())
+    assert satisfies(clauses, solver_of(clauses, 4).greedy_assignment())
+
+
+def test_greedy_assignment_only_counts_open_clauses(monkeypatch):
+    # Order 1..3: 1 satisfies the clauses with -2 and -3 but [3, -2] => 2 (2 open clauses against 1) => 3 (unit)
+    clauses = [[1, -2], [1, -3], [1, -2, -3], [2], [3, -2], [2]]
+    monkeypatch.setattr(random, 'shuffle', lambda order: None)
+    assert solver_of(clauses, 3).greedy_assignment() == [1, 2, 3]
+    assert solver_of(clauses, 3).polarity_assignment() == [1, -2, -3] # counts every clause
+
+
+def test_pure_literals_are_satisfied(rng):
+    # Every variable has a single polarity => polarity and greedy both satisfy every clause
+    for _ in range(10):
+        signs = [rng.choice([-1, 1]) for _ in range(20)]
+        clauses = [[x * signs[x-1] for x in rng.sample(range(1, 21), 3)] for _ in range(60)]
+        solver = solver_of(clauses, 20)
+        assert satisfies(clauses, solver.polarity_assignment())
+        assert satisfies(clauses, solver.greedy_assignment())
+
+
+@pytest.mark.parametrize('init_mode', ['polarity', 'greedy'])
+def test_zero_init_noise_is_deterministic(init_mode, monkeypatch):
+    monkeypatch.setattr(random, 'shuffle', lambda order: None)
+    solver = solver_of(CLAUSES, 3, [1, 5, 1, 1, 1, 1], init_mode=init_mode, init_noise=0)
+    expected = solver.polarity_assignment() if init_mode == 'polarity' else solver.greedy_assignment()
+    for seed in range(10):
+        random.seed(seed)
+        solver.generate()
+        assert solver.assignment == expected
+    solver.init_noise = 0.5
+    assignments = set()
+    for seed in range(10):
+        random.seed(seed)
+        solver.generate()
+        assignments.add(tuple(solver.assignment))
+    assert len(assignments) > 1
+
+
+def test_best_mode_restarts_from_the_best_assignment(rng, capsys):
+    random.seed(37)
+    solver = build_solver('walksat', make_random_formula(rng, 40, 200), 0, init_mode='best', init_noise=0)
+    solver.MAX_TRIES, solver.MAX_FLIPS = 2, 300
+    generate = solver.generate
+    starts = []
+    def recorded():
+        best = solver.best_found_assignment
+        generate()
+        starts.append((best, list(solver.assignment)))
+    solver.generate = recorded
+    solver.solve()
+    assert starts[0][0] is None
+    assert len(starts) == 2 and starts[1][1] == starts[1][0]
+
+
+@pytest.mark.parametrize('init_mode', ['random', 'polarity', 'greedy', 'best'])
+def test_init_modes_solve(rng, init_mode, capsys):
+    random.seed(37)
+    formula = make_random_formula(rng, 40, 160)
+    model = build_solver('walksat', formula, 0, init_mode=init_mode).solve()
+    assert model is not None and formula.cost(model) == 0
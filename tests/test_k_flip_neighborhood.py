@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from conftest import make_random_formula
+from gsat import GSAT
+
+
+def flipped_cost(formula, assignment, variables):
+    assignment = list(assignment)
+    for x in variables:
+        assignment[x-1] *= -1
+    return formula.cost(assignment)
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+@pytest.mark.parametrize('compact', [False, True])
+def test_cached_move_costs_follow_the_flips(rng, weighted, compact):
+    # Cached interaction terms are refreshed after every flip (single flips and k-flip moves) and every try
+    formula = make_random_formula(rng, 12, 50, weighted=weighted)
+    random.seed(7)
+    solver = GSAT(formula, 0, neighborhood=3, compact=compact)
+    k_flip = solver.k_flip
+    solver.initialize_pool()
+    for _ in range(2):
+        solver.generate()
+        solver.initialize_cost()
+        for _ in range(60):
+            current = formula.cost(list(solver.assignment))
+            candidates = [x for x in range(1, formula.nvars+1) if rng.random() < 0.5]
+            for k in (2, 3):
+                for move, cost in k_flip.generate_moves(candidates, k):
+                    assert cost == flipped_cost(formula, solver.assignment, move) - current
+            move = rng.choice([(x,) for x in range(1, formula.nvars+1)] + list(k_flip.shared))
+            for x in move:
+                solver.flip(x)
+
+
+def test_shared_clauses_are_indexed_once(rng):
+    formula = make_random_formula(rng, 10, 30)
+    solver = GSAT(formula, 0, neighborhood=2)
+    expected = dict()
+    for i, clause in enumerate(formula.clauses):
+        for x in clause:
+            for y in clause:
+                if abs(x) < abs(y):
+                    expected.setdefault((abs(x), abs(y)), []).append(i)
+    assert solver.k_flip.shared == expected
+    assert solver.k_flip.shared_clauses(5, 5) == []
+    for x in range(1, formula.nvars+1):
+        assert sorted(solver.k_flip.get_neighbors(x)) == sorted(
+            set(abs(l) for clause in formula.clauses if x in map(abs, clause) for l in clause) - {x})
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_move_costs_use_the_score_weights(rng, compact):
+    # Interaction terms are weighted like break / make, i.e. by score_weights when they differ from the weights
+    formula = make_random_formula(rng, 12, 50, weighted=True)
+    random.seed(28)
+    solver = GSAT(formula, 0, neighborhood=3, compact=compact)
+    solver.initialize_pool()
+    for _ in range(3):
+        solver.generate()
+        solver.initialize_cost()
+        for i in rng.sample(range(formula.nclauses), 20):
+            solver.set_score_weight(i, rng.choice([0.5, 2.0, 7.25]))
+        before = formula.satisfied(list(solver.assignment))
+        candidates = list(range(1, formula.nvars+1))
+        for k in (2, 3):
+            for move, cost in solver.k_flip.generate_moves(candidates, k):
+                assignment = list(solver.assignment)
+                for x in move:
+                    assignment[x-1] *= -1
+                after = formula.satisfied(assignment)
+                expected = float(solver.score_weights[before & ~after].sum() - solver.score_weights[~before & after].sum())
+                assert cost == pytest.approx(expected)
@@ -0,0 +1,69 @@
+'''
+Equivalence of the kernels (kernels.py) with the Python path of Base_Solver on random flip sequences,
+compiled (if numba is installed) and as plain Python functions
+'''
+
+import random
+
+import numpy as np
+import pytest
+
+import kernels
+from base_solver import Base_Solver
+from kernels import Kernel_State
+
+MODES = ['python', pytest.param('numba', marks=pytest.mark.skipif(not kernels.HAS_NUMBA, reason='numba not installed'))]
+
+
+@pytest.fixture(params=MODES)
+def kernel_mode(request, monkeypatch):
+    if request.param == 'python' and kernels.HAS_NUMBA: # run the undecorated functions
+        for name in dir(kernels):
+            function = getattr(kernels, name)
+            if hasattr(function, 'py_func'):
+                monkeypatch.setattr(kernels, name, function.py_func)
+    return request.param
+
+
+def assert_same_state(solver, state):
+    assert np.array_equal(np.asarray(solver.costs, dtype=np.int64), state.nb_true)
+    assert np.allclose(solver.break_score, state.break_score)
+    assert np.allclose(solver.make_score, state.make_score)
+    assert sorted(solver.id_unsat_clauses) == sorted(state.unsat_clauses())
+    assert solver.cost() == state.cost()
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+@pytest.mark.parametrize('compact', [False, True])
+def test_flip_sequences(kernel_mode, random_formula, rng, weighted, compact):
+    for _ in range(5):
+        formula = random_formula(rng, 30, 130, k=4, weighted=weighted)
+        random.seed(rng.randrange(2**31))
+        solver = Base_Solver(formula, 0, compact=compact)
+        solver.initialize_pool()
+        solver.generate()
+        solver.initialize_cost()
+        state = Kernel_State(solver)
+        state.load(solver.assignment)
+        assert_same_state(solver, state)
+        for _ in range(300):
+            x = rng.randint(1, formula.nvars)
+            solver.flip(x)
+            state.flip(x)
+            assert_same_state(solver, state)
+        assert state.assignment() == solver.assignment
+
+
+def test_walksat_run_keeps_its_best_assignment(kernel_mode, random_formula, rng):
+    formula = random_formula(rng, 40, 170)
+    random.seed(1)
+    solver = Base_Solver(formula, 0)
+    solver.initialize_pool()
+    solver.generate()
+    state = Kernel_State(solver)
+    state.load(solver.assignment)
+    kernels.seed(1)
+    nb_flips, best_cost = state.walksat(500, 0.2)
+    assert 0 < nb_flips <= 500
+    assert formula.cost(state.assignment(best=True)) == best_cost
+    assert best_cost == 0 or nb_flips == 500
@@ -0,0 +1,47 @@
+'''
+Clause-local mode of the Novelty family
+'''
+
+import random
+
+import pytest
+
+from base_solver import Base_Solver
+from conftest import make_random_formula
+from formula import Formula
+from utils import build_solver
+
+
+def test_pick_clause_literals_ordering():
+    # Only clause 0 is unsat: cost = break - make, ties broken by last flip, then by literal
+    formula = Formula([[1, 2, -8, 3, 4], [-1, 5], [-2, 6]], 8)
+    solver = Base_Solver(formula, 0)
+    solver.initialize_pool()
+    solver.assignment = [-1, -2, -3, -4, -5, -6, -7, 8]
+    solver.initialize_cost()
+    assert solver.id_unsat_clauses == [0]
+    for literal, step in ((4, 1), (2, 2), (-1, 5)): # 3 and 8 are never flipped
+        solver.age.touch(literal, step)
+    literals, cost, most_recent = solver.pick_clause_literals()
+    assert literals == [-8, 3, 4, 2, 1]
+    assert cost == [-1, -1, -1, 0, 0]
+    assert most_recent == 1
+    solver.age.reset()
+    assert solver.pick_clause_literals()[2] is None # nothing flipped yet
+
+
+@pytest.mark.parametrize('name', ['novelty', 'r_novelty', 'adaptive_novelty'])
+@pytest.mark.parametrize('clause_local', [False, True])
+def test_clause_local_solves(rng, name, clause_local, capsys):
+    random.seed(33)
+    formula = make_random_formula(rng, 40, 160)
+    solver = build_solver(name, formula, 0, clause_local=clause_local)
+    picked = []
+    pick_clause_literals = solver.pick_clause_literals
+    def recorded():
+        picked.append(pick_clause_literals())
+        return picked[-1]
+    solver.pick_clause_literals = recorded
+    model = solver.solve()
+    assert model is not None and formula.cost(model) == 0
+    assert (len(picked) > 0) == clause_local
@@ -0,0 +1,39 @@
+'''
+Soundness of preprocessing against exhaustive enumeration: UNSAT claims, satisfiability of the simplified
+formula and models extended back to the input formula
+'''
+
+import pytest
+
+from brute_force import models, random_instances, satisfies
+from preprocessing import Preprocessor
+
+
+@pytest.mark.parametrize('level', [1, 2])
+def test_preprocessing_is_sound(level):
+    for formula in random_instances(level, 300):
+        clauses = [list(clause) for clause in formula.clauses]
+        expected = models(clauses, formula.nvars)
+        preprocessor = Preprocessor(formula)
+        simplified = preprocessor.run(level)
+        if preprocessor.proven_unsat:
+            assert expected == []
+            continue
+        simplified_models = models(simplified.clauses, simplified.nvars)
+        assert (len(simplified_models) > 0) == (len(expected) > 0)
+        for model in simplified_models[:20]:
+            assert satisfies(clauses, preprocessor.extend(model))
+
+
+def test_solver_with_preprocessing_and_cdcl():
+    # Status and model reported by a local search solver (preprocessed formula, CDCL after local search)
+    from walksat import WalkSAT
+    for formula in random_instances(2, 100):
+        clauses = [list(clause) for clause in formula.clauses]
+        expected = len(models(clauses, formula.nvars)) > 0
+        solver = WalkSAT(formula, 0, preprocess=2, complete='after')
+        solver.MAX_TRIES = 2
+        cost, model, _ = solver.solve_anytime()
+        assert solver.proven_unsat is not expected
+        if expected:
+            assert cost == 0 and satisfies(clauses, model)
@@ -0,0 +1,40 @@
+'''
+probSAT: break-probability table against the formula it caches
+'''
+
+import random
+
+import pytest
+
+from conftest import make_random_formula
+from probsat import ProbSAT
+
+
+@pytest.mark.parametrize('mode, cb, eps', [('poly', 2.38, 1.0), ('poly', 3.1, 0.4), ('exp', 2.5, 1.0)])
+def test_table_matches_formula(rng, mode, cb, eps):
+    solver = ProbSAT(make_random_formula(rng, 30, 130), 0, mode=mode, cb=cb, eps=eps)
+    solver.initialize_pool()
+    solver.initialize_table()
+    max_break = max(len(clauses) for clauses in solver.pool.values())
+    assert len(solver.table) == max_break + 1
+    expected = (lambda b: (eps + b) ** -cb) if mode == 'poly' else (lambda b: cb ** -b)
+    for b in range(2 * len(solver.table)): # beyond the table: formula fallback
+        assert solver.f(b) == pytest.approx(expected(b), rel=1e-12)
+        assert solver.f(float(b)) == solver.f(b) # break scores are floats
+    for b in (0.5, 2.25, len(solver.table) + 0.5): # weighted breaks
+        assert solver.f(b) == pytest.approx(expected(b), rel=1e-12)
+
+
+def test_break_counts_are_read_from_the_table(rng):
+    # CNF: every break count met during the search is a table entry
+    solver = ProbSAT(make_random_formula(rng, 30, 130), 0)
+    fallback = []
+    probability, initialize_table = solver.probability, solver.initialize_table
+    def recorded():
+        initialize_table()
+        solver.probability = lambda b: fallback.append(b) or probability(b)
+    solver.initialize_table = recorded
+    random.seed(31)
+    solver.MAX_TRIES = 2
+    solver.solve()
+    assert solver.nb_flips > 0 and fallback == []
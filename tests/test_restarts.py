@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+
+from restarts import Budget, Luby, fit_cutoff
+from utils import SOLVERS, build_solver
+
+
+def run(name, formula, seed=3, **options):
+    random.seed(seed)
+    np.random.seed(seed)
+    solver = build_solver(name, formula, 0, **options)
+    solver.MAX_TRIES = 3
+    solver.solve()
+    return solver
+
+
+@pytest.fixture(scope='module')
+def formulas():
+    from conftest import make_random_formula
+    rng = random.Random(7)
+    return [make_random_formula(rng, 20, 91), make_random_formula(rng, 20, 120, weighted=True)]
+
+
+@pytest.mark.parametrize('name', list(SOLVERS))
+def test_fixed_policy_reproduces_default_tries(name, formulas, capsys):
+    for formula in formulas:
+        default = run(name, formula)
+        fixed = run(name, formula, restarts='fixed')
+        assert (fixed.nb_tries, fixed.nb_flips, fixed.best_found_cost) == \
+               (default.nb_tries, default.nb_flips, default.best_found_cost)
+        assert [h[:3] for h in fixed.history] == [h[:3] for h in default.history]
+
+
+@pytest.mark.parametrize('name', ['amls', 'walksat', 'irots'])
+def test_luby_cutoffs_and_budget(name, formulas, capsys):
+    formula = formulas[1] # MaxSAT: never solved => the whole budget is used
+    cutoffs = []
+    class Recorded(Luby):
+        def next_cutoff(self):
+            cutoffs.append(super(Recorded, self).next_cutoff())
+            return cutoffs[-1]
+    budget = Budget(max_flips=1000)
+    solver = run(name, formula, restarts=Recorded(unit=10), budget=budget)
+    assert cutoffs[:7] == [10, 10, 20, 10, 10, 20, 40]
+    assert budget.nb_tries == solver.nb_tries == len(cutoffs)
+    assert budget.nb_flips <= 1000
+
+
+def test_fit_cutoff():
+    assert fit_cutoff([10, 20, 30, 1000], [True, True, True, False]) == (30, 30.0)
+    assert fit_cutoff([5, 5, 100], [False, False, False]) == (None, None)
+    # heavy tail: restarting early beats waiting for the long runs
+    cutoff, expected = fit_cutoff([10]*5 + [10**5]*5, [True]*10)
+    assert cutoff == 10 and expected == pytest.approx(20.0)
+
+
+
+@pytest.mark.parametrize('name', ['walksat', 'amls'])
+def test_stop_is_sticky(name, formulas, capsys):
+    # stop() landing just before a new try (e.g. from a watcher thread): the schedule grants the try a new
+    # cutoff, which must not restart the search
+    from base_solver import Driver
+    class Stop(Driver):
+        def begin_try(self, solver):
+            if solver.nb_tries == 1:
+                solver.stop()
+    solver = build_solver(name, formulas[1], 0, restarts='luby')
+    solver.drivers.insert(0, Stop())
+    solver.solve()
+    assert solver.nb_tries == 2 and solver.nb_flips <= (solver.MAX_PERT if name == 'amls' else 0)
+    solver.drivers.pop(0)
+    solver.changed() # new solve: the stop is cleared
+    solver.MAX_TRIES = 3
+    solver.solve()
+    assert solver.nb_tries > 2
@@ -0,0 +1,55 @@
+import pytest
+
+from conftest import make_random_formula
+from features import extract_features
+from selector import Selector
+
+
+def record(instance, features, solver, cost, solved, time, total_weight=1000, time_limit=10.0):
+    return {'instance': instance, 'features': features, 'solver': solver, 'options': {}, 'time_limit': time_limit,
+            'total_weight': total_weight, 'cost': cost, 'solved': solved, 'time': time, 'flips': 0}
+
+
+@pytest.fixture(scope='module')
+def features():
+    import random
+    rng = random.Random(5)
+    return (extract_features(make_random_formula(rng, 20, 80), probe_flips=0),
+            extract_features(make_random_formula(rng, 60, 150, weighted=True, max_weight=50), probe_flips=0))
+
+
+def test_maxsat_instances_are_ranked_by_cost(features):
+    # Never solved: same PAR time for every run, the relative cost alone separates the configurations
+    records = [record('maxsat', features[1], 'walksat', 10, False, 10.0),
+               record('maxsat', features[1], 'probsat', 20, False, 3.0),
+               record('maxsat', features[1], 'saps', 40, False, 10.0)]
+    selector = Selector(records=records)
+    relative = dict(zip((c[0] for c in selector.configurations), selector.relative[0]))
+    assert relative['walksat'] == pytest.approx(1.0)
+    assert relative['probsat'] == pytest.approx(21 / 11)
+    assert relative['saps'] == pytest.approx(41 / 11)
+    assert selector.select(features[1])[0] == 'walksat'
+
+
+def test_solved_instances_are_ranked_by_time(features):
+    records = [record('sat', features[0], 'walksat', 0, True, 2.0),
+               record('sat', features[0], 'probsat', 0, True, 1.0),
+               record('sat', features[0], 'saps', 1, False, 10.0)]
+    selector = Selector(records=records)
+    relative = dict(zip((c[0] for c in selector.configurations), selector.relative[0]))
+    assert relative['probsat'] == pytest.approx(1.0)
+    assert relative['walksat'] == pytest.approx(2.001 / 1.001)
+    assert relative['saps'] > 100 # PAR time and cost of an unsolved run
+    assert selector.select(features[0])[0] == 'probsat'
+
+
+def test_selection_by_nearest_instance(features):
+    records = [record('sat', features[0], 'walksat', 0, True, 1.0),
+               record('sat', features[0], 'saps', 0, True, 5.0),
+               record('maxsat', features[1], 'walksat', 30, False, 10.0),
+               record('maxsat', features[1], 'saps', 10, False, 10.0)]
+    selector = Selector(k=1, records=records)
+    assert selector.select(features[0])[0] == 'walksat'
+    assert selector.select(features[1])[0] == 'saps'
+    selected, single = selector.evaluate()
+    assert len(selected) == 2 and len(single) == 2
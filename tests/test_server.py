@@ -0,0 +1,122 @@
+'''
+Solve server in process: results, cancellation, time limits, restart budgets and the formula cache
+'''
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from cdcl import CDCL
+from conftest import make_random_formula
+from formula import Formula
+from server import Solve_Server, request
+
+
+def dimacs(formula):
+    return 'p cnf {0} {1}\n'.format(formula.nvars, formula.nclauses) + \
+           ''.join(' '.join(map(str, clause)) + ' 0\n' for clause in formula.clauses)
+
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    address = str(tmp_path_factory.mktemp('server') / 'sat.sock')
+    server = Solve_Server(address, nb_workers=2, cache_size=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    while server.server is None:
+        time.sleep(0.01)
+    yield server
+    server.server.shutdown()
+    thread.join()
+
+
+@pytest.fixture(scope='module')
+def formulas():
+    import random
+    rng = random.Random(44)
+    sat = make_random_formula(rng, 20, 60)
+    unsat = Formula([[1], [-1, 2], [-2]] + make_random_formula(rng, 60, 240).clauses, 60) # never SAT
+    return sat, unsat
+
+
+def stats(server):
+    return list(request(server.address, {'op': 'stats'}))[-1]['cache']
+
+
+def test_solve(server, formulas):
+    sat, _ = formulas
+    events = list(request(server.address, {'op': 'solve', 'id': 'a', 'cnf': dimacs(sat), 'solver': 'walksat',
+                                           'options': {'random_walk': True}, 'progress': True}))
+    assert events[0]['event'] == 'queued' and all(event['id'] == 'a' for event in events)
+    assert all(event['event'] == 'progress' for event in events[1:-1])
+    result = events[-1]
+    assert result['event'] == 'result' and result['status'] == 'SAT' and result['cost'] == 0
+    assert sat.cost(result['model']) == 0
+
+
+def test_errors(server, formulas):
+    assert list(request(server.address, {'op': 'solve', 'cnf': dimacs(formulas[0]), 'solver': 'bogus'}))[-1]['event'] \
+           == 'error'
+    result = list(request(server.address, {'op': 'solve', 'cnf': dimacs(formulas[0]), 'options': {'bogus': 1}}))[-1]
+    assert result['event'] == 'error' and 'bogus' in result['message']
+
+
+def test_cancel(server, formulas):
+    _, unsat = formulas
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(server.address)
+        responses = sock.makefile('rb')
+        sock.sendall((json.dumps({'op': 'solve', 'cnf': dimacs(unsat), 'max_flips': 10**9, 'progress': True,
+                                  'options': {'restarts': 'luby'}}) + '\n').encode())
+        job = json.loads(responses.readline())['job']
+        assert json.loads(responses.readline())['event'] == 'progress' # running
+        initial = time.time()
+        sock.sendall((json.dumps({'op': 'cancel', 'job': job}) + '\n').encode())
+        event = json.loads(responses.readline())
+        while event['event'] == 'progress':
+            event = json.loads(responses.readline())
+        assert event['event'] == 'cancelled' and event['job'] == job
+        assert time.time() - initial < 2
+
+
+@pytest.mark.parametrize('restarts', [None, 'luby'])
+def test_time_limit(server, formulas, restarts):
+    _, unsat = formulas
+    initial = time.time()
+    result = list(request(server.address, {'op': 'solve', 'cnf': dimacs(unsat), 'max_tries': 10**6,
+                                           'max_flips': 10**9, 'time_limit': 0.3,
+                                           'options': {'restarts': restarts}}))[-1]
+    assert result['event'] == 'result' and result['status'] == 'UNKNOWN'
+    assert unsat.cost(result['model']) == result['cost'] > 0
+    assert time.time() - initial < 2
+
+
+def test_max_flips_bound_a_restart_schedule(server, formulas):
+    # Luby tries of nvars * 1 1 2 1 1 2 4 ... flips, until max_flips flips have been run in total
+    _, unsat = formulas
+    result = list(request(server.address, {'op': 'solve', 'cnf': dimacs(unsat), 'max_flips': 5000,
+                                           'options': {'restarts': 'luby'}}))[-1]
+    total, tries = 0, 0
+    while total < 5000:
+        tries += 1
+        total += unsat.nvars * CDCL.luby(tries)
+    assert result['tries'] == tries
+    assert result['flips'] == 5000 - (total - unsat.nvars * CDCL.luby(tries))
+
+
+def test_formula_cache(server, formulas):
+    sat, unsat = formulas
+    before = stats(server)
+    for cnf in (sat, sat):
+        assert list(request(server.address, {'op': 'solve', 'cnf': dimacs(cnf), 'max_tries': 1}))[-1]['event'] \
+               == 'result'
+    after = stats(server)
+    assert after['hits'] - before['hits'] >= 1 and after['size'] == 1
+    # Capacity 1: another formula evicts it
+    list(request(server.address, {'op': 'solve', 'cnf': dimacs(unsat), 'max_tries': 1}))
+    list(request(server.address, {'op': 'solve', 'cnf': dimacs(sat), 'max_tries': 1}))
+    evicted = stats(server)
+    assert evicted['misses'] - after['misses'] == 2 and evicted['size'] == 1
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from brute_force import satisfies
+from conftest import make_random_formula
+from formula import Formula
+from solution_cache import Solution_Cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = Solution_Cache(str(tmp_path / 'solutions.db'))
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_satisfied_matches_clause_by_clause_check(rng, weighted):
+    for _ in range(20):
+        formula = make_random_formula(rng, 12, 50, k=5, weighted=weighted)
+        assignment = [x * rng.choice([-1, 1]) for x in range(1, formula.nvars+1)]
+        satisfied = formula.satisfied(assignment)
+        assert satisfied.dtype == bool and len(satisfied) == formula.nclauses
+        assert satisfied.tolist() == [satisfies([clause], assignment) for clause in formula.clauses]
+        assert int(np.asarray(formula.weights)[~satisfied].sum()) == formula.cost(assignment)
+
+
+def test_satisfied_edge_cases():
+    formula = Formula([[1, -2], [3], [-1, 2, 3]], 3)
+    assert formula.satisfied([1, 2]).tolist() == [True, False, True] # missing variable: unassigned
+    assert Formula([], 2).satisfied([1, 2]).tolist() == []
+
+
+def test_costs_are_ints_on_miss_and_hit(cache, rng):
+    solvable = make_random_formula(rng, 20, 60)
+    clauses = [[1], [-1, 2], [-2]] + make_random_formula(rng, 8, 20).clauses # never SAT => cost of the solver
+    unsolvable = Formula(clauses, 8, [rng.randint(1, 5) for _ in clauses], 1000)
+    for formula, expected in ((solvable, 'SAT'), (unsolvable, 'UNKNOWN')):
+        results = [cache.solve('walksat', formula) for _ in range(2)] # miss, then hit / warm start
+        for status, cost, model in results:
+            assert status == expected
+            assert type(cost) is int
+            assert cost == cache.verify(formula, model)
+        assert results[1][1] <= results[0][1]
+
+
+def changed(formula, rng, nb_changes):
+    clauses = [list(clause) for clause in formula.clauses]
+    for i in rng.sample(range(len(clauses)), nb_changes):
+        clauses[i] = [x * rng.choice([-1, 1]) for x in rng.sample(range(1, formula.nvars+1), 3)]
+    return Formula(clauses, formula.nvars)
+
+
+def test_near_hits_are_found_through_sketches(cache, rng):
+    from solution_cache import SKETCH
+    formulas = [make_random_formula(rng, 100, 400) for _ in range(20)] # same size: all candidates by size
+    for formula in formulas:
+        cache.store(formula, 'UNKNOWN', 1, [x * rng.choice([-1, 1]) for x in range(1, 101)])
+    assert cache.db.execute('SELECT COUNT(*) FROM sketches').fetchone()[0] == SKETCH * len(formulas)
+    compared = []
+    intersect1d = np.intersect1d
+    np.intersect1d = lambda a, b, **kwargs: compared.append(len(b)) or intersect1d(a, b, **kwargs)
+    try:
+        for formula in formulas:
+            near = changed(formula, rng, 3)
+            kind, status, cost, assignment = cache.lookup(near)
+            assert kind == 'near' and cost == near.cost(assignment)
+        # Only entries sharing a sketch hash are compared (a clause may be shared), not every entry of the same size
+        assert len(formulas) <= len(compared) < 2 * len(formulas)
+        assert cache.lookup(changed(formulas[0], rng, 30))[0] is None # too many changes
+        assert cache.lookup(make_random_formula(rng, 101, 400))[0] is None
+    finally:
+        np.intersect1d = intersect1d
+
+
+def test_sketches_of_an_older_cache_are_indexed(tmp_path, rng):
+    path = str(tmp_path / 'old.db')
+    formula = make_random_formula(rng, 30, 120)
+    cache = Solution_Cache(path)
+    cache.store(formula, 'UNKNOWN', 1, [x for x in range(1, 31)])
+    cache.db.execute('DROP TABLE sketches')
+    cache.db.commit()
+    cache.close()
+    cache = Solution_Cache(path)
+    try:
+        assert cache.lookup(changed(formula, rng, 2))[0] == 'near'
+    finally:
+        cache.close()
+
+
+@pytest.mark.parametrize('name', ['walksat', 'amls', 'ccanr'])
+def test_warm_start_installs_the_cached_assignment(cache, rng, name, monkeypatch):
+    # init_assignment: the first try of the solver starts from the cached assignment
+    import base_solver
+    formula = make_random_formula(rng, 30, 150)
+    cached = [x * rng.choice([-1, 1]) for x in range(1, 31)]
+    cache.store(formula, 'UNKNOWN', formula.cost(cached), cached)
+    starts = []
+    initialize_cost = base_solver.Base_Solver.initialize_cost
+    def recorded(solver):
+        starts.append(list(solver.assignment))
+        initialize_cost(solver)
+    monkeypatch.setattr(base_solver.Base_Solver, 'initialize_cost', recorded)
+    status, cost, model = cache.solve(name, formula)
+    assert starts[0] == cached
+    assert cost == formula.cost(model) <= formula.cost(cached)
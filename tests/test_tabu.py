@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from tabu import Tabu_List
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_tabu_list_matches_last_move_lists(seed):
+    # Reference: last_move lists of the original solvers, the current tenure applies to every past move
+    rng = random.Random(seed)
+    nvars = 15
+    tabu = Tabu_List(nvars, 3)
+    last_move = [None] * nvars
+    for step in range(500):
+        if rng.random() < 0.2:
+            tabu.set_tenure(rng.randint(0, 12))
+        literal = rng.randint(1, nvars) * rng.choice([-1, 1])
+        tabu.add(literal, step)
+        last_move[abs(literal)-1] = step
+        expected = [last_move[x-1] is not None and step - last_move[x-1] < tabu.tabu_tenure
+                    for x in range(1, nvars+1)]
+        assert [tabu.is_tabu(-x if x % 2 else x, step) for x in range(1, nvars+1)] == expected
+        candidates = [x * rng.choice([-1, 1]) for x in rng.sample(range(1, nvars+1), 8)]
+        allowed, tabu_moves = tabu.partition(candidates, step)
+        assert allowed == [l for l in candidates if not expected[abs(l)-1]]
+        assert tabu_moves == [l for l in candidates if expected[abs(l)-1]]
+
+
+def test_tenure_change_is_retroactive():
+    tabu = Tabu_List(3, 5)
+    tabu.add(1, 10)
+    assert tabu.is_tabu(1, 12) and tabu.until(1) == 15
+    tabu.set_tenure(2)
+    assert not tabu.is_tabu(1, 12) and tabu.until(1) == 12
+    tabu.set_tenure(8)
+    assert tabu.is_tabu(-1, 17)
+
+
+def test_reset_and_resize():
+    tabu = Tabu_List(2, 4)
+    assert tabu.partition([1, -2], 0) == ([1, -2], [])
+    tabu.add(2, 0)
+    tabu.resize(4)
+    assert tabu.partition([1, -2, 3, 4], 1) == ([1, 3, 4], [-2])
+    tabu.reset(0)
+    tabu.add(3, 1)
+    assert not tabu.is_tabu(3, 1)
+
+
+@pytest.mark.parametrize('tabu_length', [0, 1, 4, 12, 40])
+def test_walksat_tabu_eligible_clauses(rng, tabu_length, capsys):
+    # After the expiry of each step: in_tabu, nb_non_tabu and the eligible clauses agree with Tabu_List.is_tabu
+    from conftest import make_random_formula
+    from walksat_tabu import WalkSAT_Tabu
+    solver = WalkSAT_Tabu(make_random_formula(rng, 30, 135), 0, tabu_length=tabu_length, random_walk=True)
+    expire_tabu = solver.expire_tabu
+    nb_checks = [0]
+    def checked():
+        expire_tabu()
+        tabu = [False] + [bool(solver.tabu.is_tabu(x, solver.nb_flips)) for x in range(1, solver.nvars+1)]
+        assert solver.in_tabu == tabu
+        non_tabu = [sum(not tabu[abs(literal)] for literal in clause) for clause in solver.list_clauses]
+        assert list(solver.nb_non_tabu) == non_tabu
+        assert sorted(solver.eligible) == sorted(i for i in solver.id_unsat_clauses if non_tabu[i] > 0)
+        assert all(until > solver.nb_flips for until, _ in solver.expiry)
+        nb_checks[0] += 1
+    solver.expire_tabu = checked
+    random.seed(34)
+    solver.MAX_TRIES = 3
+    solver.MAX_FLIPS = 400
+    solver.solve()
+    assert nb_checks[0] > 50
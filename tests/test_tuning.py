@@ -0,0 +1,140 @@
+'''
+Racing (ranks, Friedman test and its quantiles, Tuner.race), runs of the workers and sampled configurations
+'''
+
+import random
+
+import numpy as np
+import pytest
+
+from conftest import make_random_formula
+from parameters import Parameter, clip, defaults, neighbor, sample
+from restarts import Restart_Schedule
+from shared_formula import Shared_Formula
+from tuning import PAR, Tuner, chi2_quantile, friedman_survivors, ranks, run_task, t_quantile
+from utils import SOLVERS, solver_parameters
+
+
+def test_ranks_with_ties():
+    scores = np.array([[3., 1., 1., 2.], [5., 5., 5., 5.], [0.5, 2., 0.5, 0.5], [4., 3., 2., 1.]])
+    assert ranks(scores).tolist() == [[4, 1.5, 1.5, 3], [2.5, 2.5, 2.5, 2.5], [2, 4, 2, 2], [4, 3, 2, 1]]
+    assert (ranks(scores).sum(axis=1) == 10).all() # k(k+1)/2 whatever the ties
+
+
+@pytest.mark.parametrize('df, expected', [(1, 3.841), (2, 5.991), (3, 7.815), (5, 11.070), (10, 18.307),
+                                          (30, 43.773), (100, 124.342)])
+def test_chi2_quantile(df, expected):
+    # Table of the 0.95 quantiles, Wilson-Hilferty is rough for a single degree of freedom only
+    assert chi2_quantile(0.95, df) == pytest.approx(expected, rel=0.03 if df == 1 else 0.01)
+
+
+@pytest.mark.parametrize('df, expected', [(3, 3.182), (4, 2.776), (5, 2.571), (10, 2.228), (30, 2.042),
+                                          (120, 1.980)])
+def test_t_quantile(df, expected):
+    # Table of the 0.975 quantiles (post-hoc test: df = (n-1)(k-1) >= first_test - 1)
+    assert t_quantile(0.975, df) == pytest.approx(expected, rel=0.01)
+
+
+def test_friedman_eliminates_a_dominated_candidate():
+    rng = np.random.default_rng(49)
+    scores = rng.random((10, 5))
+    scores[:, 3] += 1 # always the worst
+    assert friedman_survivors(scores).tolist() == [True, True, True, False, True]
+
+
+def test_friedman_keeps_indistinguishable_candidates():
+    rng = np.random.default_rng(49)
+    assert friedman_survivors(rng.random((6, 4))).all()
+    assert friedman_survivors(np.ones((8, 3))).all() # every step is a tie
+    assert friedman_survivors(np.array([[1., 2., 3.]])).all() # a single step
+    assert friedman_survivors(np.array([[1.], [2.]])).all()
+
+
+class Pool:
+    '''
+    In-process pool: score of a run = level of the configuration + noise of its seed
+    '''
+
+    def __init__(self):
+        self.tasks = []
+
+    def map(self, function, tasks, chunksize=1):
+        self.tasks += tasks
+        return [configuration['level'] + random.Random(seed).random() for _, configuration, _, _, seed, _, _ in tasks]
+
+
+def test_race_eliminates_a_dominated_candidate(tmp_path, rng, capsys):
+    formula = make_random_formula(rng, 10, 40)
+    path = tmp_path / 'instance.cnf'
+    path.write_text('p cnf {0} {1}\n'.format(formula.nvars, formula.nclauses) +
+                    ''.join(' '.join(map(str, clause)) + ' 0\n' for clause in formula.clauses))
+    tuner = Tuner('walksat', [str(path)], workers=1, verbose=0)
+    candidates = [{'level': 0.1 * i} for i in range(4)] + [{'level': 5}]
+    pool = Pool()
+    survivors = tuner.race(pool, [None], candidates, 60)
+    assert {'level': 5} not in survivors and len(survivors) >= 1
+    assert survivors[0] == {'level': 0.0}
+    assert tuner.nb_runs == len(pool.tasks) <= 60
+    assert len(set((tuner.key(task[1]), task[4]) for task in pool.tasks)) == len(pool.tasks) # never run twice
+    nb_runs = tuner.nb_runs
+    tuner.race(pool, [None], survivors, nb_runs) # elites: memoized runs of the first steps
+    assert tuner.nb_runs - nb_runs < nb_runs
+
+
+def tries(monkeypatch):
+    # Flips of each try of the runs under a restart schedule
+    flips = []
+    end_try = Restart_Schedule.end_try
+    def recorded(self, solver, solved):
+        if self.granted is not None:
+            flips.append(solver.nb_flips)
+        end_try(self, solver, solved)
+    monkeypatch.setattr(Restart_Schedule, 'end_try', recorded)
+    return flips
+
+
+def test_run_under_restarts_is_bounded_by_max_flips(rng, monkeypatch):
+    formula = make_random_formula(rng, 30, 300) # far beyond the threshold => UNSAT
+    flips = tries(monkeypatch)
+    with Shared_Formula(formula) as shared:
+        task = ('walksat', {'restarts': 'luby'}, shared.handle, formula.nclauses, 49, 5000, None)
+        score = run_task(task)
+    assert len(flips) > 1 and sum(flips) <= 5000
+    assert score >= PAR * 5000
+
+
+def test_solved_run_under_restarts_is_scored_by_the_flips_of_every_try(rng, monkeypatch):
+    formula = make_random_formula(rng, 60, 200)
+    flips = tries(monkeypatch)
+    with Shared_Formula(formula) as shared:
+        for seed in range(5):
+            flips.clear()
+            score = run_task(('walksat', {'restarts': 'luby'}, shared.handle, formula.nclauses, seed, 100000, None))
+            assert score == sum(flips)
+            if len(flips) > 1:
+                break
+    assert len(flips) > 1 # solved after a restart
+
+
+@pytest.mark.parametrize('name', list(SOLVERS))
+def test_sampled_configurations_stay_in_their_domains(name):
+    rng = random.Random(49)
+    space = solver_parameters(name)
+    configuration = defaults(space)
+    for step in range(200):
+        configuration = sample(space, rng) if step % 2 == 0 else neighbor(space, configuration, 0.5, rng)
+        assert set(configuration) == set(space)
+        for option, value in configuration.items():
+            parameter = space[option]
+            if parameter.kind == 'cat':
+                assert value in parameter.domain
+            else:
+                assert type(value) is (int if parameter.kind == 'int' else float)
+                assert parameter.domain[0] <= value <= parameter.domain[1]
+
+
+def test_clip():
+    assert clip(Parameter('int', (1, 10), 5), 3.6) == 4
+    assert clip(Parameter('int', (1, 10), 5), -2) == 1
+    assert clip(Parameter('real', (0.0, 1.0), 0.5), 1.5) == 1.0
+    assert clip(Parameter('real', (1e-3, 1.0), 0.1, True), 0.25) == 0.25
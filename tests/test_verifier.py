@@ -0,0 +1,171 @@
+import io
+
+import numpy as np
+import pytest
+
+from brute_force import models
+from compact import remove_duplicates
+from conftest import make_random_formula
+from dimacs_parser import parse_formula
+from formula import Formula
+from verifier import verify, verify_file, stream_clauses, read_model, print_solution
+
+
+CNF = '''c comment
+p cnf 5 4
+1 -2 1 0
+2 3
+-4 0
+-1 -3 0 5
+0
+%
+1 2 3 0
+'''
+
+WCNF_OLD = '''c top given in the p line
+p wcnf 4 4 20
+3 1 -2 0
+20 -1 3 0
+5 2 2 4
+ 0
+1 -4 0
+'''
+
+WCNF_NEW = '''c no p line: h = hard, top = sum of the soft weights + 1
+h 1 2 0
+2 -1 0
+h -2 3 3 0
+7 -3 0
+'''
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def dimacs(formula):
+    lines = ['p {0} {1} {2}{3}'.format('wcnf' if formula.is_weighted else 'cnf', formula.nvars, formula.nclauses,
+                                       ' {0}'.format(formula.top) if formula.is_weighted else '')]
+    for i, clause in enumerate(formula.clauses):
+        weight = '{0} '.format(formula.weights[i]) if formula.is_weighted else ''
+        lines.append(weight + ' '.join(map(str, clause)) + ' 0')
+    return '\n'.join(lines) + '\n'
+
+
+def streamed(filename, chunk_size):
+    # Formula read by stream_clauses (clauses marked h get top, as in compact.load_compact)
+    clauses, weights = [], []
+    for clause_start, clause_lits, chunk_weights, hard in stream_clauses(filename, chunk_size):
+        if clause_start is None:
+            nvars, top, weighted = clause_lits, chunk_weights, hard
+            break
+        clause_start, clause_lits = remove_duplicates(clause_start, clause_lits)
+        clauses += [clause_lits[clause_start[i]:clause_start[i+1]].tolist() for i in range(len(clause_start)-1)]
+        weights += chunk_weights.tolist()
+    nvars = max([nvars] + [abs(literal) for clause in clauses for literal in clause])
+    if weighted and top is None:
+        top = sum(w for w in weights if w > 0) + 1
+    return clauses, [top if w < 0 else w for w in weights], nvars, top, weighted
+
+
+@pytest.mark.parametrize('text', [CNF, WCNF_OLD, WCNF_NEW], ids=['cnf', 'wcnf', 'wcnf-new'])
+@pytest.mark.parametrize('chunk_size', [1, 2, 100])
+def test_stream_clauses_agrees_with_parse_formula(tmp_path, text, chunk_size):
+    filename = write(tmp_path, 'instance.txt', text)
+    formula = parse_formula(filename, 0)
+    clauses, weights, nvars, top, weighted = streamed(filename, chunk_size)
+    assert clauses == formula.clauses
+    assert nvars == formula.nvars
+    assert weighted == formula.is_weighted
+    if weighted:
+        assert weights == formula.weights
+        assert top == formula.top
+
+
+def test_parse_formula_formats():
+    formula = parse_formula(io.StringIO(CNF), 0)
+    assert formula.clauses == [[1, -2], [2, 3, -4], [-1, -3], [5]]
+    assert not formula.is_weighted
+    formula = parse_formula(io.StringIO(WCNF_NEW), 0)
+    assert formula.clauses == [[1, 2], [-1], [-2, 3], [-3]]
+    assert formula.top == 10
+    assert formula.weights == [10, 2, 10, 7]
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+def test_verify_matches_cost(tmp_path, rng, weighted):
+    for _ in range(20):
+        formula = make_random_formula(rng, 10, 40, weighted=weighted)
+        filename = write(tmp_path, 'instance.txt', dimacs(formula))
+        for _ in range(5):
+            model = [x * rng.choice([-1, 1]) for x in range(1, formula.nvars+1)]
+            unsat = np.flatnonzero(~formula.satisfied(model))
+            hard = [i for i in unsat if formula.is_hard(i)] if weighted else list(unsat)
+            for result in (verify(formula, model), verify_file(filename, model, chunk_size=7)):
+                assert result.cost == formula.cost(model)
+                assert result.nb_unsat == len(unsat)
+                assert result.nb_hard_unsat == len(hard)
+                assert result.ok == (len(hard) == 0)
+                assert result.unsat_clauses == unsat[:10].tolist()
+
+
+def test_verify_accepts_models_and_rejects_the_others(tmp_path, rng):
+    checked = 0
+    while checked < 10:
+        formula = make_random_formula(rng, 8, 30)
+        sat = models(formula.clauses, formula.nvars)
+        if len(sat) == 0:
+            continue
+        checked += 1
+        filename = write(tmp_path, 'instance.txt', dimacs(formula))
+        for model in sat[:5]:
+            assert verify(formula, model) == (True, 0, 0, 0, [])
+            assert verify_file(filename, model, chunk_size=4) == (True, 0, 0, 0, [])
+        model = [x * rng.choice([-1, 1]) for x in range(1, formula.nvars+1)]
+        if model not in sat:
+            assert not verify(formula, model).ok
+            assert not verify_file(filename, model).ok
+
+
+def test_verify_weighted_files():
+    formula = Formula([[1, 2], [-1], [-2, 3], [-3]], 3, [10, 2, 10, 7], 10)
+    for model, expected in [([1, -2, -3], (True, 2, 1, 0)), ([-1, 2, 3], (True, 7, 1, 0)),
+                            ([-1, -2, -3], (False, 10, 1, 1)), ([1, 2, -3], (False, 12, 2, 1))]:
+        assert verify(formula, model)[:4] == expected
+
+
+@pytest.mark.parametrize('text', [WCNF_OLD, WCNF_NEW], ids=['wcnf', 'wcnf-new'])
+def test_verify_file_weighted(tmp_path, text):
+    filename = write(tmp_path, 'instance.wcnf', text)
+    formula = parse_formula(filename, 0)
+    for values in range(2**formula.nvars):
+        model = [x if values >> (x-1) & 1 else -x for x in range(1, formula.nvars+1)]
+        assert verify_file(filename, model, chunk_size=1) == verify(formula, model)
+
+
+def test_inconsistent_model(tmp_path):
+    formula = parse_formula(io.StringIO(CNF), 0)
+    filename = write(tmp_path, 'instance.cnf', CNF)
+    with pytest.raises(ValueError):
+        verify(formula, [1, -2, 3, -1, 4, 5])
+    with pytest.raises(ValueError):
+        verify_file(filename, [1, -2, 3, -1, 4, 5])
+
+
+def test_unassigned_variables(tmp_path):
+    formula = parse_formula(io.StringIO(CNF), 0)
+    result = verify(formula, [1, 2])
+    assert result.nb_unsat == 2 and result.unsat_clauses == [2, 3]
+    assert verify_file(write(tmp_path, 'instance.cnf', CNF), [1, 2]) == result
+
+
+def test_solution_output_round_trip():
+    model = list(range(1, 40)) + [-x for x in range(40, 80)]
+    out = io.StringIO()
+    print_solution('OPTIMUM', model, cost=3, out=out, width=30)
+    lines = out.getvalue().splitlines()
+    assert lines[:2] == ['o 3', 's OPTIMUM FOUND']
+    assert all(len(line) <= 30 for line in lines[2:-1])
+    assert read_model(lines) == model
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+'''
+Automatic parameter tuning by iterated racing over a set of training instances
+
+    python tuning.py walksat cnf_instances/uf50-*.cnf --budget 2000 --workers 4     # => tuned.json
+    python main.py -i instance.cnf -s walksat -c tuned.json
+
+- Search space: PARAMETERS of the solver class and of the restart schedule (see parameters.py, utils.solver_parameters)
+- A run = max_flips flips (or time_limit seconds) of a configuration on an (instance, seed) pair, one try or
+  the tries of its restart schedule,
+  its score (lower is better): nb of flips to a model, otherwise PAR * max_flips * (1 + relative cost)
+  => unsolved runs are still ranked by cost (MaxSAT)
+- Race [1]: the candidates are run on the same stream of (instance, seed) pairs, step by step; from step
+  first_test on, the Friedman test over the ranks of the alive candidates, if significant, eliminates the
+  candidates whose rank sum is significantly worse than the best one (post-hoc test of [1])
+- Iterated racing [2]: each iteration races the elites of the previous race plus new candidates sampled around
+  them (uniformly at the first iteration) with a spread shrinking over the iterations, until the budget
+  (nb of runs) is exhausted
+- Runs of a step are executed in parallel by a pool of worker processes: the training formulas are published
+  once in shared memory (see shared_formula.py) and each worker attaches them once.
+  Results are memoized by (configuration, instance, seed) => elites are never run twice on the same pair
+
+References
+[1] M. Birattari, T. Stützle, L. Paquete, and K. Varrentrapp, “A racing algorithm for configuring metaheuristics,” in Proceedings of the Genetic and Evolutionary Computation Conference, 2002, pp. 11–18.
+[2] M. López-Ibáñez, J. Dubois-Lacoste, L. Pérez Cáceres, M. Birattari, and T. Stützle, “The irace package: Iterated racing for automatic algorithm configuration,” Oper. Res. Perspect., vol. 3, pp. 43–58, 2016, doi: 10.1016/j.orp.2016.09.002.
+'''
+
+from dimacs_parser import parse_formula
+from parameters import DEFAULT_PATH, defaults, sample, neighbor, save_configuration
+from restarts import Budget
+from shared_formula import Shared_Formula, attach
+from statistics import NormalDist
+from multiprocessing import resource_tracker
+from utils import SOLVERS, build_solver, solver_parameters
+import multiprocessing as mp
+import numpy as np
+import contextlib
+import threading
+import argparse
+import random
+import math
+import json
+import io
+import os
+
+PAR = 10
+
+_formulas = dict() # worker side: handle -> attached formula
+
+def run_task(task):
+    '''
+    One run of a configuration (worker side), return its score
+    Under a restart schedule the run is several tries drawing max_flips flips from a Budget
+    => scored by the flips of all its tries
+    '''
+    solver, configuration, handle, total_weight, seed, max_flips, time_limit = task
+    formula = _formulas.get(handle)
+    if formula is None:
+        formula = _formulas[handle] = attach(handle)
+    random.seed(seed)
+    np.random.seed(seed)
+    budget = Budget(max_flips=max_flips) if configuration.get('restarts') is not None else None
+    instance = build_solver(solver, formula, 0, budget=budget, **configuration)
+    instance.MAX_TRIES = 1
+    instance.MAX_FLIPS = max_flips
+    timer = threading.Timer(time_limit, instance.stop) if time_limit else None
+    if timer is not None:
+        timer.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cost, _, _ = instance.solve_anytime()
+    finally:
+        if timer is not None:
+            timer.cancel()
+    if instance.is_sat:
+        return float(budget.nb_flips if budget is not None else instance.nb_flips)
+    return PAR * max_flips * (1.0 + float(cost) / max(total_weight, 1))
+
+def chi2_quantile(p, df):
+    # Wilson-Hilferty approximation
+    z = NormalDist().inv_cdf(p)
+    return df * (1 - 2/(9*df) + z * math.sqrt(2/(9*df)))**3
+
+def t_quantile(p, df):
+    # Cornish-Fisher expansion around the normal quantile
+    z = NormalDist().inv_cdf(p)
+    return (z + (z**3 + z)/(4*df) + (5*z**5 + 16*z**3 + 3*z)/(96*df**2)
+            + (3*z**7 + 19*z**5 + 17*z**3 - 15*z)/(384*df**3))
+
+def ranks(scores):
+    # Ranks of each row (1 = best), ties get their mean rank
+    result = np.empty(scores.shape)
+    for i, row in enumerate(scores):
+        order = np.argsort(row, kind='stable')
+        sorted_row = row[order]
+        r = np.empty(len(row))
+        j = 0
+        while j < len(row):
+            k = j
+            while k+1 < len(row) and sorted_row[k+1] == sorted_row[j]:
+                k += 1
+            r[order[j:k+1]] = (j + k) / 2 + 1
+            j = k + 1
+        result[i] = r
+    return result
+
+def friedman_survivors(scores, alpha=0.05):
+    '''
+    scores: nb of steps x nb of candidates, return the boolean mask of the candidates kept
+    Friedman test, then candidates whose rank sum differs from the best one by more than the critical
+    difference of the post-hoc test are eliminated
+    '''
+    n, k = scores.shape
+    keep = np.ones(k, dtype=bool)
+    if k < 2 or n < 2:
+        return keep
+    r = ranks(scores)
+    R = r.sum(axis=0)
+    A = (r**2).sum()
+    C = n * k * (k+1)**2 / 4
+    if A - C <= 0: # every step is a tie
+        return keep
+    T = (k-1) * ((R - n*(k+1)/2)**2).sum() / (A - C)
+    if T <= chi2_quantile(1 - alpha, k-1):
+        return keep
+    df = (n-1) * (k-1)
+    difference = t_quantile(1 - alpha/2, df) * math.sqrt(max(2*n*(1 - T/(n*(k-1))) * (A - C) / df, 0))
+    return R - R.min() <= difference
+
+
+class Tuner:
+    '''
+    Iterated racing of the configurations of one solver
+        - stream[t]: (instance index, seed) of step t, the same for every race
+        - results: key (configuration, step) -> score
+    '''
+
+    def __init__(self, solver, instances, budget=1000, workers=None, max_flips=None, time_limit=None,
+                 first_test=5, alpha=0.05, nb_elites=None, seed=0, verbose=1):
+        self.solver = solver
+        self.space = solver_parameters(solver)
+        self.formulas = [parse_formula(instance, 0) for instance in instances]
+        self.names = [os.path.basename(instance) for instance in instances]
+        self.total_weights = [int(np.asarray(f.weights, dtype=np.int64).sum()) for f in self.formulas]
+        self.budget = budget
+        self.workers = workers or os.cpu_count()
+        self.max_flips = max_flips
+        self.time_limit = time_limit
+        self.first_test = first_test
+        self.alpha = alpha
+        self.nb_iterations = 2 + int(math.log2(max(len(self.space), 1)))
+        self.nb_elites = nb_elites or max(2, self.nb_iterations)
+        self.rng = random.Random(seed)
+        self.stream = []
+        self.stream_rng = random.Random(seed + 1)
+        self.results = dict()
+        self.nb_runs = 0
+        self.verbose = verbose
+
+    def step(self, t):
+        # (instance index, seed) of step t: the instances are cycled through in a new random order every round
+        while len(self.stream) <= t:
+            order = list(range(len(self.formulas)))
+            self.stream_rng.shuffle(order)
+            self.stream += [(j, self.stream_rng.randrange(2**31)) for j in order]
+        return self.stream[t]
+
+    def key(self, configuration):
+        return json.dumps(configuration, sort_keys=True)
+
+    def max_flips_of(self, j):
+        return self.max_flips or 100 * self.formulas[j].nvars
+
+    def evaluate(self, pool, handles, candidates, t):
+        # Scores of the candidates at step t, runs not memoized yet are executed in parallel
+        j, seed = self.step(t)
+        tasks, missing = [], []
+        for configuration in candidates:
+            if (self.key(configuration), t) not in self.results:
+                tasks.append((self.solver, configuration, handles[j], self.total_weights[j], seed,
+                              self.max_flips_of(j), self.time_limit))
+                missing.append(self.key(configuration))
+        for key, result in zip(missing, pool.map(run_task, tasks, chunksize=1)):
+            self.results[(key, t)] = result
+        self.nb_runs += len(tasks)
+        return [self.results[(self.key(configuration), t)] for configuration in candidates]
+
+    def race(self, pool, handles, candidates, budget):
+        '''
+        Race the candidates until budget runs are used or a single one is left
+        Return the survivors sorted by mean rank
+        '''
+        alive = list(candidates)
+        scores = [] # step -> scores of alive
+        start = self.nb_runs
+        t = 0
+        while len(alive) > 1:
+            new_runs = sum((self.key(c), t) not in self.results for c in alive)
+            if t > 0 and self.nb_runs - start + new_runs > budget:
+                break
+            scores.append(self.evaluate(pool, handles, alive, t))
+            t += 1
+            if t >= self.first_test:
+                keep = friedman_survivors(np.array(scores), self.alpha)
+                if not keep.all():
+                    alive = [c for c, k in zip(alive, keep) if k]
+                    scores = [[s for s, k in zip(row, keep) if k] for row in scores]
+        if len(scores) == 0:
+            return alive
+        mean_ranks = ranks(np.array(scores)).mean(axis=0)
+        return [alive[i] for i in np.argsort(mean_ranks, kind='stable')]
+
+    def tune(self):
+        '''
+        Return the best configuration found (options of the solver constructor)
+        '''
+        if len(self.space) == 0:
+            return dict()
+        context = mp.get_context()
+        resource_tracker.ensure_running() # shared by the workers (see server.py)
+        shared = [Shared_Formula(formula) for formula in self.formulas]
+        elites = [defaults(self.space)]
+        try:
+            with context.Pool(self.workers) as pool:
+                handles = [s.handle for s in shared]
+                for iteration in range(self.nb_iterations):
+                    remaining = self.budget - self.nb_runs
+                    if remaining <= 0:
+                        break
+                    budget = remaining // (self.nb_iterations - iteration)
+                    nb_candidates = max(budget // (self.first_test + min(5, iteration)), len(elites) + 1)
+                    spread = 0.3 * (1 - iteration / self.nb_iterations) + 0.02
+                    candidates = list(elites)
+                    keys = set(self.key(c) for c in candidates)
+                    for _ in range(10 * nb_candidates):
+                        if len(candidates) >= nb_candidates:
+                            break
+                        if iteration == 0:
+                            new = sample(self.space, self.rng)
+                        else: # parents weighted by rank
+                            parent = self.rng.choices(elites, weights=range(len(elites), 0, -1))[0]
+                            new = neighbor(self.space, parent, spread, self.rng)
+                        if self.key(new) not in keys:
+                            keys.add(self.key(new))
+                            candidates.append(new)
+                    survivors = self.race(pool, handles, candidates, budget)
+                    elites = survivors[:self.nb_elites]
+                    if self.verbose:
+                        print('iteration {0}: {1} candidates, {2} survivors, {3} runs, best {4}'.format(
+                            iteration + 1, len(candidates), len(survivors), self.nb_runs, self.key(elites[0])))
+        finally:
+            for s in shared:
+                s.close()
+        return elites[0]
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('solver', choices=list(SOLVERS))
+    argparser.add_argument('instances', nargs='+', help='Training DIMACS files (CNF or WCNF)')
+    argparser.add_argument('--budget', type=int, default=1000, help='Nb of runs')
+    argparser.add_argument('--workers', type=int, default=None, help='Nb of worker processes (default: nb of CPUs)')
+    argparser.add_argument('--max-flips', type=int, default=None, help='Flips per run (default: 100 * nvars)')
+    argparser.add_argument('--time-limit', type=float, default=None, help='Seconds per run')
+    argparser.add_argument('--first-test', type=int, default=5, help='Steps before the first elimination')
+    argparser.add_argument('--out', default=DEFAULT_PATH, help='Tuned configurations (JSON)')
+    argparser.add_argument('--seed', type=int, default=0)
+    args = argparser.parse_args()
+    tuner = Tuner(args.solver, args.instances, args.budget, args.workers, args.max_flips, args.time_limit,
+                  args.first_test, seed=args.seed)
+    best = tuner.tune()
+    save_configuration(args.solver, best, args.out)
+    print('{0}: {1} -> {2}'.format(args.solver, json.dumps(best, sort_keys=True), args.out))
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import argparse
+import importlib
 
 def get_args():
     argparser = argparse.ArgumentParser(description=__doc__)
@@ -15,9 +16,73 @@ def get_args():
         # default='cnf_instances/uf50-06.cnf',
         # default='cnf_instances/uuf100-UNSAT.cnf',
         help='The DIMACS file')
+    argparser.add_argument(
+        '-s', '--solver',
+        default='basic',
+        choices=['basic', 'auto'] + list(SOLVERS),
+        help='Solver (basic: full_basic_walksat_solver, auto: chosen by selector.py from the instance features)')
+    argparser.add_argument(
+        '-m', '--compact',
+        action='store_true',
+        help='Compact memory layout for very large instances (not for basic)')
+    argparser.add_argument(
+        '-c', '--config',
+        default=None,
+        help='Tuned configurations (JSON written by tuning.py), options of the solver are loaded from it')
+    argparser.add_argument(
+        '-r', '--restarts',
+        default=None,
+        choices=['fixed', 'luby', 'geometric', 'fitted'],
+        help='Restart policy: flip cutoff of each try (see restarts.py), default: MAX_FLIPS flips per try')
     argparser.add_argument(
         '-v', '--verbose',
         default=1,    
         help='Verbose option')
     args = argparser.parse_args()
-    return args
\ No newline at end of file
+    return args
+
+'''
+Solvers by name: name -> (module, class)
+'''
+SOLVERS = {
+    'gsat': ('gsat', 'GSAT'),
+    'walksat': ('walksat', 'WalkSAT'),
+    'gsat_tabu': ('gsat_tabu', 'GSAT_Tabu'),
+    'walksat_tabu': ('walksat_tabu', 'WalkSAT_Tabu'),
+    'h_rts': ('hamming_reactive_tabu_search', 'H_RTS'),
+    'novelty': ('novelty', 'Novelty'),
+    'r_novelty': ('r_novelty', 'R_Novelty'),
+    'adaptive_novelty': ('adaptive_novelty', 'Adaptive_Novelty'),
+    'rots': ('robust_tabu_search', 'RoTS'),
+    'irots': ('iterated_robust_tabu_search', 'IRoTS'),
+    'amls': ('adaptive_memory_LS', 'AMLS'),
+    'saps': ('clause_weighting', 'SAPS'),
+    'paws': ('clause_weighting', 'PAWS'),
+    'probsat': ('probsat', 'ProbSAT'),
+    'ccanr': ('ccanr', 'CCAnr'),
+}
+
+def load_solver(name):
+    module, name = SOLVERS[name]
+    return getattr(importlib.import_module(module), name)
+
+def build_solver(solver, input_cnf_file, verbose, restarts=None, budget=None, elite=None, **options):
+    '''
+    Solver (name or class) with its drivers (see base_solver.Driver), options are passed to its constructor
+        - restarts / budget: Restart_Schedule (restarts.py), restarts = policy name or Restart_Policy
+        - elite: Elite_Pool of a cooperative search => Elite_Exchange (cooperative.py)
+    '''
+    from restarts import Restart_Schedule
+    from cooperative import Elite_Exchange
+    solver_class = load_solver(solver) if isinstance(solver, str) else solver
+    instance = solver_class(input_cnf_file, verbose, **options)
+    if restarts is not None or budget is not None:
+        instance.add_driver(Restart_Schedule(restarts, budget))
+    if elite is not None:
+        instance.add_driver(Elite_Exchange(elite))
+    return instance
+
+def solver_parameters(name):
+    # Tunable options of a solver built by build_solver: its PARAMETERS and those of its drivers
+    from restarts import PARAMETERS
+    return dict(load_solver(name).PARAMETERS, **PARAMETERS)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+'''
+Independent model verifier and standard solution output
+
+- verify(formula, model): one vectorized pass over the flat clause arrays of a parsed formula
+- verify_file(filename, model): the DIMACS file is streamed and checked by chunks of clauses
+  => large instances are verified without building the formula (memory = one chunk)
+- print_solution(): competition output
+      o <cost>                              (MaxSAT)
+      s SATISFIABLE / UNSATISFIABLE / UNKNOWN / OPTIMUM FOUND
+      v <literals> 0                        (several v lines for large models)
+
+    python verifier.py instance.cnf solver_output.txt       (model read from its v lines)
+
+Models are lists of literals (a missing variable is unassigned, i.e. satisfies no clause).
+Nothing here reuses the solvers' incremental state.
+'''
+
+from dimacs_parser import read_clauses
+from collections import namedtuple
+import numpy as np
+import argparse
+import sys
+
+# ok: every hard clause (every clause for CNF) is satisfied, cost: weighted cost (hard clause = top),
+# unsat_clauses: ids of the first unsatisfied clauses
+Verification = namedtuple('Verification', ['ok', 'cost', 'nb_unsat', 'nb_hard_unsat', 'unsat_clauses'])
+
+STATUS = {'SAT': 'SATISFIABLE', 'UNSAT': 'UNSATISFIABLE', 'UNKNOWN': 'UNKNOWN', 'OPTIMUM': 'OPTIMUM FOUND'}
+
+MAX_REPORTED = 10
+
+
+def model_values(model, nvars=0):
+    '''
+    value[x] = +1 / -1 / 0 (unassigned), ValueError if the model contains x and -x
+    '''
+    model = np.asarray(model, dtype=np.int64)
+    model = model[model != 0]
+    variables = np.abs(model)
+    value = np.zeros(max(nvars, int(variables.max()) if len(model) > 0 else 0) + 1, dtype=np.int64)
+    value[variables] = np.sign(model)
+    if np.any(value[variables] != np.sign(model)):
+        raise ValueError('inconsistent model: contains both x and -x')
+    return value
+
+
+def satisfied_clauses(value, clause_start, clause_lits):
+    # satisfied[i] <=> a literal of clause i is true
+    if len(clause_start) <= 1:
+        return np.zeros(0, dtype=bool)
+    variables = np.abs(clause_lits)
+    if len(variables) > 0 and variables.max() >= len(value): # variables the model does not mention
+        value = np.concatenate((value, np.zeros(variables.max() + 1 - len(value), dtype=np.int64)))
+    return np.logical_or.reduceat(value[variables] * clause_lits > 0, clause_start[:-1])
+
+
+def verify(formula, model):
+    value = model_values(model, formula.nvars)
+    clause_start, clause_lits = formula.clause_arrays()
+    satisfied = satisfied_clauses(value, clause_start, clause_lits)
+    weights = np.asarray(formula.weights, dtype=np.int64)
+    hard = weights >= formula.top if formula.is_weighted else np.ones(len(weights), dtype=bool)
+    unsat = np.flatnonzero(~satisfied)
+    nb_hard_unsat = int(np.count_nonzero(hard[unsat]))
+    return Verification(nb_hard_unsat == 0, int(weights[unsat].sum()), len(unsat), nb_hard_unsat,
+                        unsat[:MAX_REPORTED].tolist())
+
+
+def stream_clauses(filename, chunk_size=100000):
+    '''
+    Read a CNF / WCNF file (tokenized by dimacs_parser.read_clauses, as parse_formula) by chunks of clauses
+    Yield (clause_start, clause_lits, weights, hard) for each chunk, then a last (None, nvars, top, weighted)
+    (weight -1 for the clauses marked h, their weight is top, only known at the end of the file;
+    nvars of the p line, 0 if there is none; duplicate literals are kept)
+    '''
+    info = dict()
+    starts, lits, weights, hard = [0], [], [], []
+    with open(filename) as lines:
+        for weight, clause in read_clauses(lines, info):
+            top = info['top']
+            lits.extend(clause)
+            starts.append(len(lits))
+            weights.append(1 if weight is None else (-1 if weight == 'h' else weight))
+            hard.append(weight is None or weight == 'h' or (top is not None and weight >= top))
+            if len(weights) >= chunk_size:
+                yield (np.array(starts, dtype=np.int64), np.array(lits, dtype=np.int64),
+                       np.array(weights, dtype=np.int64), np.array(hard, dtype=bool))
+                starts, lits, weights, hard = [0], [], [], []
+    if len(weights) > 0:
+        yield (np.array(starts, dtype=np.int64), np.array(lits, dtype=np.int64),
+               np.array(weights, dtype=np.int64), np.array(hard, dtype=bool))
+    yield None, info['nvars'], info['top'], info['weighted']
+
+
+def verify_file(filename, model, chunk_size=100000):
+    value = model_values(model)
+    offset, nb_unsat, nb_hard_unsat, nb_h_unsat, cost, total = 0, 0, 0, 0, 0, 0
+    unsat_clauses = []
+    for clause_start, clause_lits, weights, hard in stream_clauses(filename, chunk_size):
+        if clause_start is None: # end: top and weighted
+            top, weighted = weights, hard
+            break
+        satisfied = satisfied_clauses(value, clause_start, clause_lits)
+        unsat = np.flatnonzero(~satisfied)
+        nb_unsat += len(unsat)
+        nb_hard_unsat += int(np.count_nonzero(hard[unsat]))
+        nb_h_unsat += int(np.count_nonzero(weights[unsat] < 0))
+        cost += int(weights[unsat][weights[unsat] > 0].sum())
+        total += int(weights[weights > 0].sum())
+        if len(unsat_clauses) < MAX_REPORTED:
+            unsat_clauses.extend((offset + unsat[:MAX_REPORTED - len(unsat_clauses)]).tolist())
+        offset += len(weights)
+    if not weighted:
+        return Verification(nb_unsat == 0, nb_unsat, nb_unsat, nb_unsat, unsat_clauses)
+    if top is None:
+        top = total + 1
+    return Verification(nb_hard_unsat == 0, cost + nb_h_unsat * top, nb_unsat, nb_hard_unsat, unsat_clauses)
+
+
+def read_model(lines):
+    # Literals of the v lines of a solver output (or of bare lines of integers), until 0
+    model = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) == 0 or fields[0] in ('c', 's', 'o'):
+            continue
+        if fields[0] == 'v':
+            fields = fields[1:]
+        for field in fields:
+            literal = int(field)
+            if literal == 0:
+                return model
+            model.append(literal)
+    return model
+
+
+def print_solution(status, model=None, cost=None, out=None, width=80):
+    '''
+    status: SAT / UNSAT / UNKNOWN / OPTIMUM
+    '''
+    out = out or sys.stdout
+    if cost is not None:
+        out.write('o {0}\n'.format(cost))
+    out.write('s {0}\n'.format(STATUS[status]))
+    if model is not None:
+        line = 'v'
+        for literal in model:
+            field = ' {0}'.format(literal)
+            if len(line) + len(field) > width:
+                out.write(line + '\n')
+                line = 'v'
+            line += field
+        out.write(line + ' 0\n')
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument('input', help='The DIMACS file (CNF or WCNF)')
+    argparser.add_argument('model', help='File with the model (v lines), - for stdin')
+    argparser.add_argument('--chunk', type=int, default=100000, help='Nb of clauses per chunk')
+    args = argparser.parse_args()
+    lines = sys.stdin if args.model == '-' else open(args.model)
+    result = verify_file(args.input, read_model(lines), args.chunk)
+    print('c nb of unsat clauses: {0} (hard: {1})'.format(result.nb_unsat, result.nb_hard_unsat))
+    if result.nb_unsat > 0:
+        print('c first unsat clauses: {0}'.format(' '.join(str(i) for i in result.unsat_clauses)))
+    print('o {0}'.format(result.cost))
+    print('c model {0}'.format('OK' if result.ok else 'REJECTED'))
+    sys.exit(0 if result.ok else 1)
+
+if __name__ == '__main__':
+    main()
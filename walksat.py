@@ -4,27 +4,59 @@ References
 '''
 
 from base_solver import Base_Solver
+from kernels import Kernel_State
+from parameters import Parameter
+import kernels
 import numpy as np
 import random
 import time
 from itertools import chain
 
 class WalkSAT(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      SKC=Parameter('cat', (False, True), True),
+                      random_walk=Parameter('cat', (False, True), False),
+                      noise_parameter=Parameter('real', (0.0, 1.0), 0.2))
     
-    def __init__(self, input_cnf_file, verbose, SKC = True, random_walk = False, noise_parameter = 0.2):
-        super(WalkSAT, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, SKC = True, random_walk = False, noise_parameter = 0.2,
+                 use_kernels = False, **kwargs):
+        super(WalkSAT, self).__init__(input_cnf_file, verbose, **kwargs)
         self.SKC = SKC
         self.random_walk = random_walk
         self.noise_parameter = noise_parameter
+        '''
+        use_kernels: each try runs as a whole in kernels.py, compiled by numba (see kernels.py)
+        Same moves as the Python loop, but the try ends on its best assignment and ages are not maintained
+        Not used under assumptions (frozen variables), nor without numba: the kernels as plain Python functions
+        are slower than the Python loop (array element accesses)
+        '''
+        self.use_kernels = use_kernels
 
     def pick_unsat_clause(self):
         assert len(self.id_unsat_clauses) > 0
         random_index = random.choice(self.id_unsat_clauses)
         return self.list_clauses[random_index]
 
+    def solve_kernels(self):
+        state = Kernel_State(self)
+        kernels.seed(random.randrange(2**31))
+        noise = self.noise_parameter if self.random_walk else 0.0
+        while self.nb_tries < self.MAX_TRIES and not self.is_sat:
+            self.generate()
+            state.load(self.assignment)
+            nb_flips, best_cost = state.walksat(self.MAX_FLIPS - self.nb_flips, noise, self.SKC)
+            self.nb_flips += nb_flips
+            self.assignment = state.assignment(best=best_cost < state.cost()) # try ends on its best assignment
+            self.initialize_cost()
+            self.is_sat = self.check()
+
     def solve(self):
         initial =  time.time()
         self.initialize_pool()
+        if self.use_kernels and kernels.HAS_NUMBA and not self.frozen:
+            self.solve_kernels()
+            return self.report(initial)
         while self.nb_tries < self.MAX_TRIES and not self.is_sat:
             self.generate()
             self.initialize_cost()
@@ -62,15 +94,6 @@ class WalkSAT(Base_Solver):
                             x = unsat_clause[np.argmin(break_count)]
                     self.flip(x) 
 
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     
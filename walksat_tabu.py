@@ -4,37 +4,105 @@ References
 '''
 
 from base_solver import Base_Solver
+from tabu import Tabu_List
+from indexed_set import Indexed_Set
+from parameters import Parameter
 import numpy as np
+import heapq
 import random
 import time
 from itertools import chain
 
 class WalkSAT_Tabu(Base_Solver):
+
+    PARAMETERS = dict(Base_Solver.PARAMETERS,
+                      SKC=Parameter('cat', (False, True), True),
+                      random_walk=Parameter('cat', (False, True), False),
+                      noise_parameter=Parameter('real', (0.0, 1.0), 0.2),
+                      tabu_ratio=Parameter('real', (0.0, 0.2), 0.01875),
+                      tabu_base=Parameter('real', (0.0, 20.0), 2.8125))
     
-    def __init__(self, input_cnf_file, verbose, SKC = True, random_walk = False, noise_parameter = 0.2, tabu_length=None):
-        super(WalkSAT_Tabu, self).__init__(input_cnf_file, verbose)
+    def __init__(self, input_cnf_file, verbose, SKC = True, random_walk = False, noise_parameter = 0.2, tabu_length=None,
+                 tabu_ratio = 0.01875, tabu_base = 2.8125, **kwargs):
+        super(WalkSAT_Tabu, self).__init__(input_cnf_file, verbose, **kwargs)
         self.SKC = SKC
         self.random_walk = random_walk
         self.noise_parameter = noise_parameter
         '''
         Initialize tabu list and its length
-        Note that tabu list is a circular list 
+        A variable flipped at iteration t stays tabu for the next tabu_length iterations
+        (same behaviour as a circular list of length tabu_length)
         '''
-        if tabu_length is None:
-            self.tabu_length = int(0.01875*self.nvars + 2.8125)
+        if tabu_length is None: # linear in nvars, by default the fit of [1]
+            self.tabu_length = int(tabu_ratio*self.nvars + tabu_base)
         else:
             self.tabu_length = tabu_length
-        self.tabu_list = []
+        self.tabu = Tabu_List(self.nvars, self.tabu_length)
+        '''
+        Eligible clauses = unsat clauses with at least 1 non-tabu variable => O(1) sampling
+            - nb_non_tabu[i] = nb of non-tabu variables of clause i, updated when a variable enters/leaves tabu
+            - a variable leaves tabu when its tabu-until iteration is reached (heap of (until, variable))
+        '''
+        self.in_tabu = [False for _ in range(self.nvars+1)]
+        self.expiry = []
+        self.nb_non_tabu = self.clause_lengths()
+        self.eligible = Indexed_Set(len(self.list_clauses), self.compact)
+
+    def resize(self):
+        super(WalkSAT_Tabu, self).resize()
+        self.eligible.resize(len(self.list_clauses))
+
+    def initialize_eligible(self):
+        self.tabu.reset()
+        self.in_tabu = [False for _ in range(self.nvars+1)]
+        self.expiry = []
+        self.nb_non_tabu = self.clause_lengths()
+        self.eligible.clear()
+        for i in self.id_unsat_clauses:
+            self.eligible.add(i)
 
     def add_tabu(self, literal):
         '''
         Add a move to tabu list
         '''
-        if len(self.tabu_list) < self.tabu_length:
-            self.tabu_list.append(abs(literal))
-        else: # tabu list is full
-            self.tabu_list.pop(0)
-            self.tabu_list.append(literal)
+        self.tabu.add(literal, self.nb_flips)
+        x = abs(literal)
+        if self.tabu.is_tabu(x, self.nb_flips):
+            heapq.heappush(self.expiry, (self.tabu.until(x), x))
+            if not self.in_tabu[x]: # enter tabu
+                self.in_tabu[x] = True
+                for i in self.pool[x] + self.pool[-x]:
+                    self.nb_non_tabu[i] -= 1
+                    if self.nb_non_tabu[i] == 0:
+                        self.eligible.remove(i)
+
+    def expire_tabu(self):
+        '''
+        Variables whose tabu tenure is over leave tabu (entries of variables flipped again since are outdated)
+        '''
+        while len(self.expiry) > 0 and self.expiry[0][0] <= self.nb_flips:
+            until, x = heapq.heappop(self.expiry)
+            if self.in_tabu[x] and self.tabu.until(x) == until: # leave tabu
+                self.in_tabu[x] = False
+                for i in self.pool[x] + self.pool[-x]:
+                    self.nb_non_tabu[i] += 1
+                    if self.nb_non_tabu[i] == 1 and self.costs[i] == 0:
+                        self.eligible.add(i)
+
+    def flip(self, literal):
+        '''
+        Keep eligible clauses up to date: clauses turning SAT leave, clauses turning UNSAT enter
+        '''
+        if self.frozen and abs(literal) in self.frozen: # no-op move
+            return super(WalkSAT_Tabu, self).flip(literal)
+        old_literal = self.assignment[abs(literal)-1]
+        for j in self.pool[-old_literal]:
+            if self.costs[j] == 0:
+                self.eligible.remove(j)
+        super(WalkSAT_Tabu, self).flip(literal)
+        for i in self.pool[old_literal]:
+            if self.costs[i] == 0 and self.nb_non_tabu[i] > 0:
+                self.eligible.add(i)
 
     def solve(self):
         initial =  time.time()
@@ -42,6 +110,7 @@ class WalkSAT_Tabu(Base_Solver):
         while self.nb_tries < self.MAX_TRIES and not self.is_sat:
             self.generate()
             self.initialize_cost()
+            self.initialize_eligible()
             while self.nb_flips < self.MAX_FLIPS and not self.is_sat:
                 if self.check() == 1: # if no unsat clause => finish
                     self.is_sat = True
@@ -51,18 +120,14 @@ class WalkSAT_Tabu(Base_Solver):
                     - WalkSAT idea 
                     - Among all variables that occur in unsat clauses, pick one randomly ! (=> Diverisification)
                     - Choose a variable x which minimizes break count in this unsat clause to flip
-                    - When integrating a tabu list, first find an unsat clause that has at least 1 non-tabu variable
-                    - Otherwise pick next clause
+                    - When integrating a tabu list, pick the unsat clause among eligible ones (at least 1 non-tabu variable)
                     - When all candidates are tabus => ignore tabu list 
                     '''
-                    list_id_unsat_clauses = self.id_unsat_clauses.copy() ## Attention: Copy a list => avoid destroying original list  
-                    unsat_clause = []
-                    while len(unsat_clause) == 0 and len(list_id_unsat_clauses) > 0:
-                        random_id = random.choice(list_id_unsat_clauses)
-                        list_id_unsat_clauses.remove(random_id)
-                        unsat_clause = self.list_clauses[random_id]
-                        unsat_clause = list(set(unsat_clause)^set(self.tabu_list))         
-                    if len(unsat_clause) == 0: #ignore
+                    self.expire_tabu()
+                    if len(self.eligible) > 0:
+                        random_id = self.eligible.choice()
+                        unsat_clause = [literal for literal in self.list_clauses[random_id] if not self.in_tabu[abs(literal)]]
+                    else: #ignore
                         random_id =  random.choice(self.id_unsat_clauses)
                         unsat_clause = self.list_clauses[random_id]
                     assert len(unsat_clause) > 0
@@ -97,15 +162,6 @@ class WalkSAT_Tabu(Base_Solver):
                     self.flip(x) 
                     self.add_tabu(x)
 
-        end = time.time()
-        print('Nb flips:  {0}      '.format(self.nb_flips))
-        print('Nb tries:  {0}      '.format(self.nb_tries))
-        print('CPU time:  {0:10.4f} s '.format(end-initial))
-        if self.is_sat:
-            print('SAT')
-            return self.assignment
-        else:
-            print('UNKNOWN')
-            return None
+        return self.report(initial)
 
     